@@ -10,6 +10,12 @@ ExchangeEventOrganizer = namedtuple('ExchangeEventOrganizer', ['name', 'email'])
 ExchangeEventAttendee = namedtuple('ExchangeEventAttendee', ['name', 'email', 'required'])
 ExchangeEventResponse = namedtuple('ExchangeEventResponse', ['name', 'email', 'response', 'last_response', 'required'])
 
+# The outcome of one event in a bulk request: the error it failed with, or None
+ExchangeEventResult = namedtuple('ExchangeEventResult', ['event', 'error'])
+
+# The merged (start, end) times a mailbox is busy, or the error looking them up failed with
+ExchangeFreeBusy = namedtuple('ExchangeFreeBusy', ['email', 'busy', 'error'])
+
 
 RESPONSE_ACCEPTED = u'Accept'
 RESPONSE_DECLINED = u'Decline'
@@ -1,4 +1,11 @@
 import json
+from collections import namedtuple
+
+# The outcome of fetching one attachment in bulk: the attachment (without its content) or the error it failed with
+ExchangeAttachmentDownload = namedtuple('ExchangeAttachmentDownload', ['id', 'attachment', 'error'])
+
+# The changes to a mail folder since a sync state. emails holds the created messages when they're fetched too
+ExchangeEmailChanges = namedtuple('ExchangeEmailChanges', ['created', 'updated', 'deleted', 'read_flag_changed', 'emails', 'sync_state', 'includes_last_item'])
 
 class BaseExchangeEmailService(object):
     """
@@ -204,6 +211,7 @@ class BaseExchangeAttachmentItem(DataSerializerMixin, UpdatePropsMixin):
     content_type = u''
     content_id = u''
     content = None
+    size = None #Bytes of content, when it was streamed somewhere else rather than loaded into content
 
     DATA_ATTRIBUTES = [
         "id", "name", "content_type", "content_id"
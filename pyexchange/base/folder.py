@@ -1,3 +1,9 @@
+from collections import namedtuple
+
+# The IDs of the items changed in a folder since a sync state. read_flag_changed is a list of (id, is_read).
+ExchangeFolderChanges = namedtuple('ExchangeFolderChanges', ['created', 'updated', 'deleted', 'read_flag_changed', 'sync_state', 'includes_last_item'])
+
+
 class BaseExchangeFolderService(object):
 
   def __init__(self, service):
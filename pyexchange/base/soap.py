@@ -5,47 +5,173 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
 import logging
+import threading
 
 from lxml import etree
 from lxml.builder import ElementMaker
 from datetime import datetime
 from pytz import utc
 
+from ..connection import ExchangeRetryPolicy
 from ..exceptions import FailedExchangeException
 
 SOAP_NS = u'http://schemas.xmlsoap.org/soap/envelope/'
 
 SOAP_NAMESPACES = {u's': SOAP_NS}
+SOAP_FAULT_TAG = u'{%s}Fault' % SOAP_NS
 S = ElementMaker(namespace=SOAP_NS, nsmap=SOAP_NAMESPACES)
 
 log = logging.getLogger('pyexchange')
 
+# lxml parsers can be reused, but not by two threads at once, so each thread builds its own
+_parsers = threading.local()
+
+# compiled xpaths aren't safe to share between threads either
+_plans = threading.local()
+
+# how many property maps each thread remembers by identity, on top of its plans
+MAX_PLANS_BY_IDENTITY = 256
+
 
 class ExchangeServiceSOAP(object):
 
   EXCHANGE_DATE_FORMAT = u"%Y-%m-%dT%H:%M:%SZ"
 
-  def __init__(self, connection):
+  # Requests (by the local name of their root element) that are safe to send more than once.
+  IDEMPOTENT_OPERATIONS = frozenset()
+
+  def __init__(self, connection, retry_policy=None):
     self.connection = connection
+    self.retry_policy = retry_policy or getattr(connection, 'retry_policy', None) or ExchangeRetryPolicy()
+
+  def send(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", idempotent=None, check_response_codes=True):
+    """
+    Sends the request and returns the parsed response.
+
+    Failed requests, whether the connection failed or Exchange did, are retried up to ``retries`` times according
+    to :attr:`retry_policy`, within an overall deadline of ``timeout`` seconds. Unless ``idempotent`` says
+    otherwise, requests listed in :attr:`IDEMPOTENT_OPERATIONS` are treated as safe to resend and everything else
+    is only resent when Exchange can't have processed it.
+
+    With ``check_response_codes=False``, only SOAP faults raise. Batched requests use that to read the outcome
+    of each item from its own response message.
+    """
+    if idempotent is None:
+      idempotent = self._is_idempotent(xml)
 
-  def send(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8"):
     request_xml = self._wrap_soap_xml_request(xml)
-    log.info(etree.tostring(request_xml, encoding=encoding, pretty_print=True))
-    response = self._send_soap_request(request_xml, headers=headers, retries=retries, timeout=timeout, encoding=encoding)
-    return self._parse(response, encoding=encoding)
 
-  def _parse(self, response, encoding="utf-8"):
+    # the retry policy drives the retries here, so the connection only makes one attempt each time
+    def send_and_parse(attempt_timeout):
+      response = self._send_soap_request(request_xml, headers=headers, retries=0, timeout=attempt_timeout, encoding=encoding, idempotent=idempotent)
+      return self._parse(response, encoding=encoding, check_response_codes=check_response_codes)
+
+    return self.retry_policy.execute(send_and_parse, retries=retries, timeout=timeout, idempotent=idempotent)
+
+  def send_stream(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", idempotent=None):
+    """
+    Sends the request and returns the response body as a stream, without parsing it. Pass it to
+    :meth:`_iterparse` to work through big responses a piece at a time. Close it when you're done.
+
+    Only connection level failures are retried, since the response hasn't been looked at yet.
+    """
+    if idempotent is None:
+      idempotent = self._is_idempotent(xml)
+
+    request_xml = self._wrap_soap_xml_request(xml)
+    return self._send_soap_request(request_xml, headers=headers, retries=retries, timeout=timeout, encoding=encoding, idempotent=idempotent, stream=True)
+
+  def _is_idempotent(self, xml):
+    return etree.QName(xml).localname in self.IDEMPOTENT_OPERATIONS
+
+  def _parse(self, response, encoding="utf-8", check_response_codes=True):
+    """
+    Parses a response from Exchange. Raw bytes and file-like objects go straight to lxml, which works out the
+    encoding itself; text is encoded with ``encoding`` first.
+    """
 
     try:
-      tree = etree.XML(response.encode(encoding))
-    except (etree.XMLSyntaxError, TypeError) as err:
+      if hasattr(response, 'read'):
+        tree = etree.parse(response, self._xml_parser()).getroot()
+      elif isinstance(response, bytes):
+        tree = etree.fromstring(response, self._xml_parser())
+      else:
+        tree = etree.fromstring(response.encode(encoding), self._xml_parser())
+    except (etree.XMLSyntaxError, TypeError, AttributeError) as err:
       raise FailedExchangeException(u"Unable to parse response from Exchange - check your login information. Error: %s" % err)
 
-    self._check_for_errors(tree)
-
-    #log.info(etree.tostring(tree, encoding=encoding, pretty_print=True))
+    if check_response_codes:
+      self._check_for_errors(tree)
+    else:
+      self._check_for_SOAP_fault(tree)
     return tree
 
+  def _iterparse(self, stream, tag):
+    """
+    Yields every ``tag`` element in a streamed response as soon as it has been read in full. Once the caller
+    moves on, the element and everything parsed before it is thrown away, so memory use doesn't grow with the
+    size of the response. SOAP faults raise as soon as they're seen.
+    """
+    context = etree.iterparse(stream, events=(u'end',), resolve_entities=False, no_network=True, load_dtd=False)
+
+    try:
+      for _, element in context:
+        if element.tag == SOAP_FAULT_TAG:
+          raise FailedExchangeException(u"SOAP Fault from Exchange server", element.text)
+
+        self._check_for_streamed_errors(element)
+
+        if element.tag != tag:
+          continue
+
+        parent = element.getparent()
+        yield element
+
+        # the caller may have moved the element into a tree of its own, in which case it's theirs to keep
+        if element.getparent() is parent:
+          element.clear()
+
+        if parent is not None:
+          while len(parent) and parent[0] is not element:
+            del parent[0]
+    except etree.XMLSyntaxError as err:
+      raise FailedExchangeException(u"Unable to parse response from Exchange - check your login information. Error: %s" % err)
+
+  def _parse_with_target(self, stream, target, chunk_size=64 * 1024):
+    """
+    Feeds a streamed response to an lxml parser ``target`` a chunk at a time, and returns whatever the target's
+    close() returns. Text reaches the target's data() method in pieces no bigger than a chunk, so even a huge text
+    node is never held in memory all at once.
+    """
+    parser = etree.XMLParser(target=target, resolve_entities=False, no_network=True, load_dtd=False, huge_tree=True)
+
+    try:
+      while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+          break
+        parser.feed(chunk)
+
+      return parser.close()
+    except etree.XMLSyntaxError as err:
+      raise FailedExchangeException(u"Unable to parse response from Exchange - check your login information. Error: %s" % err)
+
+  def _check_for_streamed_errors(self, element):
+    """ Called with every element of a streamed response, in document order. """
+    pass
+
+  def _xml_parser(self):
+    """
+    Returns this thread's parser. It never resolves entities, loads DTDs or touches the network, whatever the
+    response asks for.
+    """
+    parser = getattr(_parsers, 'parser', None)
+
+    if parser is None:
+      parser = _parsers.parser = etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False, dtd_validation=False)
+
+    return parser
+
   def _check_for_errors(self, xml_tree):
     self._check_for_SOAP_fault(xml_tree)
 
@@ -59,10 +185,13 @@ class ExchangeServiceSOAP(object):
       log.debug(etree.tostring(fault, pretty_print=True))
       raise FailedExchangeException(u"SOAP Fault from Exchange server", fault.text)
 
-  def _send_soap_request(self, xml, headers=None, retries=2, timeout=30, encoding="utf-8"):
+  def _send_soap_request(self, xml, headers=None, retries=2, timeout=30, encoding="utf-8", idempotent=False, stream=False):
     body = etree.tostring(xml, encoding=encoding)
 
-    response = self.connection.send(body, headers, retries, timeout)
+    if stream:
+      return self.connection.send(body, headers, retries, timeout, idempotent=idempotent, stream=True)
+
+    response = self.connection.send(body, headers, retries, timeout, idempotent=idempotent)
     return response
 
   def _wrap_soap_xml_request(self, exchange_xml):
@@ -93,38 +222,78 @@ class ExchangeServiceSOAP(object):
 
     """
 
-    result = {}
+    return self._extraction_plan(property_map, namespace_map).extract(element, self)
 
-    log.info(etree.tostring(element, pretty_print=True))
+  def _extraction_plan(self, property_map, namespace_map):
+    """
+    Returns the compiled :class:`ExtractionPlan` for a property map. Plans are built the first time a map is seen
+    (per thread) and reused from then on, so each xpath is only compiled once.
+
+    Property maps are nearly always class level constants, so they're looked up by identity first, which is much
+    cheaper than building a key out of their contents. A map built on the fly still finds its plan by value.
+    """
+    by_identity = getattr(_plans, u'by_identity', None)
+    if by_identity is None:
+      by_identity = _plans.by_identity = {}
+      _plans.cache = {}
+
+    # the maps are kept with the plan, so their ids can't be handed to new objects while they're in here
+    entry = by_identity.get((id(property_map), id(namespace_map)))
+    if entry is not None and entry[0] is property_map and entry[1] is namespace_map:
+      return entry[2]
+
+    key = (
+      tuple((name, property_map[name][u'xpath'], property_map[name].get(u'cast', None)) for name in sorted(property_map)),
+      tuple(sorted(namespace_map.items())),
+    )
+
+    plans = _plans.cache
+    plan = plans.get(key)
+    if plan is None:
+      plan = plans[key] = ExtractionPlan(property_map, namespace_map)
+
+    # maps built on the fly would pile up in here otherwise
+    if len(by_identity) >= MAX_PLANS_BY_IDENTITY:
+      by_identity.clear()
+    by_identity[(id(property_map), id(namespace_map))] = (property_map, namespace_map, plan)
+
+    return plan
+
+
+class ExtractionPlan(object):
+  """
+  A property map (see :meth:`ExchangeServiceSOAP._xpath_to_dict`) compiled into :class:`lxml.etree.XPath` objects
+  and cast functions, ready to be run against any number of elements.
+  """
+
+  CASTS = {
+    u'datetime': lambda service, text: service._parse_date(text),
+    u'date_only_naive': lambda service, text: service._parse_date_only_naive(text),
+    u'int': lambda service, text: int(text),
+    u'bool': lambda service, text: text.lower() == u'true',
+  }
+
+  def __init__(self, property_map, namespace_map):
+    self.fields = []
 
     for key in property_map:
       item = property_map[key]
-      log.info(u'Pulling xpath {xpath} into key {key}'.format(key=key, xpath=item[u'xpath']))
-      nodes = element.xpath(item[u'xpath'], namespaces=namespace_map)
+      cast_as = item.get(u'cast', None)
+      self.fields.append((key, etree.XPath(item[u'xpath'], namespaces=namespace_map), self.CASTS.get(cast_as)))
+
+  def extract(self, element, service):
+    result = {}
+
+    for key, xpath, cast in self.fields:
+      nodes = xpath(element)
 
       if nodes:
-        result_for_node = []
-
-        for node in nodes:
-          cast_as = item.get(u'cast', None)
-
-          if cast_as == u'datetime':
-            result_for_node.append(self._parse_date(node.text))
-          elif cast_as == u'date_only_naive':
-            result_for_node.append(self._parse_date_only_naive(node.text))
-          elif cast_as == u'int':
-            result_for_node.append(int(node.text))
-          elif cast_as == u'bool':
-            if node.text.lower() == u'true':
-              result_for_node.append(True)
-            else:
-              result_for_node.append(False)
-          else:
-            result_for_node.append(node.text)
-
-        if not result_for_node:
-          result[key] = None
-        elif len(result_for_node) == 1:
+        if cast is None:
+          result_for_node = [node.text for node in nodes]
+        else:
+          result_for_node = [cast(service, node.text) for node in nodes]
+
+        if len(result_for_node) == 1:
           result[key] = result_for_node[0]
         else:
           result[key] = result_for_node
@@ -0,0 +1,70 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import sqlite3
+import threading
+
+# SQLite refuses queries with more than 999 parameters
+QUERY_CHUNK_SIZE = 500
+
+
+class ExchangeEventCache(object):
+  """
+  Keeps events in a SQLite database, keyed by their ItemId along with the change key they had when they were
+  stored. ::
+
+      service.event_cache = ExchangeEventCache(u'/var/cache/myapp/events.db')
+      event = service.calendar().get_event(id=u'KEY HERE')
+
+  The service checks the change keys with a cheap IdOnly GetItem, and only fetches the events that changed. An
+  event is stored as the ``<t:CalendarItem>`` Exchange sent, so it's read back exactly like a fresh one.
+
+  The default path keeps the cache in memory. The cache can be shared between threads.
+  """
+
+  def __init__(self, path=u':memory:'):
+    self.path = path
+    self._lock = threading.Lock()
+    self._connection = sqlite3.connect(path, check_same_thread=False)
+
+    with self._lock, self._connection:
+      self._connection.execute(u'CREATE TABLE IF NOT EXISTS events (id TEXT PRIMARY KEY, change_key TEXT NOT NULL, item BLOB NOT NULL)')
+
+  def get_many(self, ids):
+    """ Returns {id: (change key, item XML)} for the IDs that are in the cache. """
+    ids = list(set(ids))
+    found = {}
+
+    with self._lock:
+      for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+        chunk = ids[i:i + QUERY_CHUNK_SIZE]
+        rows = self._connection.execute(u'SELECT id, change_key, item FROM events WHERE id IN (%s)' % u', '.join(u'?' * len(chunk)), chunk)
+        for id, change_key, item in rows:
+          found[id] = (change_key, bytes(item))
+
+    return found
+
+  def put_many(self, entries):
+    """ Stores (id, change key, item XML) for each entry, replacing what was there. """
+    with self._lock, self._connection:
+      self._connection.executemany(u'INSERT OR REPLACE INTO events (id, change_key, item) VALUES (?, ?, ?)',
+                                   [(id, change_key, sqlite3.Binary(item)) for id, change_key, item in entries])
+
+  def discard_many(self, ids):
+    with self._lock, self._connection:
+      self._connection.executemany(u'DELETE FROM events WHERE id = ?', [(id,) for id in ids])
+
+  def clear(self):
+    with self._lock, self._connection:
+      self._connection.execute(u'DELETE FROM events')
+
+  def close(self):
+    with self._lock:
+      self._connection.close()
+
+  def __len__(self):
+    with self._lock:
+      return self._connection.execute(u'SELECT COUNT(*) FROM events').fetchone()[0]
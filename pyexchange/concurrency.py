@@ -0,0 +1,275 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+try:
+  from Queue import Queue
+except ImportError:  # Python 3
+  from queue import Queue
+
+log = logging.getLogger('pyexchange')
+
+
+class ExchangeFuture(object):
+  """
+  The result of a call that hasn't necessarily finished yet.
+
+  This is a small subset of :class:`concurrent.futures.Future` (which isn't in the Python 2 standard library):
+  ``result()``, ``exception()``, ``done()`` and ``add_done_callback()``. Callbacks are called with the future
+  as their only argument, in the thread that completes it - or straight away if it's already done.
+  """
+
+  def __init__(self):
+    self._condition = threading.Condition()
+    self._done = False
+    self._result = None
+    self._exception = None
+    self._callbacks = []
+
+  def done(self):
+    return self._done
+
+  def result(self, timeout=None):
+    self._wait(timeout)
+
+    if self._exception is not None:
+      raise self._exception
+
+    return self._result
+
+  def exception(self, timeout=None):
+    self._wait(timeout)
+    return self._exception
+
+  def add_done_callback(self, fn):
+    with self._condition:
+      if not self._done:
+        self._callbacks.append(fn)
+        return
+
+    self._invoke(fn)
+
+  def set_result(self, result):
+    self._finish(result=result)
+
+  def set_exception(self, exception):
+    self._finish(exception=exception)
+
+  def _wait(self, timeout):
+    with self._condition:
+      if not self._done:
+        self._condition.wait(timeout)
+
+      if not self._done:
+        raise RuntimeError(u'Timed out waiting for a result from Exchange')
+
+  def _finish(self, result=None, exception=None):
+    with self._condition:
+      if self._done:
+        raise RuntimeError(u'This future already has a result')
+
+      self._result = result
+      self._exception = exception
+      self._done = True
+      self._condition.notify_all()
+
+      callbacks, self._callbacks = self._callbacks, []
+
+    for fn in callbacks:
+      self._invoke(fn)
+
+  def _invoke(self, fn):
+    try:
+      fn(self)
+    except Exception:
+      log.exception(u'Exception in future callback')
+
+
+class ExchangeWorkerPool(object):
+  """
+  A fixed-size pool of daemon threads that runs callables and hands back :class:`ExchangeFuture` objects. ::
+
+      pool = ExchangeWorkerPool(max_workers=4)
+      futures = [pool.submit(do_something, item) for item in items]
+      results = [future.result() for future in futures]
+      pool.shutdown()
+
+  Threads are only started as work comes in, up to ``max_workers``.
+  """
+
+  def __init__(self, max_workers=4):
+    if max_workers < 1:
+      raise ValueError(u'max_workers must be at least 1')
+
+    self.max_workers = max_workers
+    self._queue = Queue()
+    self._threads = []
+    self._idle = 0
+    self._lock = threading.Lock()
+    self._shutdown = False
+
+  def submit(self, fn, *args, **kwargs):
+    future = ExchangeFuture()
+
+    with self._lock:
+      if self._shutdown:
+        raise RuntimeError(u'Cannot submit work to a pool that has been shut down')
+
+      self._queue.put((future, fn, args, kwargs))
+
+      if self._idle > 0:
+        self._idle -= 1
+      elif len(self._threads) < self.max_workers:
+        self._start_worker()
+
+    return future
+
+  def map(self, fn, items):
+    """ Runs fn on every item and returns the results in order. Raises the first error it finds. """
+    futures = [self.submit(fn, item) for item in items]
+    return [future.result() for future in futures]
+
+  def shutdown(self, wait=True):
+    with self._lock:
+      if self._shutdown:
+        return
+      self._shutdown = True
+
+      for _ in self._threads:
+        self._queue.put(None)
+
+    if wait:
+      for thread in self._threads:
+        thread.join()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.shutdown(wait=True)
+    return False
+
+  def _start_worker(self):
+    thread = threading.Thread(target=self._work)
+    thread.daemon = True
+    thread.start()
+    self._threads.append(thread)
+
+  def _work(self):
+    while True:
+      work = self._queue.get()
+      if work is None:
+        return
+
+      future, fn, args, kwargs = work
+      try:
+        result = fn(*args, **kwargs)
+      except Exception as err:
+        future.set_exception(err)
+      else:
+        future.set_result(result)
+
+      with self._lock:
+        self._idle += 1
+
+
+class ExchangeScheduler(object):
+  """
+  Calls functions after a delay, all from one daemon thread, so waiting to retry doesn't cost a thread per
+  request. ::
+
+      scheduler = ExchangeScheduler()
+      scheduler.call_later(1.5, do_something)
+
+  Functions should return quickly - the next one due waits until they do. The thread is started on first use.
+  """
+
+  def __init__(self):
+    self._condition = threading.Condition()
+    self._due = []
+    self._order = itertools.count()
+    self._thread = None
+
+  def call_later(self, delay, fn):
+    with self._condition:
+      heapq.heappush(self._due, (time.time() + delay, next(self._order), fn))
+      self._condition.notify()
+
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+  def _run(self):
+    while True:
+      with self._condition:
+        while not self._due or self._due[0][0] > time.time():
+          self._condition.wait(self._due[0][0] - time.time() if self._due else None)
+        _, _, fn = heapq.heappop(self._due)
+
+      try:
+        fn()
+      except Exception:
+        log.exception(u'Exception in scheduled call')
+
+
+def chunks(items, size):
+  """ Splits a list into lists of at most ``size`` items. """
+  if size < 1:
+    raise ValueError(u'Chunk size must be at least 1')
+
+  return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def map_in_chunks(fn, items, chunk_size, max_workers=4, retries=0, should_retry=None, backoff=None):
+  """
+  Splits ``items`` into chunks, calls ``fn`` with each chunk on up to ``max_workers`` threads and returns the
+  results in the same order as the chunks. See :func:`map_concurrently` for how failures are handled.
+  """
+  return map_concurrently(fn, chunks(items, chunk_size), max_workers=max_workers, retries=retries, should_retry=should_retry, backoff=backoff)
+
+
+def call_with_retries(fn, item, retries=0, should_retry=None, backoff=None):
+  """
+  Calls ``fn(item)``, and calls it again if it raises, up to ``retries`` times, as long as ``should_retry(error)``
+  says so. ``backoff(retry, error)`` gives the number of seconds to wait first. The last error is raised.
+  """
+  retry = 0
+  while True:
+    try:
+      return fn(item)
+    except Exception as err:
+      if retry >= retries or (should_retry is not None and not should_retry(err)):
+        raise
+
+      delay = backoff(retry, err) if backoff is not None else 0
+      log.info(u'Retrying after %s in %.2fs (retry %d of %d)', type(err).__name__, delay, retry + 1, retries)
+      time.sleep(delay)
+      retry += 1
+
+
+def map_concurrently(fn, work, max_workers=4, retries=0, should_retry=None, backoff=None):
+  """
+  Calls ``fn`` with each item of ``work`` on up to ``max_workers`` threads and returns the results in order.
+
+  An item that raises is retried on its own, as :func:`call_with_retries` does. If an item still fails, its error
+  is raised once the others have finished.
+  """
+  def run(item):
+    return call_with_retries(fn, item, retries=retries, should_retry=should_retry, backoff=backoff)
+
+  if len(work) <= 1 or max_workers <= 1:
+    return [run(item) for item in work]
+
+  with ExchangeWorkerPool(max_workers=min(max_workers, len(work))) as pool:
+    futures = [pool.submit(run, item) for item in work]
+
+  return [future.result() for future in futures]
@@ -8,26 +8,282 @@ import requests
 from requests_ntlm import HttpNtlmAuth
 
 import logging
+import random
+import threading
+import time
 
-from .exceptions import FailedExchangeException, OauthAuthException
+from .concurrency import ExchangeFuture, ExchangeScheduler, ExchangeWorkerPool
+from .tracing import ExchangeWireTracer
+
+try:
+  from Queue import Queue, Empty
+except ImportError:  # Python 3
+  from queue import Queue, Empty
+from .exceptions import FailedExchangeException, OauthAuthException, ExchangeInternalServerTransientErrorException, ExchangeResponseInterruptedException
 
 log = logging.getLogger('pyexchange')
 
+# When a failed request may be tried again. Failures where the server never saw the request (or refused it
+# outright with a 503) are safe to retry even for writes like CreateItem. Anything else may already have been
+# processed by Exchange, so we only retry it for idempotent (read-only) requests.
+RETRY_NEVER = u'never'
+RETRY_IDEMPOTENT = u'idempotent'
+RETRY_ALWAYS = u'always'
+
+# (exception type, HTTP status codes or None for any, when to retry) - the first matching row wins.
+DEFAULT_RETRY_CLASSIFICATION = (
+  (requests.exceptions.ConnectTimeout, None, RETRY_ALWAYS),
+  (requests.exceptions.HTTPError, (503,), RETRY_ALWAYS),
+  (requests.exceptions.HTTPError, tuple(range(500, 600)), RETRY_IDEMPOTENT),
+  (requests.exceptions.ConnectionError, None, RETRY_IDEMPOTENT),
+  (requests.exceptions.Timeout, None, RETRY_IDEMPOTENT),
+  (ExchangeInternalServerTransientErrorException, None, RETRY_IDEMPOTENT),
+)
+
+
+class ExchangeRetryPolicy(object):
+  """
+  Decides whether a failed request is tried again, and how long to wait first.
+
+  Waits grow exponentially (``backoff_factor * 2 ** retry``, capped at ``max_backoff``) with full jitter, so
+  workers that were throttled together don't all come back together. A ``Retry-After`` header on the failed
+  response is honored if it asks for longer than that.
+
+  Each call gets a deadline of ``timeout`` seconds: every attempt only gets the time that's left, and we never
+  sleep past the deadline.
+
+  Failures classified as ``RETRY_IDEMPOTENT`` are only retried for idempotent requests, unless ``retry_writes``
+  is set.
+  """
+
+  def __init__(self, backoff_factor=0.5, max_backoff=10, jitter=True, retry_writes=False, classification=DEFAULT_RETRY_CLASSIFICATION):
+    self.backoff_factor = backoff_factor
+    self.max_backoff = max_backoff
+    self.jitter = jitter
+    self.retry_writes = retry_writes
+    self.classification = classification
+
+  def classify(self, error):
+    """
+    Returns RETRY_NEVER, RETRY_IDEMPOTENT or RETRY_ALWAYS for the given exception. A connection failure is
+    classified by the ``requests`` error it wraps (its ``cause``).
+    """
+    error = getattr(error, 'cause', None) or error
+    status_code = self._status_code(error)
+
+    for error_type, status_codes, when in self.classification:
+      if not isinstance(error, error_type):
+        continue
+      if status_codes is not None and status_code not in status_codes:
+        continue
+      return when
+
+    return RETRY_NEVER
+
+  def is_retryable(self, error, idempotent=False):
+    when = self.classify(error)
+
+    if when == RETRY_ALWAYS:
+      return True
+    elif when == RETRY_IDEMPOTENT:
+      return idempotent or self.retry_writes
+    else:
+      return False
+
+  def backoff(self, retry, error=None):
+    """ Seconds to sleep before retry number ``retry`` (counting from 0). """
+    delay = min(self.max_backoff, self.backoff_factor * (2 ** retry))
+
+    if self.jitter:
+      delay = random.uniform(0, delay)
+
+    retry_after = self._retry_after(error)
+    if retry_after is not None:
+      delay = max(delay, min(retry_after, self.max_backoff))
+
+    return delay
+
+  def execute(self, func, retries=2, timeout=30, idempotent=False):
+    """
+    Calls ``func(attempt_timeout)`` until it returns, raises something we shouldn't retry, has been retried
+    ``retries`` times, or the deadline passes. The last error is re-raised unchanged.
+
+    ``attempt_timeout`` is the number of seconds left before the deadline, or None if there isn't one.
+    """
+    deadline = time.time() + timeout if timeout else None
+    retry = 0
+
+    while True:
+      try:
+        return func(self._remaining(deadline))
+      except Exception as err:
+        if retry >= retries or not self.is_retryable(err, idempotent=idempotent):
+          raise
+
+        delay = self.backoff(retry, err)
+        remaining = self._remaining(deadline)
+        if remaining is not None and delay >= remaining:
+          log.debug(u'Not retrying after %s, the deadline would pass first', type(err).__name__)
+          raise
+
+        log.info(u'Retrying in %.2fs after %s (retry %d of %d)', delay, type(err).__name__, retry + 1, retries)
+        time.sleep(delay)
+        retry += 1
+
+  def _remaining(self, deadline):
+    if deadline is None:
+      return None
+    return max(deadline - time.time(), 0.001)
+
+  def _status_code(self, error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+  def _retry_after(self, error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+
+    if not headers:
+      return None
+
+    try:
+      return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+      return None
+
+
+class ExchangeResponseStream(object):
+  """ A read-only, file-like view of a response body that's still coming in over the wire. """
+
+  def __init__(self, response, on_close=None):
+    self.response = response
+    self._on_close = on_close
+    self.response.raw.decode_content = True
+
+  def read(self, size=-1):
+    try:
+      data = self.response.raw.read(None if size is None or size < 0 else size)
+    except (IOError, requests.packages.urllib3.exceptions.HTTPError) as err:
+      raise ExchangeResponseInterruptedException(u'The response from Exchange was cut off: %s' % err)
+
+    if not data:
+      self.close()
+
+    return data
+
+  def close(self):
+    if self._on_close is None:
+      return
+
+    on_close, self._on_close = self._on_close, None
+    self.response.close()
+    on_close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+    return False
+
 
 class ExchangeBaseConnection(object):
   """ Base class for Exchange connections."""
 
-  def send(self, body, headers=None, retries=2, timeout=30, encoding="utf-8"):
+  url = None
+  retry_policy = None
+  wire_tracer = ExchangeWireTracer()
+
+  # Whether one connection can send requests from several threads at once. Batched calls only fetch
+  # concurrently by default when it can.
+  thread_safe = False
+
+  # send() hands back the raw response bytes, which lxml parses (and decodes) in one go. Set this to get
+  # decoded text instead, as older versions did.
+  decode_responses = False
+
+  def build_session(self):
     raise NotImplementedError
 
+  def acquire_session(self):
+    """ Returns the session to send the next request with. """
+    return self.build_session()
+
+  def release_session(self, session):
+    """ Called with the session from :meth:`acquire_session` once a request is done with it. """
+    pass
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8", idempotent=False, stream=False):
+    """
+    POSTs the body to Exchange and returns the response body as bytes (see :attr:`decode_responses`).
+
+    Connection resets, timeouts and 5xx responses are retried up to ``retries`` times according to the
+    connection's :class:`ExchangeRetryPolicy`. The whole call, retries included, gives up after ``timeout``
+    seconds. Unless ``idempotent`` is set, only failures where Exchange can't have processed the request
+    are retried.
+
+    With ``stream=True`` you get an :class:`ExchangeResponseStream` back as soon as the headers are in, and the
+    body is read as you go. Close it when you're done.
+    """
+    session = self.acquire_session()
+    retry_policy = self.retry_policy or ExchangeRetryPolicy()
+
+    trace = self.wire_tracer.begin() if self.wire_tracer is not None else None
+    if trace is not None:
+      trace.request(self.url, headers, body)
+
+    def post(attempt_timeout):
+      response = session.post(self.url, data=body, headers=headers, timeout=attempt_timeout, stream=stream)
+      response.raise_for_status()
+      return response
+
+    try:
+      response = retry_policy.execute(post, retries=retries, timeout=timeout, idempotent=idempotent)
+    except requests.exceptions.RequestException as err:
+      self.release_session(session)
+      if trace is not None:
+        if err.response is not None:
+          trace.response(err.response.status_code, err.response.headers, err.response.content)
+        else:
+          trace.error(err)
+      failure = FailedExchangeException(u'Unable to connect to Exchange: %s' % err)
+      failure.cause = err
+      raise failure
+    except Exception:
+      self.release_session(session)
+      raise
+
+    log.info(u'Got response: %s', response.status_code)
+
+    if stream:
+      if trace is not None:
+        trace.response(response.status_code, response.headers, None)
+
+      # the session stays busy until the body has been read
+      return ExchangeResponseStream(response, on_close=lambda: self.release_session(session))
+
+    self.release_session(session)
+
+    if trace is not None:
+      trace.response(response.status_code, response.headers, response.content)
+
+    if self.decode_responses:
+      return response.text
+
+    return response.content
+
 
 class ExchangeNTLMAuthConnection(ExchangeBaseConnection):
   """ Connection to Exchange that uses NTLM authentication """
 
-  def __init__(self, url, username, password, **kwargs):
+  def __init__(self, url, username, password, retry_policy=None, wire_tracer=None, **kwargs):
     self.url = url
     self.username = username
     self.password = password
+    self.retry_policy = retry_policy
+
+    if wire_tracer is not None:
+      self.wire_tracer = wire_tracer
 
     self.handler = None
     self.session = None
@@ -56,23 +312,167 @@ class ExchangeNTLMAuthConnection(ExchangeBaseConnection):
 
     return self.session
 
-  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
-    if not self.session:
-      self.session = self.build_session()
+
+
+class ExchangePooledNTLMAuthConnection(ExchangeNTLMAuthConnection):
+  """
+  An NTLM connection that's safe to share between threads. ::
+
+      connection = ExchangePooledNTLMAuthConnection(url=URL, username=USERNAME, password=PASSWORD, pool_size=8)
+      service = Exchange2010Service(connection)
+
+      # now use service from up to 8 threads at once
+
+  NTLM authenticates a TCP connection rather than a request, so every pooled session has its own
+  :class:`HttpNtlmAuth` and holds on to a single keep-alive socket. Each session pays for the NTLM handshake
+  once and then stays authenticated, instead of sessions stepping on each other's handshakes.
+
+  By default sessions are checked out for the length of a request and handed back afterwards; a thread waits
+  (up to ``checkout_timeout`` seconds) when all ``pool_size`` sessions are busy. With ``per_thread=True`` each
+  thread keeps the session it checked out for as long as it lives, and it goes back to the pool once the thread
+  has finished. There are still never more than ``pool_size`` sessions.
+
+  Once :meth:`close` has been called, threads waiting for a session and any that ask for one afterwards get a
+  :class:`FailedExchangeException`.
+  """
+
+  # how often a thread waiting for a per-thread session checks for sessions left behind by finished threads
+  RECLAIM_INTERVAL = 0.1
+
+  thread_safe = True
+
+  def __init__(self, url, username, password, pool_size=10, per_thread=False, checkout_timeout=None, retry_policy=None, **kwargs):
+    super(ExchangePooledNTLMAuthConnection, self).__init__(url, username, password, retry_policy=retry_policy, **kwargs)
+
+    if pool_size < 1:
+      raise ValueError(u'pool_size must be at least 1')
+
+    self.pool_size = pool_size
+    self.per_thread = per_thread
+    self.checkout_timeout = checkout_timeout
+
+    self._idle_sessions = Queue()
+    self._all_sessions = []
+    self._checkout_count = 0
+    self._lock = threading.Lock()
+    self._by_thread = {}
+    self._closed = False
+
+  def build_session(self):
+    """ Builds a new session with its own NTLM authentication and a single keep-alive socket. """
+    log.debug(u'Constructing pooled session')
+
+    session = requests.Session()
+    session.auth = HttpNtlmAuth(self.username, self.password)
+
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount(u'http://', adapter)
+    session.mount(u'https://', adapter)
+
+    return session
+
+  def acquire_session(self):
+    if not self.per_thread:
+      return self._check_out()
+
+    thread = threading.current_thread()
+    with self._lock:
+      session = self._by_thread.get(thread)
+
+    if session is None:
+      self._reclaim_finished_threads()
+      session = self._check_out()
+      with self._lock:
+        self._by_thread[thread] = session
+
+    return session
+
+  def release_session(self, session):
+    if not self.per_thread:
+      self._idle_sessions.put(session)
+
+  def close(self):
+    """ Closes every session the pool has built, and their sockets. The pool can't be used afterwards. """
+    with self._lock:
+      self._closed = True
+      sessions, self._all_sessions = self._all_sessions, []
+      idle_sessions, self._idle_sessions = self._idle_sessions, Queue()
+      self._checkout_count = 0
+      self._by_thread = {}
+
+    # wakes up the threads waiting for a session, one after the other (see _take)
+    idle_sessions.put(None)
+
+    for session in sessions:
+      session.close()
+
+  def _check_out(self):
+    with self._lock:
+      self._check_open()
+      idle_sessions = self._idle_sessions
 
     try:
-      response = self.session.post(self.url, data=body, headers=headers)
-      response.raise_for_status()
-    except requests.exceptions.RequestException as err:
-      log.debug(err.response.content)
-      raise FailedExchangeException(u'Unable to connect to Exchange: %s' % err)
+      return self._take(idle_sessions, block=False)
+    except Empty:
+      pass
+
+    with self._lock:
+      can_build = self._checkout_count < self.pool_size
+      if can_build:
+        self._checkout_count += 1
+
+    if can_build:
+      return self._new_session()
+
+    deadline = time.time() + self.checkout_timeout if self.checkout_timeout is not None else None
+    while True:
+      timeout = max(deadline - time.time(), 0) if deadline is not None else None
+      if self.per_thread:
+        timeout = self.RECLAIM_INTERVAL if timeout is None else min(timeout, self.RECLAIM_INTERVAL)
+
+      try:
+        return self._take(idle_sessions, timeout=timeout)
+      except Empty:
+        if deadline is not None and time.time() >= deadline:
+          raise FailedExchangeException(u'Timed out waiting for one of %d pooled Exchange sessions' % self.pool_size)
+        self._reclaim_finished_threads()
 
-    log.info(u'Got response: {code}'.format(code=response.status_code))
-    log.debug(u'Got response headers: {headers}'.format(headers=response.headers))
-    log.debug(u'Got body: {body}'.format(body=response.text))
+  def _take(self, idle_sessions, block=True, timeout=None):
+    """ Takes an idle session, or raises if the pool was closed - close() leaves a None behind in the old queue. """
+    session = idle_sessions.get(block, timeout)
 
-    return response.text
+    if session is None:
+      # hand the wake-up on to the next thread waiting on this queue
+      idle_sessions.put(None)
+      self._check_open()
 
+    return session
+
+  def _check_open(self):
+    if self._closed:
+      raise FailedExchangeException(u'This pooled Exchange connection has been closed')
+
+  def _reclaim_finished_threads(self):
+    with self._lock:
+      finished = [thread for thread in self._by_thread if not thread.is_alive()]
+      sessions = [self._by_thread.pop(thread) for thread in finished]
+
+    for session in sessions:
+      self._idle_sessions.put(session)
+
+  def _new_session(self):
+    session = self.build_session()
+
+    with self._lock:
+      closed = self._closed
+      if not closed:
+        self._all_sessions.append(session)
+
+    if closed:
+      session.close()
+      self._check_open()
+
+    return session
 
 
 class ExchangeRequestsOauth(object):
@@ -107,9 +507,13 @@ class ExchangeRequestsOauth(object):
 class ExchangeOauthConnection(ExchangeBaseConnection):
   """ Connection to Exchange that uses OAUTH authentication """
 
-  def __init__(self, url, access_token, **kwargs):
+  def __init__(self, url, access_token, retry_policy=None, wire_tracer=None, **kwargs):
     self.url = url
     self._access_token = access_token
+    self.retry_policy = retry_policy
+
+    if wire_tracer is not None:
+      self.wire_tracer = wire_tracer
 
     self.handler = None
     self.session = None
@@ -138,19 +542,173 @@ class ExchangeOauthConnection(ExchangeBaseConnection):
 
     return self.session
 
-  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
-    if not self.session:
-      self.session = self.build_session()
+
+class ExchangeBaseAsyncTransport(object):
+  """
+  Base class for transports used by :class:`pyexchange.exchange2010.aio.AsyncExchange2010Service`.
+
+  A transport's ``send()`` takes the same arguments as :meth:`ExchangeBaseConnection.send` but returns a future
+  right away instead of blocking. Futures only need ``add_done_callback()``, ``set_result()``,
+  ``set_exception()`` and ``result()``, so a transport built on an event loop can hand out its own futures by
+  overriding :meth:`create_future` and :meth:`call_later` - the service never blocks on them.
+  """
+
+  # shared by every transport, so retries waiting out their backoff all sit on one thread
+  scheduler = ExchangeScheduler()
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8", idempotent=False):
+    raise NotImplementedError
+
+  def create_future(self):
+    return ExchangeFuture()
+
+  def call_later(self, delay, fn):
+    """ Calls fn after delay seconds without blocking the caller. fn should return quickly. """
+    self.scheduler.call_later(delay, fn)
+
+  def then(self, future, fn):
+    """
+    Returns a new future for ``fn(future.result())``. If fn itself returns a future, the new future follows it.
+    Errors from either future, or raised by fn, end up in the returned future.
+    """
+    chained = self.create_future()
+
+    def on_done(completed):
+      error = completed.exception()
+      if error is not None:
+        chained.set_exception(error)
+        return
+
+      try:
+        result = fn(completed.result())
+      except Exception as err:
+        chained.set_exception(err)
+        return
+
+      if hasattr(result, 'add_done_callback'):
+        result.add_done_callback(lambda inner: self._copy_outcome(inner, chained))
+      else:
+        chained.set_result(result)
+
+    future.add_done_callback(on_done)
+    return chained
+
+  def gather(self, futures):
+    """ Returns a future for the list of results of all the given futures, in order. Fails on the first error. """
+    futures = list(futures)
+    gathered = self.create_future()
+    results = [None] * len(futures)
+    state = {u'pending': len(futures), u'failed': False}
+    lock = threading.Lock()
+
+    if not futures:
+      gathered.set_result(results)
+      return gathered
+
+    def collect(index, completed):
+      error = completed.exception()
+
+      with lock:
+        if state[u'failed']:
+          return
+        if error is not None:
+          state[u'failed'] = True
+        else:
+          results[index] = completed.result()
+          state[u'pending'] -= 1
+        finished = error is not None or state[u'pending'] == 0
+
+      if finished:
+        if error is not None:
+          gathered.set_exception(error)
+        else:
+          gathered.set_result(results)
+
+    for index, future in enumerate(futures):
+      future.add_done_callback(lambda completed, index=index: collect(index, completed))
+
+    return gathered
+
+  def _copy_outcome(self, source, destination):
+    error = source.exception()
+    if error is not None:
+      destination.set_exception(error)
+    else:
+      destination.set_result(source.result())
+
+
+class ExchangeThreadedTransport(ExchangeBaseAsyncTransport):
+  """
+  Runs a regular, blocking connection on a bounded pool of worker threads. ::
+
+      connection = ExchangePooledNTLMAuthConnection(url=URL, username=USERNAME, password=PASSWORD, pool_size=20)
+      service = AsyncExchange2010Service(ExchangeThreadedTransport(connection, max_workers=20))
+
+  The connection blocks, so every request on the wire holds one of the pool's threads until its response is in -
+  ``max_workers`` is both the thread count and the most requests in flight. Anything past that waits its turn in
+  a queue rather than getting a thread of its own. For thousands of requests in flight, use a transport built on
+  an event loop instead.
+
+  Only a thread safe connection (see :attr:`ExchangeBaseConnection.thread_safe`) gets more than one worker. On
+  any other connection requests are sent one at a time, whatever ``max_workers`` says.
+  """
+
+  def __init__(self, connection, max_workers=10):
+    if max_workers > 1 and not getattr(connection, 'thread_safe', False):
+      log.warning(u'%s is not thread safe, so requests will be sent one at a time', type(connection).__name__)
+      max_workers = 1
+
+    self.connection = connection
+    self.pool = ExchangeWorkerPool(max_workers=max_workers)
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8", idempotent=False):
+    return self.pool.submit(self.connection.send, body, headers, retries, timeout, encoding=encoding, idempotent=idempotent)
+
+  def close(self):
+    self.pool.shutdown()
+
+
+class ExchangeFakeTransport(ExchangeBaseAsyncTransport):
+  """
+  An in-process transport that never touches the network, for testing code that uses the async service.
+
+  ``responses`` is a list of response bodies (or exceptions to raise) handed out in order. Alternatively,
+  pass ``responder``, a callable that's given the request body and returns the response. Every request body
+  is kept in ``requests``. ::
+
+      transport = ExchangeFakeTransport(responses=[GET_ITEM_RESPONSE])
+      service = AsyncExchange2010Service(transport)
+      event = service.calendar().get_event(id=u'AABBCCDDEEFF').result()
+  """
+
+  def __init__(self, responses=None, responder=None):
+    self.responses = list(responses or [])
+    self.responder = responder
+    self.requests = []
+    self._lock = threading.Lock()
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8", idempotent=False):
+    future = self.create_future()
 
     try:
-      response = self.session.post(self.url, data=body, headers=headers)
-      response.raise_for_status()
-    except requests.exceptions.RequestException as err:
-      log.debug(err.response.content)
-      raise FailedExchangeException(u'Unable to connect to Exchange: %s' % err)
+      response = self._respond(body)
+      if isinstance(response, Exception):
+        raise response
+    except Exception as err:
+      future.set_exception(err)
+    else:
+      future.set_result(response)
+
+    return future
+
+  def _respond(self, body):
+    with self._lock:
+      self.requests.append(body)
+
+      if self.responder is not None:
+        return self.responder(body)
 
-    log.info(u'Got response: {code}'.format(code=response.status_code))
-    log.debug(u'Got response headers: {headers}'.format(headers=response.headers))
-    log.debug(u'Got body: {body}'.format(body=response.text))
+      if not self.responses:
+        raise FailedExchangeException(u'ExchangeFakeTransport has no response left for this request')
 
-    return response.text
+      return self.responses.pop(0)
@@ -39,6 +39,16 @@ class ExchangeInternalServerTransientErrorException(FailedExchangeException):
   pass
 
 
+class ExchangeResponseInterruptedException(FailedExchangeException):
+  """Raised when a streamed response from Exchange is cut off partway through. The request can be tried again."""
+  pass
+
+
+class ExchangeInvalidSyncStateException(FailedExchangeException):
+  """Raised when Exchange no longer accepts a sync state. Sync again from scratch, without one."""
+  pass
+
+
 class InvalidEventType(Exception):
   """Raised when a method for an event gets called on the wrong type of event."""
   pass
@@ -6,17 +6,21 @@ Unless required by applicable law or agreed to in writing, software?distributed
 """
 
 import logging
-from ..base.calendar import BaseExchangeCalendarEvent, BaseExchangeCalendarService, ExchangeEventOrganizer, ExchangeEventResponse
-from ..base.folder import BaseExchangeFolder, BaseExchangeFolderService
-from ..base.soap import ExchangeServiceSOAP
-from ..base.email import BaseExchangeEmailItem, BaseExchangeEmailService, BaseExchangeAttachmentItem
-from ..exceptions import FailedExchangeException, ExchangeStaleChangeKeyException, ExchangeItemNotFoundException, ExchangeInternalServerTransientErrorException, ExchangeIrresolvableConflictException, InvalidEventType
+from ..base.calendar import BaseExchangeCalendarEvent, BaseExchangeCalendarService, ExchangeEventOrganizer, ExchangeEventResponse, ExchangeEventResult, ExchangeFreeBusy
+from ..base.folder import BaseExchangeFolder, BaseExchangeFolderService, ExchangeFolderChanges
+from ..base.soap import ExchangeServiceSOAP, ExtractionPlan, SOAP_FAULT_TAG
+from ..base.email import BaseExchangeEmailItem, BaseExchangeEmailService, BaseExchangeAttachmentItem, ExchangeAttachmentDownload, ExchangeEmailChanges
+from ..interval_index import ExchangeIntervalIndex, merge_intervals
+from ..concurrency import ExchangeWorkerPool, call_with_retries, chunks, map_concurrently, map_in_chunks
+from ..utils import ChunkedBase64Decoder, convert_datetime_to_utc
+from ..exceptions import FailedExchangeException, ExchangeStaleChangeKeyException, ExchangeItemNotFoundException, ExchangeInternalServerTransientErrorException, ExchangeIrresolvableConflictException, ExchangeInvalidSyncStateException, ExchangeResponseInterruptedException, InvalidEventType
 
 from . import soap_request
 
 from lxml import etree
+from collections import OrderedDict
 from copy import deepcopy
-from datetime import date
+from datetime import date, timedelta
 import warnings
 
 log = logging.getLogger("pyexchange")
@@ -24,9 +28,83 @@ log = logging.getLogger("pyexchange")
 EMAIL_ITEM_DETAIL_ALL = "all"
 EMAIL_ITEM_DETAIL_IDS = "ids"
 
+RESPONSE_CODE_TAG = u'{%s}ResponseCode' % soap_request.MSG_NS
+CALENDAR_ITEM_TAG = u'{%s}CalendarItem' % soap_request.TYPE_NS
+TYPE_TAG = u'{%s}%%s' % soap_request.TYPE_NS
+FILE_ATTACHMENT_TAG = TYPE_TAG % u'FileAttachment'
+
+
+def should_retry_batch(error):
+  """
+  Whether a chunk of a batched request that failed with this error is worth sending once more. The connection
+  and the service have already retried transport errors and most transient ones by then, so only a transient
+  error from Exchange itself is.
+  """
+  return isinstance(error, ExchangeInternalServerTransientErrorException)
+
+
+def should_retry_stream(error):
+  """
+  Like :func:`should_retry_batch`, for a streamed request. Only the connection was retried there, so a response
+  that was cut off partway through is worth sending again too.
+  """
+  return should_retry_batch(error) or isinstance(error, ExchangeResponseInterruptedException)
+
+
+def default_max_workers(service, max_workers, default):
+  """
+  max_workers, if given. Otherwise ``default`` if the service's connection is safe to share between threads, or 1
+  if it isn't - the plain NTLM connection has a single session, and concurrent handshakes on it break each other.
+  """
+  if max_workers:
+    return max_workers
+
+  return default if getattr(service.connection, 'thread_safe', False) else 1
+
+
+def calendar_item_shape(fields):
+  """ The format and additional_properties to GetItem calendar items with: everything, or just these fields. """
+  if fields is None:
+    return {'format': u'AllProperties'}
+
+  return {'format': u'IdOnly',
+          'additional_properties': soap_request.field_uris(fields, soap_request.CALENDAR_FIELD_URIS),
+          'body_type': soap_request.body_type(fields)}
+
+
+def calendar_view_shape(fields):
+  """
+  Like :func:`calendar_item_shape`, for a CalendarView. Raises ValueError for fields a CalendarView won't send
+  back, like bodies and attendees.
+  """
+  if fields is None:
+    return {'format': u'AllProperties'}
+
+  return {'format': u'IdOnly', 'additional_properties': soap_request.find_item_field_uris(fields, soap_request.CALENDAR_FIELD_URIS)}
+
+
+def email_field_uris(fields):
+  """ The additional_properties to ask for emails with, or None for the default set. """
+  if fields is None:
+    return None
+
+  return soap_request.field_uris(fields, soap_request.EMAIL_FIELD_URIS)
+
 
 class Exchange2010Service(ExchangeServiceSOAP):
 
+  IDEMPOTENT_OPERATIONS = frozenset([
+    u'GetItem', u'FindItem', u'GetFolder', u'FindFolder', u'GetAttachment', u'GetInboxRules', u'SyncFolderItems',
+    u'GetUserAvailabilityRequest',
+  ])
+
+  # When True, writes to an event send the change key it already has instead of looking up the latest one first.
+  # A fresh one is only fetched, and the write sent again, if Exchange says the cached one is out of date.
+  optimistic_concurrency = False
+
+  # An ExchangeEventCache to keep fetched events in. get_event() then only fetches the ones that changed.
+  event_cache = None
+
   def calendar(self, id="calendar"):
     return Exchange2010CalendarService(service=self, calendar_id=id)
 
@@ -39,12 +117,12 @@ class Exchange2010Service(ExchangeServiceSOAP):
   def folder(self):
     return Exchange2010FolderService(service=self)
 
-  def _send_soap_request(self, body, headers=None, retries=2, timeout=30, encoding="utf-8"):
+  def _send_soap_request(self, body, headers=None, retries=2, timeout=30, encoding="utf-8", idempotent=False, stream=False):
     headers = {
       "Accept": "text/xml",
       "Content-type": "text/xml; charset=%s " % encoding
     }
-    return super(Exchange2010Service, self)._send_soap_request(body, headers=headers, retries=retries, timeout=timeout, encoding=encoding)
+    return super(Exchange2010Service, self)._send_soap_request(body, headers=headers, retries=retries, timeout=timeout, encoding=encoding, idempotent=idempotent, stream=stream)
 
   def _check_for_errors(self, xml_tree):
     super(Exchange2010Service, self)._check_for_errors(xml_tree)
@@ -61,26 +139,60 @@ class Exchange2010Service(ExchangeServiceSOAP):
     if not response_codes:
       raise FailedExchangeException(u"Exchange server did not return a status response", None)
 
+    for code in response_codes:
+      error = self._exception_for_response_code(code.text)
+      if error is not None:
+        raise error
+
+  def _check_for_streamed_errors(self, element):
+    if element.tag == RESPONSE_CODE_TAG:
+      error = self._exception_for_response_code(element.text)
+      if error is not None:
+        raise error
+
+  def _response_messages(self, response_xml):
+    """
+    Returns (message, error) for each response message in the response to a batched request, in the order the
+    items were sent. error is the exception for the message's <m:ResponseCode>, or None if it worked.
+    """
+    messages = response_xml.xpath(u'//m:ResponseMessages/*', namespaces=soap_request.NAMESPACES)
+    return [(message, self._exception_for_response_code(message.findtext(u'm:ResponseCode', namespaces=soap_request.NAMESPACES))) for message in messages]
+
+  def _item_id_in(self, message):
+    """ Returns (id, change key) of the item in a response message, or (None, None). """
+    id_element = message.find(u'm:Items/t:*/t:ItemId', namespaces=soap_request.NAMESPACES)
+    if id_element is None:
+      return None, None
+
+    return id_element.get(u"Id", None), id_element.get(u"ChangeKey", None)
+
+  def _exception_for_response_code(self, code):
+    """ Returns the exception to raise for an <m:ResponseCode>, or None if the code means success. """
+
     # The full (massive) list of possible return responses is here.
     # http://msdn.microsoft.com/en-us/library/aa580757(v=exchg.140).aspx
-    for code in response_codes:
-      if code.text == u"ErrorChangeKeyRequiredForWriteOperations":
-        # change key is missing or stale. we can fix that, so throw a special error
-        raise ExchangeStaleChangeKeyException(u"Exchange Fault (%s) from Exchange server" % code.text)
-      elif code.text == u"ErrorItemNotFound":
-        # exchange_invite_key wasn't found on the server
-        raise ExchangeItemNotFoundException(u"Exchange Fault (%s) from Exchange server" % code.text)
-      elif code.text == u"ErrorIrresolvableConflict":
-        # tried to update an item with an old change key
-        raise ExchangeIrresolvableConflictException(u"Exchange Fault (%s) from Exchange server" % code.text)
-      elif code.text == u"ErrorInternalServerTransientError":
-        # temporary internal server error. throw a special error so we can retry
-        raise ExchangeInternalServerTransientErrorException(u"Exchange Fault (%s) from Exchange server" % code.text)
-      elif code.text == u"ErrorCalendarOccurrenceIndexIsOutOfRecurrenceRange":
-        # just means some or all of the requested instances are out of range
-        pass
-      elif code.text != u"NoError":
-        raise FailedExchangeException(u"Exchange Fault (%s) from Exchange server" % code.text)
+    if code == u"ErrorChangeKeyRequiredForWriteOperations":
+      # change key is missing or stale. we can fix that, so throw a special error
+      return ExchangeStaleChangeKeyException(u"Exchange Fault (%s) from Exchange server" % code)
+    elif code == u"ErrorItemNotFound":
+      # exchange_invite_key wasn't found on the server
+      return ExchangeItemNotFoundException(u"Exchange Fault (%s) from Exchange server" % code)
+    elif code == u"ErrorIrresolvableConflict":
+      # tried to update an item with an old change key
+      return ExchangeIrresolvableConflictException(u"Exchange Fault (%s) from Exchange server" % code)
+    elif code == u"ErrorInternalServerTransientError":
+      # temporary internal server error. throw a special error so we can retry
+      return ExchangeInternalServerTransientErrorException(u"Exchange Fault (%s) from Exchange server" % code)
+    elif code == u"ErrorInvalidSyncStateData":
+      # the sync state is corrupt, or too old - the caller needs to sync from scratch
+      return ExchangeInvalidSyncStateException(u"Exchange Fault (%s) from Exchange server" % code)
+    elif code == u"ErrorCalendarOccurrenceIndexIsOutOfRecurrenceRange":
+      # just means some or all of the requested instances are out of range
+      return None
+    elif code != u"NoError":
+      return FailedExchangeException(u"Exchange Fault (%s) from Exchange server" % code)
+
+    return None
 
 
 class Exchange2010EmailService(BaseExchangeEmailService):
@@ -88,11 +200,93 @@ class Exchange2010EmailService(BaseExchangeEmailService):
   The service implementation for email handling
   """
 
-  def get_email(self, email_id):
+  # how many GetAttachment requests download_attachments() runs at once, on a thread safe connection
+  DOWNLOAD_MAX_WORKERS = 4
+
+  def get_email(self, email_id, fields=None):
+    """
+    Gets an exchange email item back. Pass a list of ``fields`` (like ``[u'subject', u'sender']``) to only fetch those.
+    """
+    return Exchange2010EmailItem(self.service, id=email_id, fields=fields)
+
+  def get_emails(self, email_ids, fields=None, skip_missing=False, retries=None):
+    """
+    Gets many emails with a GetItem per ``Exchange2010EmailList.FETCH_CHUNK_SIZE`` ids, and returns them in order.
+    The requests go several at once when the connection is safe to share between threads, and one at a time
+    otherwise. With ``skip_missing=True``, emails that have been deleted in the meantime are left out instead of
+    raising ``ExchangeItemNotFoundException``.
+
+    A request that fails with a transient error from Exchange is sent again up to ``retries`` times
+    (``Exchange2010EmailList.FETCH_RETRIES`` by default).
+    """
+    retries = Exchange2010EmailList.FETCH_RETRIES if retries is None else retries
+
+    def fetch_chunk(ids):
+      body = soap_request.get_email(ids, additional_properties=email_field_uris(fields), body_type=soap_request.body_type(fields))
+      response_xml = self.service.send(body, check_response_codes=False)
+
+      emails = []
+      for message, error in self.service._response_messages(response_xml):
+        if error is None:
+          emails.extend(Exchange2010EmailItem(self.service, xml=soap_request.M.Items(item), fields=fields)
+                        for item in message.iterfind(u'm:Items/t:Message', namespaces=soap_request.NAMESPACES))
+        elif not (skip_missing and isinstance(error, ExchangeItemNotFoundException)):
+          raise error
+
+      return emails
+
+    fetched = map_in_chunks(fetch_chunk, email_ids, Exchange2010EmailList.FETCH_CHUNK_SIZE,
+                            max_workers=default_max_workers(self.service, None, Exchange2010EmailList.FETCH_MAX_WORKERS),
+                            retries=retries,
+                            should_retry=should_retry_batch,
+                            backoff=self.service.retry_policy.backoff)
+
+    return [email for chunk in fetched for email in chunk]
+
+  def _emails_from_response(self, response_xml, fields=None):
+    messages = response_xml.xpath(u'//m:GetItemResponseMessage/m:Items/t:Message', namespaces=soap_request.NAMESPACES)
+    return [Exchange2010EmailItem(self.service, xml=soap_request.M.Items(message), fields=fields) for message in messages]
+
+  def iter_changes(self, sync_state=None, max_changes=512, hydrate=False, fields=None):
+    """
+    Yields the messages created, updated, deleted and marked read or unread in the folder since ``sync_state``,
+    a page of up to ``max_changes`` at a time, as ``ExchangeEmailChanges``. ::
+
+        for changes in service.mail(folder_id=u'inbox').iter_changes(sync_state=saved_state, hydrate=True):
+          for email in changes.emails:
+            print email.subject
+          saved_state = changes.sync_state
+
+    Save each page's ``sync_state`` once you've dealt with it, and pass it in next time to only get what's changed
+    since. Without one, every message in the folder comes back as created.
+
+    With ``hydrate=True``, the created messages are fetched with batched GetItem requests into ``emails`` (just
+    their ``fields``, if given). Messages deleted before they could be fetched are left out.
+    """
+    for changes in self.service.folder().iter_item_changes(self.folder_id, sync_state=sync_state, max_changes=max_changes):
+      yield self._email_changes(changes, hydrate, fields)
+
+  def sync_emails(self, sync_state=None, max_changes=512, hydrate=False, fields=None):
     """
-    Gets an exchange email item back
+    Like :meth:`iter_changes`, but gets every page and returns a single ``ExchangeEmailChanges``.
     """
-    return Exchange2010EmailItem(self.service, id=email_id)
+    changes = self.service.folder().sync_items(self.folder_id, sync_state=sync_state, max_changes=max_changes)
+    return self._email_changes(changes, hydrate, fields)
+
+  def _email_changes(self, changes, hydrate, fields):
+    emails = None
+    if hydrate:
+      emails = self.get_emails(changes.created, fields=fields, skip_missing=True)
+
+    return ExchangeEmailChanges(
+      created=changes.created,
+      updated=changes.updated,
+      deleted=changes.deleted,
+      read_flag_changed=changes.read_flag_changed,
+      emails=emails,
+      sync_state=changes.sync_state,
+      includes_last_item=changes.includes_last_item,
+    )
 
 
   def get_attachment(self, attachment_id):
@@ -103,16 +297,162 @@ class Exchange2010EmailService(BaseExchangeEmailService):
 
 
 
-  def list_emails(self, per_page=10, offset=0, folder_id="inbox", detail=EMAIL_ITEM_DETAIL_ALL):
+  def download_attachment(self, attachment_id, sink):
+    """
+    Writes the content of an attachment to ``sink`` (anything with a ``write`` method, like an open file) and
+    returns the attachment, without its content. The response is parsed and decoded as it comes in, so memory
+    use stays at a few MB however big the attachment is. ::
+
+        with open(u'report.pdf', u'wb') as sink:
+          attachment = service.mail().download_attachment(attachment_id, sink)
+    """
+    stream = self.service.send_stream(soap_request.get_attachment(attachment_id))
+
+    try:
+      attachments = self.service._parse_with_target(stream, Exchange2010AttachmentStreamTarget(self.service, lambda attachment: sink))
+    finally:
+      stream.close()
+
+    if not attachments:
+      raise FailedExchangeException(u"Exchange server did not return attachment %s" % attachment_id)
+
+    return attachments[0]
+
+  def download_attachments(self, attachments, open_sink, max_request_size=16 * 1024 * 1024, max_per_request=50, max_workers=None, retries=1):
+    """
+    Downloads many attachments at once, streaming each one's content into a sink of its own.
+
+    ``attachments`` can be attachment IDs, or the dicts from an email's ``attachments`` (whose ``size`` is used
+    to keep each request under ``max_request_size`` bytes of content). They're fetched with GetAttachment
+    requests of up to ``max_per_request`` IDs. On a thread safe connection (like
+    :class:`~pyexchange.connection.ExchangePooledNTLMAuthConnection`) up to ``max_workers`` run at a time, 4 by
+    default; otherwise they're sent one at a time.
+
+    ``open_sink`` is called with each attachment (name, content type etc. filled in) and should return a
+    file-like object to write its content to. It's closed once the content has been written, or once the request
+    fails partway through it. It may be called from worker threads. ::
+
+        results = service.mail().download_attachments(
+          email.attachments,
+          open_sink=lambda attachment: open(os.path.join(archive, attachment.id), u'wb'),
+        )
+
+    Returns an :class:`~pyexchange.base.email.ExchangeAttachmentDownload` for each attachment, in order, with
+    either the attachment or the error it failed with. One failing attachment, or one failing request, doesn't
+    stop the others. A request that's cut off or hits a transient error is sent again, up to ``retries`` times,
+    for just the attachments it hadn't finished yet. If it still fails, those attachments get its error.
     """
-    Lists the emails from the specified folder
+    wanted = []
+    for attachment in attachments:
+      if isinstance(attachment, dict):
+        wanted.append((attachment[u'attachment_id'], attachment.get(u'size') or 0))
+      else:
+        wanted.append((attachment, 0))
+
+    # group them up, closing a request once it's full or the next attachment would take it over budget
+    requests = []
+    for attachment_id, size in wanted:
+      if not requests or len(requests[-1][0]) >= max_per_request or (requests[-1][0] and requests[-1][1] + size > max_request_size):
+        requests.append(([], 0))
+
+      ids, total = requests[-1]
+      ids.append(attachment_id)
+      requests[-1] = (ids, total + size)
+
+    def fetch(request):
+      ids, finished = request
+      pending = [attachment_id for attachment_id in ids if attachment_id not in finished]
+      target = Exchange2010AttachmentStreamTarget(self.service, open_sink, close_sinks=True, raise_errors=False)
+
+      try:
+        if pending:
+          stream = self.service.send_stream(soap_request.get_attachment(pending))
+          try:
+            self.service._parse_with_target(stream, target)
+          finally:
+            stream.close()
+      finally:
+        target.close_sink()
+
+        # keep whatever made it, so a retry only asks for the rest
+        for index, attachment_id in enumerate(pending):
+          if index in target.errors:
+            finished[attachment_id] = ExchangeAttachmentDownload(attachment_id, None, target.errors[index])
+          elif index in target.by_message:
+            finished[attachment_id] = ExchangeAttachmentDownload(attachment_id, target.by_message[index], None)
+
+      return [finished[attachment_id] if attachment_id in finished else
+              ExchangeAttachmentDownload(attachment_id, None, FailedExchangeException(u"Exchange server did not return attachment %s" % attachment_id))
+              for attachment_id in ids]
+
+    def fetch_with_retries(request):
+      ids, finished = request
+      try:
+        return call_with_retries(fetch, request, retries=retries, should_retry=should_retry_stream, backoff=self.service.retry_policy.backoff)
+      except FailedExchangeException as err:
+        # the attachments that made it before the request failed keep their results
+        return [finished.get(attachment_id) or ExchangeAttachmentDownload(attachment_id, None, err) for attachment_id in ids]
+
+    fetched = map_concurrently(fetch_with_retries, [(ids, {}) for ids, _ in requests],
+                               max_workers=default_max_workers(self.service, max_workers, self.DOWNLOAD_MAX_WORKERS))
+
+    return [result for results in fetched for result in results]
+
+  def list_emails(self, per_page=10, offset=0, folder_id="inbox", detail=EMAIL_ITEM_DETAIL_ALL, fields=None):
+    """
+    Lists the emails from the specified folder. ``fields`` is a list of the properties you need (see
+    ``soap_request.EMAIL_FIELD_URIS``), so Exchange doesn't send back every body. FindItem won't send back
+    bodies, recipients or attachments, so when ``fields`` has any of those the emails are fetched by ID.
     """
     return Exchange2010EmailList(self.service,
                                 folder_id=self.folder_id,
                                 max_entries=per_page,
                                 offset=offset,
-                                detail=detail)
+                                detail=detail,
+                                fields=fields)
+
+
+  def iter_emails(self, per_page=100, detail=EMAIL_ITEM_DETAIL_ALL, prefetch=False, fields=None):
+    """
+    Yields every email in the folder, fetching it a page of ``per_page`` at a time as you go. ::
+
+        for email in service.mail(folder_id=u'inbox').iter_emails():
+          print email.subject
+
+    Each page starts at the ``IndexedPagingOffset`` Exchange handed back with the page before. Mail that arrives
+    while you're iterating pushes older mail down the folder, so anything that turns up again from the page
+    before is skipped. With ``prefetch=True`` the next page is fetched in the background while you work through
+    the current one, as long as the connection is safe to share between threads (like
+    :class:`~pyexchange.connection.ExchangePooledNTLMAuthConnection`) - otherwise pages are fetched as you go.
+    At most two pages are held in memory either way.
+    """
+    prefetch = prefetch and getattr(self.service.connection, 'thread_safe', False)
+    pool = ExchangeWorkerPool(max_workers=1) if prefetch else None
+
+    def fetch(offset):
+      return Exchange2010EmailList(self.service, folder_id=self.folder_id, max_entries=per_page, offset=offset, detail=detail, fields=fields)
+
+    try:
+      page = fetch(0)
+      previous_ids = set()
+
+      while True:
+        next_page = None
+        if pool is not None and not page.is_last_page:
+          next_page = pool.submit(fetch, page.next_offset)
+
+        for email in page.emails:
+          if email.id not in previous_ids:
+            yield email
+
+        if page.is_last_page or page.count == 0 or page.next_offset <= page.offset:
+          return
 
+        previous_ids = set(page.email_ids)
+        page = next_page.result() if next_page is not None else fetch(page.next_offset)
+    finally:
+      if pool is not None:
+        pool.shutdown(wait=False)
 
   def get_inbox(self):
     """
@@ -128,15 +468,84 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
   The implementation of the ExchangeEmailItem
   """
 
+  MESSAGE_PROPERTY_MAP = {
+    "subject":{
+      "xpath": u'//m:Items/t:Message/t:Subject'
+    },
+    "body_html":{
+      "xpath": u'//m:Items/t:Message/t:Body[@BodyType="HTML"]'
+    },
+    "size":{
+      "xpath": u'//m:Items/t:Message/t:Size',
+      "cast":u"int"
+    },
+    "sent_time":{
+      "xpath": u'//m:Items/t:Message/t:DateTimeSent',
+      "cast":u"datetime"
+    },
+    "created_time":{
+      "xpath": u'//m:Items/t:Message/t:DateTimeCreated',
+      "cast":u"datetime"
+    },
+    "received_time":{
+      "xpath": u'//m:Items/t:Message/t:DateTimeReceived',
+      "cast":u"datetime"
+    },
+    "has_attachments":{
+      "xpath": u'//m:Items/t:Message/t:HasAttachments',
+      "cast":u"bool"
+    },
+    "is_read":{
+      "xpath": u'//m:Items/t:Message/t:IsRead',
+      "cast":u"bool"
+    }
+  }
+
+  MAILBOX_PROPERTY_MAP = {
+    u'name':
+    {
+      u'xpath': u't:Name'
+    },
+    u'email':
+    {
+      u'xpath': u't:EmailAddress'
+    },
+    u'routing_type':
+    {
+      u'xpath': u't:ResponseType'
+    }
+  }
+
+  ATTACHMENT_PROPERTY_MAP = {
+    u'name':
+    {
+      u'xpath': u't:Name'
+    },
+    u'content_type':
+    {
+      u'xpath': u't:ContentType'
+    },
+    u'size':
+    {
+      u'xpath': u't:Size',
+      u'cast': u'int'
+    }
+  }
+
+  def __init__(self, service, id=None, folder_id=u'inbox', xml=None, fields=None, **kwargs):
+    # only these properties are fetched and read, when given
+    self._fields = fields
+    super(Exchange2010EmailItem, self).__init__(service, id=id, folder_id=folder_id, xml=xml, **kwargs)
+
   def _init_from_service(self, id):
     log.debug(u'Creating new Exchange2010EmailItem object from ID')
-    body = soap_request.get_email(id)
+    body = soap_request.get_email(id, additional_properties=email_field_uris(self._fields), body_type=soap_request.body_type(self._fields))
     response_xml = self.service.send(body)
     properties = self._parse_response_for_get_email(response_xml)
 
     self.update_properties(properties)
     self._id = id
-    log.debug(u'Created new email object with ID: %s' % self._id)
+    log.debug(u'Created new email object with ID: %s', self._id)
 
     return self
 
@@ -148,7 +557,7 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
     self.update_properties(properties)
     self._id, self._change_key = self._parse_id_and_change_key_from_response(xml)
 
-    log.debug(u'Created new email object with ID: %s' % self._id)
+    log.debug(u'Created new email object with ID: %s', self._id)
 
     return self
 
@@ -216,60 +625,43 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
       </m:ResponseMessages>
     </m:GetItemResponse>
     """
-    property_map = {
-      "subject":{
-        "xpath": u'//m:Items/t:Message/t:Subject'
-      },
-      "body_html":{
-        "xpath": u'//m:Items/t:Message/t:Body[@BodyType="HTML"]'
-      },
-      "size":{
-        "xpath": u'//m:Items/t:Message/t:Size',
-        "cast":u"int"
-      },
-      "sent_time":{
-        "xpath": u'//m:Items/t:Message/t:DateTimeSent',
-        "cast":u"datetime"
-      },
-      "created_time":{
-        "xpath": u'//m:Items/t:Message/t:DateTimeCreated',
-        "cast":u"datetime"
-      },
-      "received_time":{
-        "xpath": u'//m:Items/t:Message/t:DateTimeReceived',
-        "cast":u"datetime"
-      },
-      "has_attachments":{
-        "xpath": u'//m:Items/t:Message/t:HasAttachments',
-        "cast":u"bool"
-      },
-      "is_read":{
-        "xpath": u'//m:Items/t:Message/t:IsRead',
-        "cast":u"bool"
-      }
-    }
+    property_map = self.MESSAGE_PROPERTY_MAP
+    fields = self._fields
+    if fields is not None:
+      property_map = dict((key, value) for key, value in property_map.items() if key in fields)
 
     result = self.service._xpath_to_dict(element=xml_resp, property_map=property_map, namespace_map=soap_request.NAMESPACES)
 
     #extract the sender from the xpath
-    sender_dict = self._parse_email_sender(xml_resp)
-    result["sender"] = sender_dict
+    if fields is None or "sender" in fields:
+      sender_dict = self._parse_email_sender(xml_resp)
+      result["sender"] = sender_dict
 
     #extract the recipients from the message
-    recipients_dict = self._parse_email_recipients(xml_resp)
-    result["recipients"] = recipients_dict
+    if fields is None or "recipients" in fields:
+      recipients_dict = self._parse_email_recipients(xml_resp)
+      result["recipients"] = recipients_dict
 
     #Extract the cc list from it
-    cc_dict = self._parse_email_cc_recipients(xml_resp)
-    result["cc_recipients"] = cc_dict
+    if fields is None or "cc_recipients" in fields:
+      cc_dict = self._parse_email_cc_recipients(xml_resp)
+      result["cc_recipients"] = cc_dict
 
-    if result.get("has_attachments"):
+    if (fields is None or "attachments" in fields) and self._has_attachments(xml_resp, result):
       attachments = self._parse_email_attachments(xml_resp)
       result["attachments"] = attachments
 
     return result
 
 
+  def _has_attachments(self, xml_resp, result):
+    if "has_attachments" in result:
+      return result["has_attachments"]
+
+    # has_attachments wasn't one of the fields asked for, but it was sent back anyway
+    found = xml_resp.xpath(u'//m:Items/t:Message/t:HasAttachments', namespaces=soap_request.NAMESPACES)
+    return bool(found) and found[0].text == u'true'
+
   def _parse_mailbox_item(self, xml_resp):
     """
     Parses a mailbox item which is in the following format
@@ -280,22 +672,7 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
       <t:RoutingType>SMTP</t:RoutingType>
     </t:Mailbox>
     """
-    property_map = {
-      u'name':
-      {
-        u'xpath': u't:Name'
-      },
-      u'email':
-      {
-        u'xpath': u't:EmailAddress'
-      },
-      u'routing_type':
-      {
-        u'xpath': u't:ResponseType'
-      }
-    }
-
-    result = self.service._xpath_to_dict(element=xml_resp, property_map=property_map, namespace_map=soap_request.NAMESPACES)
+    result = self.service._xpath_to_dict(element=xml_resp, property_map=self.MAILBOX_PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
     return result
 
 
@@ -349,17 +726,6 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
       </t:FileAttachment>
     </t:Attachments>
     """
-    property_map = {
-      u'name':
-      {
-        u'xpath': u't:Name'
-      },
-      u'content_type':
-      {
-        u'xpath': u't:ContentType'
-      }
-    }
-
     xml_path = u'//m:Items/t:Message/t:Attachments/t:FileAttachment'
     attachments = xml_resp.xpath(xml_path, namespaces=soap_request.NAMESPACES)
 
@@ -370,7 +736,7 @@ class Exchange2010EmailItem(BaseExchangeEmailItem):
     results = []
     for attach in attachments:
       result = self.service._xpath_to_dict(element=attach,
-                                           property_map=property_map,
+                                           property_map=self.ATTACHMENT_PROPERTY_MAP,
                                            namespace_map=soap_request.NAMESPACES)
 
       attach_id_obj = attach.xpath(u't:AttachmentId', namespaces=soap_request.NAMESPACES)
@@ -389,13 +755,22 @@ class Exchange2010EmailList(object):
   Creates and stores a list of Exchange2010EmailItem in the self.emails field
   """
 
-  def __init__(self, service=None, max_entries=10, offset=0, folder_id="inbox", detail=EMAIL_ITEM_DETAIL_ALL):
+  # with detail=ids, emails are fetched this many at a time, with up to this many requests in flight on a thread
+  # safe connection, and a request is sent this many more times after a transient error from Exchange.
+  FETCH_CHUNK_SIZE = 100
+  FETCH_MAX_WORKERS = 4
+  FETCH_RETRIES = 1
+
+  def __init__(self, service=None, max_entries=10, offset=0, folder_id="inbox", detail=EMAIL_ITEM_DETAIL_ALL, xml=None, fields=None):
     """
     :param service:
     :param max_entries:
     :param offset:
     :param folder_id:
     :param detail: It can be all|ids depending how much data we should fetch
+    :param fields: the properties to fetch for each email, instead of all of them
+    :param xml: an already retrieved FindItem response. No requests are made, so with detail=ids
+      only email_ids gets filled in.
 
     :return:
     """
@@ -404,19 +779,34 @@ class Exchange2010EmailList(object):
     self.emails = []
     self.email_ids = []
     self.detail = detail
+    self.fields = fields
+
+    # where this page sits in the folder, from the <m:RootFolder> of the response
+    self.total_count = None
+    self.next_offset = None
+    self.includes_last_item = True
 
     self.max_entries = max_entries
     self.offset = offset
     self.folder_id = folder_id
 
-    body = soap_request.find_emails(folder_id=folder_id,
-                                    max_per_page=self.max_entries,
-                                    offset=self.offset,
-                                    detail=detail)
+    self._fetch_emails_by_id = xml is None
+
+    if xml is None:
+      # FindItem won't send back bodies, recipients or attachments, so those are fetched with GetItem
+      if fields is not None and soap_request.needs_get_item(fields, soap_request.EMAIL_FIELD_URIS):
+        self.detail = detail = EMAIL_ITEM_DETAIL_IDS
+
+      body = soap_request.find_emails(folder_id=folder_id,
+                                      max_per_page=self.max_entries,
+                                      offset=self.offset,
+                                      detail=detail,
+                                      additional_properties=email_field_uris(fields))
+
+      xml = self.service.send(body)
 
-    response_xml = self.service.send(body)
     #Loads the emails from the api
-    self._parse_response_for_all_emails(response_xml)
+    self._parse_response_for_all_emails(xml)
 
 
   def _parse_response_for_all_emails(self, xml_resp):
@@ -433,6 +823,8 @@ class Exchange2010EmailList(object):
               </t:Message>
 
     """
+    self._parse_paging_from_response(xml_resp)
+
     if self.detail == EMAIL_ITEM_DETAIL_IDS:
       items = xml_resp.xpath(u'//m:FindItemResponseMessage/m:RootFolder/t:Items/t:Message/t:ItemId', namespaces=soap_request.NAMESPACES)
     else:
@@ -444,24 +836,55 @@ class Exchange2010EmailList(object):
       return self
 
     self.count = len(items)
-    log.debug(u'Found %s items' % self.count)
+    log.debug(u'Found %s items', self.count)
 
     for item in items:
       if self.detail == EMAIL_ITEM_DETAIL_IDS:
-        item_id = item.get("Id", None)
-        self.email_ids.append(item_id)
-        self._add_email_from_id(item_id)
+        self.email_ids.append(item.get("Id", None))
       else:
         self._add_email_from_xml(soap_request.M.Items(deepcopy(item)))
 
+    if self.detail == EMAIL_ITEM_DETAIL_IDS and self._fetch_emails_by_id:
+      self._add_emails_from_ids(self.email_ids)
+
     return self
 
+  def _parse_paging_from_response(self, xml_resp):
+    root_folder = xml_resp.xpath(u'//m:FindItemResponseMessage/m:RootFolder', namespaces=soap_request.NAMESPACES)
+    if not root_folder:
+      return
+
+    root_folder = root_folder[0]
+
+    if root_folder.get(u'TotalItemsInView') is not None:
+      self.total_count = int(root_folder.get(u'TotalItemsInView'))
+    if root_folder.get(u'IndexedPagingOffset') is not None:
+      self.next_offset = int(root_folder.get(u'IndexedPagingOffset'))
+
+    self.includes_last_item = root_folder.get(u'IncludesLastItemInRange', u'true') == u'true'
+
+  @property
+  def is_last_page(self):
+    if self.includes_last_item or self.next_offset is None:
+      return True
+
+    return self.total_count is not None and self.next_offset >= self.total_count
+
+  def _add_emails_from_ids(self, item_ids):
+    """
+    Fetches the emails with a GetItem per FETCH_CHUNK_SIZE ids, and adds them in order
+    """
+    self.emails.extend(self.service.mail(folder_id=self.folder_id).get_emails(item_ids, fields=self.fields))
+
+  def _emails_from_response(self, response_xml):
+    return self.service.mail(folder_id=self.folder_id)._emails_from_response(response_xml, self.fields)
+
 
   def _add_email_from_id(self, item_id):
     """
     Adds an email by making a remote request
     """
-    email_item = Exchange2010EmailItem(self.service, id=item_id)
+    email_item = Exchange2010EmailItem(self.service, id=item_id, fields=self.fields)
     self.emails.append(email_item)
 
 
@@ -469,7 +892,7 @@ class Exchange2010EmailList(object):
     """
     You don't make another call just create one email item from xml request
     """
-    email_item = Exchange2010EmailItem(self.service, xml=xml_resp)
+    email_item = Exchange2010EmailItem(self.service, xml=xml_resp, fields=self.fields)
     self.emails.append(email_item)
     self.email_ids.append(email_item.id)
 
@@ -479,6 +902,21 @@ class Exchange2010AttachmentItem(BaseExchangeAttachmentItem):
   The implementation of the ExchangeEmailItem
   """
 
+  PROPERTY_MAP = {
+    "name":{
+      "xpath": u'//m:Attachments/t:FileAttachment/t:Name'
+    },
+    "content_type":{
+      "xpath": u'//m:Attachments/t:FileAttachment/t:ContentType'
+    },
+    "content_id":{
+      "xpath": u'//m:Attachments/t:FileAttachment/t:ContentId'
+    },
+    "content":{
+      "xpath": u'//m:Attachments/t:FileAttachment/t:Content'
+    }
+  }
+
   def _init_from_service(self, id):
     log.debug(u'Creating new Exchange2010AttachmentItem object from ID')
     body = soap_request.get_attachment(id)
@@ -487,7 +925,7 @@ class Exchange2010AttachmentItem(BaseExchangeAttachmentItem):
 
     self.update_properties(properties)
     self._id = id
-    log.debug(u'Created new event object with ID: %s' % self._id)
+    log.debug(u'Created new event object with ID: %s', self._id)
 
     return self
 
@@ -499,7 +937,7 @@ class Exchange2010AttachmentItem(BaseExchangeAttachmentItem):
     self.update_properties(properties)
     self._id = self._parse_id_and_change_key_from_response(xml)
 
-    log.debug(u'Created new email object with ID: %s' % self._id)
+    log.debug(u'Created new email object with ID: %s', self._id)
 
     return self
 
@@ -544,48 +982,687 @@ class Exchange2010AttachmentItem(BaseExchangeAttachmentItem):
       </m:ResponseMessages>
     </m:GetAttachmentResponse>
     """
-    property_map = {
-      "name":{
-        "xpath": u'//m:Attachments/t:FileAttachment/t:Name'
-      },
-      "content_type":{
-        "xpath": u'//m:Attachments/t:FileAttachment/t:ContentType'
-      },
-      "content_id":{
-        "xpath": u'//m:Attachments/t:FileAttachment/t:ContentId'
-      },
-      "content":{
-        "xpath": u'//m:Attachments/t:FileAttachment/t:Content'
-      }
-    }
-
-    result = self.service._xpath_to_dict(element=xml_resp, property_map=property_map, namespace_map=soap_request.NAMESPACES)
+    result = self.service._xpath_to_dict(element=xml_resp, property_map=self.PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
 
     return result
 
 
 
 
+class Exchange2010AttachmentStreamTarget(object):
+  """
+  An lxml parser target for GetAttachment responses. Each file attachment's content is base64 decoded and written
+  out as it's parsed, so it never has to fit in memory.
+
+  ``open_sink`` is called with each attachment (with its ID, name, content type and content ID filled in) just
+  before its content starts, and returns a file-like object to write the decoded content to. With ``close_sinks``
+  it's closed again once the content has been written. Parsing returns the list of attachments, without their
+  content.
+
+  Error response codes raise, unless ``raise_errors`` is off. Then they're kept in ``errors`` instead, keyed by
+  the position of the response message, which matches the position of the ID in the request. ``by_message``
+  has the attachments keyed the same way.
+  """
+
+  FIELDS = {
+    TYPE_TAG % u'Name': u'name',
+    TYPE_TAG % u'ContentType': u'content_type',
+    TYPE_TAG % u'ContentId': u'content_id',
+  }
+
+  def __init__(self, service, open_sink, close_sinks=False, raise_errors=True):
+    self.service = service
+    self.open_sink = open_sink
+    self.close_sinks = close_sinks
+    self.raise_errors = raise_errors
+    self.attachments = []
+    self.by_message = {}
+    self.errors = {}
+
+    self._messages = 0
+    self._sink = None
+
+    self._attachment = None
+    self._field = None
+    self._text = []
+    self._decoder = None
+
+  def start(self, tag, attrib):
+    if tag == FILE_ATTACHMENT_TAG:
+      self._attachment = Exchange2010AttachmentItem(self.service)
+    elif tag == RESPONSE_CODE_TAG:
+      self._collect(tag)
+    elif self._attachment is None:
+      return
+    elif tag == TYPE_TAG % u'AttachmentId':
+      self._attachment._id = attrib.get(u'Id')
+    elif tag in self.FIELDS:
+      self._collect(tag)
+    elif tag == TYPE_TAG % u'Content':
+      self._sink = self.open_sink(self._attachment)
+      self._decoder = ChunkedBase64Decoder(self._sink)
+
+  def data(self, text):
+    if self._decoder is not None:
+      self._decoder.write(text)
+    elif self._field is not None:
+      self._text.append(text)
+
+  def end(self, tag):
+    if tag == SOAP_FAULT_TAG:
+      raise FailedExchangeException(u"SOAP Fault from Exchange server")
+
+    if self._decoder is not None and tag == TYPE_TAG % u'Content':
+      self._decoder.close()
+      self._attachment.size = self._decoder.size
+      self._decoder = None
+
+      if self.close_sinks:
+        self._sink.close()
+      self._sink = None
+    elif tag == self._field:
+      text = u''.join(self._text)
+      self._field = None
+
+      if tag == RESPONSE_CODE_TAG:
+        self._messages += 1
+
+        error = self.service._exception_for_response_code(text)
+        if error is not None:
+          if self.raise_errors:
+            raise error
+          self.errors[self._messages - 1] = error
+      else:
+        setattr(self._attachment, self.FIELDS[tag], text)
+    elif tag == FILE_ATTACHMENT_TAG:
+      self.attachments.append(self._attachment)
+      self.by_message.setdefault(self._messages - 1, self._attachment)
+      self._attachment = None
+
+  def close(self):
+    return self.attachments
+
+  def close_sink(self):
+    """ Closes the sink of an attachment whose content was still coming in, if there is one and close_sinks is on. """
+    sink, self._sink, self._decoder = self._sink, None, None
+
+    if sink is not None and self.close_sinks:
+      sink.close()
+
+  def _collect(self, tag):
+    self._field = tag
+    self._text = []
+
+
 class Exchange2010CalendarService(BaseExchangeCalendarService):
 
+  # how the bulk methods split up their requests. They only send several at once on a thread safe connection.
+  BATCH_CHUNK_SIZE = 100
+  BATCH_MAX_WORKERS = 4
+
+  # GetUserAvailability takes at most 100 mailboxes and 42 days at a time
+  AVAILABILITY_CHUNK_SIZE = 100
+  AVAILABILITY_MAX_DAYS = 42
+  AVAILABILITY_BUSY_TYPES = (u'Tentative', u'Busy', u'OOF')
+
   def event(self, id=None, **kwargs):
     return Exchange2010CalendarEvent(service=self.service, id=id, **kwargs)
 
-  def get_event(self, id):
-    return Exchange2010CalendarEvent(service=self.service, id=id)
+  def get_event(self, id, fields=None):
+    """
+    Gets an event. Pass a list of ``fields`` (like ``[u'subject', u'start', u'end']``) to only fetch those.
+
+    With an ``event_cache`` on the service, a cached event is used if its change key is still current.
+    """
+    if self.service.event_cache is not None and fields is None:
+      return self.get_events([id])[0]
+
+    return Exchange2010CalendarEvent(service=self.service, id=id, fields=fields)
+
+  def get_events(self, ids, chunk_size=None, max_workers=None):
+    """
+    Gets many events by ID, with GetItem requests of up to ``chunk_size`` events each, up to ``max_workers`` of
+    them at a time on a thread safe connection. Returns the events in the same order, or raises the first error.
+
+    With an ``event_cache`` on the service, the change keys of the cached events are checked first with an IdOnly
+    GetItem, which is much smaller than the events. Only events that changed, or weren't cached, are fetched
+    again, and then cached. Cached events that are gone from Exchange are dropped from the cache.
+    """
+    ids = list(ids)
+    cache = self.service.event_cache
+    chunk_size = chunk_size or self.BATCH_CHUNK_SIZE
+    max_workers = default_max_workers(self.service, max_workers, self.BATCH_MAX_WORKERS)
+
+    items = {}
+    errors = {}
+
+    cached = cache.get_many(ids) if cache is not None else {}
+    if cached:
+      cached_ids = list(cached)
+      for id, (item, error) in zip(cached_ids, self._get_calendar_items(cached_ids, u'IdOnly', chunk_size, max_workers)):
+        if error is not None:
+          errors[id] = error
+          continue
+
+        change_key, cached_item = cached[id]
+        if item.find(u't:ItemId', namespaces=soap_request.NAMESPACES).get(u'ChangeKey') == change_key:
+          items[id] = etree.fromstring(cached_item)
+
+      gone = [id for id, error in errors.items() if isinstance(error, ExchangeItemNotFoundException)]
+      if gone:
+        cache.discard_many(gone)
+
+      log.debug(u"%d of %d cached events are up to date", len(items), len(cached))
+
+    to_fetch = list(OrderedDict.fromkeys(id for id in ids if id not in items and id not in errors))
+    fetched = []
+    for id, (item, error) in zip(to_fetch, self._get_calendar_items(to_fetch, u'AllProperties', chunk_size, max_workers)):
+      if error is not None:
+        errors[id] = error
+      else:
+        items[id] = item
+        fetched.append((id, item.find(u't:ItemId', namespaces=soap_request.NAMESPACES).get(u'ChangeKey'), etree.tostring(item)))
+
+    if cache is not None and fetched:
+      cache.put_many(fetched)
+
+    for id in ids:
+      if id in errors:
+        raise errors[id]
+
+    return [Exchange2010CalendarEvent(service=self.service, xml=soap_request.M.Items(items[id])) for id in ids]
+
+  def _get_calendar_items(self, ids, format, chunk_size, max_workers):
+    """
+    Gets items with a GetItem per chunk of IDs. Returns (<t:CalendarItem>, error) for each ID, in order. A
+    response message without an item, or an item without an ID, counts as an error.
+    """
+    def get_chunk(chunk):
+      try:
+        response_xml = self.service.send(soap_request.get_item(exchange_id=chunk, format=format), check_response_codes=False)
+      except FailedExchangeException as err:
+        return [(None, err)] * len(chunk)
+
+      messages = self.service._response_messages(response_xml)
+      if len(messages) != len(chunk):
+        error = FailedExchangeException(u"Exchange server sent back %d responses for %d items" % (len(messages), len(chunk)))
+        return [(None, error)] * len(chunk)
+
+      results = []
+      for id, (message, error) in zip(chunk, messages):
+        item = message.find(u'm:Items/t:*', namespaces=soap_request.NAMESPACES) if error is None else None
+        if error is None and (item is None or item.find(u't:ItemId', namespaces=soap_request.NAMESPACES) is None):
+          error = FailedExchangeException(u"Exchange server did not return item %s" % id)
+        results.append((item if error is None else None, error))
+
+      return results
+
+    if not ids:
+      return []
+
+    return [result for results in map_in_chunks(get_chunk, ids, chunk_size, max_workers=max_workers) for result in results]
 
   def new_event(self, **properties):
     return Exchange2010CalendarEvent(service=self.service, calendar_id=self.calendar_id, **properties)
 
-  def list_events(self, start=None, end=None, details=False):
-    return Exchange2010CalendarEventList(service=self.service, start=start, end=end, details=details)
+  def iter_event_changes(self, sync_state=None, max_changes=512):
+    """
+    Yields the IDs of the events created, updated and deleted in this calendar since ``sync_state``, a page at a
+    time. Save each page's ``sync_state`` and pass it in next time to only get what's changed since. See
+    :meth:`Exchange2010FolderService.iter_item_changes`.
+    """
+    return self.service.folder().iter_item_changes(self.calendar_id, sync_state=sync_state, max_changes=max_changes)
+
+  def sync_events(self, sync_state=None, max_changes=512):
+    """
+    Gets every change to this calendar since ``sync_state`` in one ``ExchangeFolderChanges``. ::
+
+        changes = service.calendar().sync_events(sync_state=saved_state)
+        saved_state = changes.sync_state
+
+    Without a ``sync_state`` every event comes back as created, so the first sync is the expensive one.
+    """
+    return self.service.folder().sync_items(self.calendar_id, sync_state=sync_state, max_changes=max_changes)
+
+  def get_free_busy(self, emails, start, end, busy_types=None, chunk_size=None, max_workers=None):
+    """
+    Looks up when each of ``emails`` is busy between start and end, with GetUserAvailability. This only needs
+    free/busy access to the mailboxes, and no events are fetched. ::
+
+        for free_busy in service.calendar().get_free_busy([u'alice@example.com', u'bob@example.com'], start, end):
+          print free_busy.email, free_busy.busy
+
+    Returns an :class:`~pyexchange.base.calendar.ExchangeFreeBusy` for each mailbox, in order. ``busy`` is a list
+    of merged (start, end) pairs in UTC, cut down to start and end. ``busy_types`` are the Exchange BusyTypes
+    that count as busy - Tentative, Busy and OOF unless you say otherwise. If looking a mailbox up failed,
+    ``busy`` is None and ``error`` says why.
+
+    Mailboxes are sent ``chunk_size`` to a request, and long time windows are split up, to fit under Exchange's
+    limits. On a thread safe connection up to ``max_workers`` requests are sent at a time, otherwise one.
+    """
+    emails = list(emails)
+    start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+    busy_types = busy_types or self.AVAILABILITY_BUSY_TYPES
+    chunk_size = chunk_size or self.AVAILABILITY_CHUNK_SIZE
+    max_workers = default_max_workers(self.service, max_workers, self.BATCH_MAX_WORKERS)
+
+    windows = []
+    window_start = start
+    while window_start < end:
+      window_end = min(window_start + timedelta(days=self.AVAILABILITY_MAX_DAYS), end)
+      windows.append((window_start, window_end))
+      window_start = window_end
+
+    work = [(mailboxes, window) for mailboxes in chunks(emails, chunk_size) for window in windows]
+
+    def look_up(work_item):
+      mailboxes, (window_start, window_end) = work_item
+      try:
+        response_xml = self.service.send(soap_request.get_user_availability(mailboxes, window_start, window_end), check_response_codes=False)
+      except FailedExchangeException as err:
+        return [(None, err)] * len(mailboxes)
+
+      responses = self._parse_free_busy_responses(response_xml, window_start, window_end, busy_types)
+      if len(responses) != len(mailboxes):
+        error = FailedExchangeException(u"Exchange server sent back %d responses for %d mailboxes" % (len(responses), len(mailboxes)))
+        return [(None, error)] * len(mailboxes)
+
+      return responses
+
+    busy = OrderedDict((email, []) for email in emails)
+    errors = {}
+    for (mailboxes, _), responses in zip(work, map_concurrently(look_up, work, max_workers=max_workers)):
+      for email, (intervals, error) in zip(mailboxes, responses):
+        if error is not None:
+          errors.setdefault(email, error)
+        else:
+          busy[email].extend(intervals)
+
+    return [ExchangeFreeBusy(email, None, errors[email]) if email in errors else ExchangeFreeBusy(email, merge_intervals(busy[email]), None)
+            for email in emails]
+
+  def _parse_free_busy_responses(self, response_xml, start, end, busy_types):
+    """ Returns (busy intervals, error) for each mailbox in a GetUserAvailability response, in order. """
+    responses = []
+    for response in response_xml.xpath(u'//m:FreeBusyResponseArray/m:FreeBusyResponse', namespaces=soap_request.NAMESPACES):
+      error = self.service._exception_for_response_code(response.findtext(u'm:ResponseMessage/m:ResponseCode', namespaces=soap_request.NAMESPACES))
+      if error is not None:
+        responses.append((None, error))
+        continue
+
+      intervals = []
+      for event in response.iterfind(u'm:FreeBusyView/t:CalendarEventArray/t:CalendarEvent', namespaces=soap_request.NAMESPACES):
+        if event.findtext(u't:BusyType', namespaces=soap_request.NAMESPACES) not in busy_types:
+          continue
+
+        # the times are in the UTC TimeZone the request asked for, but come back without an offset
+        event_start = self.service._parse_date(event.findtext(u't:StartTime', namespaces=soap_request.NAMESPACES)[:19] + u'Z')
+        event_end = self.service._parse_date(event.findtext(u't:EndTime', namespaces=soap_request.NAMESPACES)[:19] + u'Z')
+        if event_start < end and event_end > start:
+          intervals.append((max(event_start, start), min(event_end, end)))
+
+      responses.append((intervals, None))
+
+    return responses
+
+  def create_events(self, events, chunk_size=None, max_workers=None):
+    """
+    Creates many events at once, with CreateItem requests of up to ``chunk_size`` events each, up to
+    ``max_workers`` of them at a time. Events going into different calendars are sent in different requests. ::
+
+        events = [service.calendar().new_event(subject=u'1:1 with %s' % name, start=start, end=end, ...) for name in hires]
+        results = service.calendar().create_events(events)
+
+    Returns an :class:`~pyexchange.base.calendar.ExchangeEventResult` for each event, in order. Events that were
+    created get their ID and change key, and invitations go out just like with ``create()``. One failing event,
+    or one failing request, doesn't stop the others.
+
+    Requests aren't sent again if they fail part way, so nothing is ever created twice. Check the results and
+    retry the ones that failed yourself.
+    """
+    results = [None] * len(events)
+    valid = []
+
+    for index, event in enumerate(events):
+      try:
+        event.validate()
+      except ValueError as err:
+        results[index] = ExchangeEventResult(event, err)
+      else:
+        valid.append(index)
+
+    def on_success(event, message):
+      event._id, event._change_key = self.service._item_id_in(message)
+
+    errors = self._send_in_chunks([events[index] for index in valid], soap_request.new_events, on_success, chunk_size, max_workers,
+                                  group_by=lambda event: event.calendar_id)
+
+    for index, error in zip(valid, errors):
+      results[index] = ExchangeEventResult(events[index], error)
+
+    return results
+
+  def update_events(self, events, calendar_item_update_operation_type=u'SendToAllAndSaveCopy', chunk_size=None, max_workers=None):
+    """
+    Saves the changes to many events at once, with UpdateItem requests of up to ``chunk_size`` events each, up to
+    ``max_workers`` of them at a time. ::
+
+        for event in events:
+          event.location = u'Building 2'
+
+        results = service.calendar().update_events(events)
+        failed = [result for result in results if result.error is not None]
+
+    Returns an :class:`~pyexchange.base.calendar.ExchangeEventResult` for each event, in order, with the error it
+    failed with, or None. Events that were saved get their new change key. One failing event doesn't stop the
+    others, and neither does a request that fails as a whole - each of its events gets that error.
+
+    The change keys the events already have are sent as they are. The ones Exchange turns down are looked up
+    again, all together, and those events are sent once more.
+    """
+    if calendar_item_update_operation_type not in Exchange2010CalendarEvent.UPDATE_OPERATION_TYPES:
+      raise ValueError('calendar_item_update_operation_type has unknown value')
+
+    results = [None] * len(events)
+    dirty = []
+
+    for index, event in enumerate(events):
+      try:
+        if not event.id:
+          raise TypeError(u"You can't update an event that hasn't been created yet.")
+        event.validate()
+      except (TypeError, ValueError) as err:
+        results[index] = ExchangeEventResult(event, err)
+        continue
+
+      if event._dirty_attributes:
+        dirty.append(index)
+      else:
+        results[index] = ExchangeEventResult(event, None)
+
+    def build_request(chunk):
+      return soap_request.update_items([(event, event._dirty_attributes) for event in chunk], calendar_item_update_operation_type)
+
+    def on_success(event, message):
+      _, change_key = self.service._item_id_in(message)
+      if change_key is not None:
+        event._change_key = change_key
+      event._reset_dirty_attributes()
+
+    errors = self._send_with_change_keys([events[index] for index in dirty], build_request, on_success, chunk_size, max_workers)
+
+    for index, error in zip(dirty, errors):
+      results[index] = ExchangeEventResult(events[index], error)
+
+    return results
+
+  def cancel_events(self, events, chunk_size=None, max_workers=None):
+    """
+    Cancels many events at once, with DeleteItem requests of up to ``chunk_size`` events each, up to
+    ``max_workers`` of them at a time. ::
+
+        events = service.calendar().list_events(start=start, end=end).events
+        results = service.calendar().cancel_events([event for event in events if event.organizer.email == leaver])
+
+    Just like ``cancel()``, cancellations go to anyone who hasn't declined, and all occurrences of a recurring
+    event are cancelled. Returns an :class:`~pyexchange.base.calendar.ExchangeEventResult` for each event, in
+    order, with the error it failed with, or None.
+
+    Change keys are handled like in :meth:`update_events`.
+    """
+    results = [None] * len(events)
+    to_cancel = []
+
+    for index, event in enumerate(events):
+      if event.id:
+        to_cancel.append(index)
+      else:
+        results[index] = ExchangeEventResult(event, TypeError(u"You can't delete an event that hasn't been created yet."))
+
+    errors = self._send_with_change_keys([events[index] for index in to_cancel], soap_request.delete_events, lambda event, message: None, chunk_size, max_workers)
+
+    for index, error in zip(to_cancel, errors):
+      results[index] = ExchangeEventResult(events[index], error)
+
+    return results
+
+  def move_events(self, events, folder_id, chunk_size=None, max_workers=None):
+    """
+    Moves many events to another calendar at once, with MoveItem requests of up to ``chunk_size`` events each, up
+    to ``max_workers`` of them at a time. ::
+
+        results = service.calendar().move_events(events, folder_id=new_calendar.id, chunk_size=500)
+
+    Events that were moved get their new ID, change key and ``calendar_id``, just like with ``move_to()``.
+    Returns an :class:`~pyexchange.base.calendar.ExchangeEventResult` for each event, in order, with the error it
+    failed with, or None.
+
+    Change keys are handled like in :meth:`update_events`.
+    """
+    if not folder_id:
+      raise TypeError(u"You can't move an event to a non-existant folder")
+
+    if not isinstance(folder_id, basestring):
+      raise TypeError(u"folder_id must be a string")
+
+    results = [None] * len(events)
+    to_move = []
+
+    for index, event in enumerate(events):
+      if event.id:
+        to_move.append(index)
+      else:
+        results[index] = ExchangeEventResult(event, TypeError(u"You can't move an event that hasn't been created yet."))
+
+    def on_success(event, message):
+      new_id, new_change_key = self.service._item_id_in(message)
+      if not new_id:
+        raise ValueError(u"MoveItem returned success but requested item not moved")
+
+      event._id = new_id
+      event._change_key = new_change_key
+      event.calendar_id = folder_id
+
+    errors = self._send_with_change_keys([events[index] for index in to_move], lambda chunk: soap_request.move_events(chunk, folder_id),
+                                         on_success, chunk_size, max_workers)
+
+    for index, error in zip(to_move, errors):
+      results[index] = ExchangeEventResult(events[index], error)
+
+    return results
+
+  def _send_with_change_keys(self, events, build_request, on_success, chunk_size=None, max_workers=None):
+    """
+    Like :meth:`_send_in_chunks`, for requests that need the events' change keys. Events without one have theirs
+    looked up first. Events Exchange says have a stale one get a fresh one and are sent once more.
+    """
+    errors = [None] * len(events)
+
+    missing = [index for index, event in enumerate(events) if event._change_key is None]
+    for index, error in zip(missing, self._refresh_change_keys([events[index] for index in missing], chunk_size, max_workers)):
+      errors[index] = error
+
+    to_send = [index for index, error in enumerate(errors) if error is None]
+    for index, error in zip(to_send, self._send_in_chunks([events[index] for index in to_send], build_request, on_success, chunk_size, max_workers)):
+      errors[index] = error
+
+    stale = [index for index, error in enumerate(errors) if isinstance(error, (ExchangeIrresolvableConflictException, ExchangeStaleChangeKeyException))]
+    if stale:
+      log.debug(u"Refreshing %d stale change keys and trying again", len(stale))
+      refreshed = self._refresh_change_keys([events[index] for index in stale], chunk_size, max_workers)
+      for index, error in zip(stale, refreshed):
+        errors[index] = error
+
+      to_resend = [index for index in stale if errors[index] is None]
+      for index, error in zip(to_resend, self._send_in_chunks([events[index] for index in to_resend], build_request, on_success, chunk_size, max_workers)):
+        errors[index] = error
+
+    return errors
+
+  def _refresh_change_keys(self, events, chunk_size=None, max_workers=None):
+    """ Looks up the latest change key of each event, with a GetItem per chunk. Returns the error for each event, or None. """
+    def build_request(chunk):
+      return soap_request.get_item(exchange_id=[event.id for event in chunk], format=u'IdOnly')
+
+    def on_success(event, message):
+      event._id, event._change_key = self.service._item_id_in(message)
+
+    return self._send_in_chunks(events, build_request, on_success, chunk_size, max_workers)
+
+  def _send_in_chunks(self, events, build_request, on_success, chunk_size=None, max_workers=None, group_by=None):
+    """
+    Sends build_request(chunk) for each chunk of events, up to max_workers at a time, and calls
+    on_success(event, response message) for each event that worked. Returns the error for each event, in order,
+    or None. A request that fails as a whole fails each of its events, without stopping the other requests.
+    A ValueError from on_success becomes that event's error.
+
+    With group_by, events are only put in the same chunk as others with the same group_by(event).
+    """
+    chunk_size = chunk_size or self.BATCH_CHUNK_SIZE
+    max_workers = default_max_workers(self.service, max_workers, self.BATCH_MAX_WORKERS)
+
+    groups = OrderedDict()
+    for index, event in enumerate(events):
+      groups.setdefault(group_by(event) if group_by is not None else None, []).append(index)
+
+    work = [indices for group in groups.values() for indices in chunks(group, chunk_size)]
+
+    def send_chunk(indices):
+      chunk = [events[index] for index in indices]
+      try:
+        response_xml = self.service.send(build_request(chunk), check_response_codes=False)
+      except FailedExchangeException as err:
+        return [err] * len(chunk)
+
+      messages = self.service._response_messages(response_xml)
+      if len(messages) != len(chunk):
+        error = FailedExchangeException(u"Exchange server sent back %d responses for %d items" % (len(messages), len(chunk)))
+        return [error] * len(chunk)
+
+      errors = []
+      for event, (message, error) in zip(chunk, messages):
+        if error is None:
+          try:
+            on_success(event, message)
+          except ValueError as err:
+            error = err
+        errors.append(error)
+
+      return errors
+
+    errors = [None] * len(events)
+    for indices, chunk_errors in zip(work, map_concurrently(send_chunk, work, max_workers=max_workers)):
+      for index, error in zip(indices, chunk_errors):
+        errors[index] = error
+
+    return errors
+
+  def list_events(self, start=None, end=None, details=False, page_size=None, fields=None):
+    """
+    Lists the events between start and end. Set ``page_size`` to ask Exchange for that many events at a time,
+    rather than everything at once - Exchange caps the size of a single response, and anything over the cap
+    would otherwise be missed.
+
+    ``fields`` is a list of the properties you need, like ``[u'subject', u'start', u'end']``. Exchange then only
+    sends those back, which is a lot less to download than every body and attendee list. A CalendarView won't send
+    back bodies, attendees, resources or conflicting meetings, so asking for any of those loads the details as
+    with ``details=True``.
+    """
+    return Exchange2010CalendarEventList(service=self.service, start=start, end=end, details=details, page_size=page_size, fields=fields)
+
+  def iter_events(self, start=None, end=None, page_size=None, fields=None):
+    """
+    Like :meth:`list_events`, but yields each event as soon as it comes off the wire instead of building the
+    whole list first. Only one event's worth of XML is held in memory at a time, so this is the one to use for
+    big date ranges. ::
+
+        for event in service.calendar().iter_events(start=start, end=end):
+          print event.subject
+
+    With ``page_size``, events are requested a page at a time (see :meth:`list_events`) and each page is only
+    fetched once the one before it has been used up.
+
+    Events have the same (partial) details as :meth:`list_events` gives you without ``details=True``, or just
+    the ``fields`` you ask for. Fields a CalendarView won't send back, like bodies and attendees, raise
+    ValueError - use :meth:`list_events` for those.
+    """
+    if page_size is not None:
+      for item in self._iter_calendar_view(start, end, page_size, fields=fields):
+        yield Exchange2010CalendarEvent(service=self.service, xml=soap_request.M.Items(item), fields=fields)
+      return
+
+    body = soap_request.get_calendar_items(start=start, end=end, **calendar_view_shape(fields))
+    stream = self.service.send_stream(body)
+
+    try:
+      for item in self.service._iterparse(stream, CALENDAR_ITEM_TAG):
+        yield Exchange2010CalendarEvent(service=self.service, xml=soap_request.M.Items(item), fields=fields)
+    finally:
+      stream.close()
+
+  def _iter_calendar_view(self, start, end, page_size, fields=None):
+    """
+    Yields the <t:CalendarItem> elements between start and end, asking for ``page_size`` at a time.
+
+    Exchange sorts a CalendarView by start time and sets IncludesLastItemInRange="false" when it had to stop
+    early, so each page picks up from the start of the last event on the page before. Events that overlap that
+    point come back again, and are skipped by ItemId. Only IDs that could still come back are remembered.
+    """
+    # paging goes by the start and end of each event, so those are always asked for
+    shape = calendar_view_shape(None if fields is None else list(fields) + [u'start', u'end'])
+
+    # ItemId -> end of the event, for events that may show up again on the next page
+    seen = {}
+    page_start = start
+
+    while True:
+      body = soap_request.get_calendar_items(start=page_start, end=end, max_entries=page_size, **shape)
+      response_xml = self.service.send(body)
+
+      root_folder = response_xml.xpath(u'//m:FindItemResponseMessage/m:RootFolder', namespaces=soap_request.NAMESPACES)
+      if not root_folder:
+        return
+
+      items = root_folder[0].xpath(u't:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES)
+      new_items = 0
+      last_start = None
+
+      for item in items:
+        item_id = item.find(u't:ItemId', namespaces=soap_request.NAMESPACES).get(u'Id')
+        item_start = item.findtext(u't:Start', namespaces=soap_request.NAMESPACES)
+        item_end = item.findtext(u't:End', namespaces=soap_request.NAMESPACES)
+
+        last_start = self.service._parse_date(item_start) if item_start else last_start
+
+        if item_id in seen:
+          continue
+
+        seen[item_id] = self.service._parse_date(item_end) if item_end else None
+        new_items += 1
+        yield item
+
+      if root_folder[0].get(u'IncludesLastItemInRange') != u'false' or not items:
+        return
+
+      if new_items == 0 or last_start is None:
+        raise FailedExchangeException(u"Unable to page past %s - more than %d events overlap it. Try a bigger page_size." % (page_start, page_size))
+
+      page_start = last_start
+      seen = dict((item_id, item_end) for item_id, item_end in seen.items() if item_end is None or item_end > page_start)
 
 
 class Exchange2010CalendarEventList(object):
   """
   Creates & Stores a list of Exchange2010CalendarEvent items in the "self.events" variable.
   """
-  def __init__(self, service=None, start=None, end=None, details=False):
+
+  # how load_all_details() splits up its GetItem requests, and how many times a chunk is sent again after a
+  # transient error from Exchange
+  DETAILS_CHUNK_SIZE = 100
+  DETAILS_MAX_WORKERS = 4
+  DETAILS_RETRIES = 1
+
+  def __init__(self, service=None, start=None, end=None, details=False, xml=None, page_size=None, fields=None):
     self.service = service
     self.count = 0
     self.start = start
@@ -593,11 +1670,29 @@ class Exchange2010CalendarEventList(object):
     self.events = list()
     self.event_ids = list()
     self.details = details
+    self.fields = fields
+
+    # when we're handed the XML, the caller takes care of fetching the details too
+    self._fetch_details = xml is None
+
+    # a CalendarView won't send back bodies or attendees, so those come with the details
+    view_fields = fields
+    if fields is not None and soap_request.needs_get_item(fields, soap_request.CALENDAR_FIELD_URIS):
+      self.details = True
+      view_fields = soap_request.find_item_fields(fields, soap_request.CALENDAR_FIELD_URIS)
+
+    if xml is None and page_size is not None:
+      # Ask for the events a page at a time, so Exchange doesn't cut the list short
+      for item in self.service.calendar()._iter_calendar_view(self.start, self.end, page_size, fields=view_fields):
+        self._add_event(xml=soap_request.M.Items(item))
+      self.count = len(self.events)
+    else:
+      if xml is None:
+        # This request uses a Calendar-specific query between two dates.
+        body = soap_request.get_calendar_items(start=self.start, end=self.end, **calendar_view_shape(view_fields))
+        xml = self.service.send(body)
 
-    # This request uses a Calendar-specific query between two dates.
-    body = soap_request.get_calendar_items(format=u'AllProperties', start=self.start, end=self.end)
-    response_xml = self.service.send(body)
-    self._parse_response_for_all_events(response_xml)
+      self._parse_response_for_all_events(xml)
 
     # Populate the event ID list, for convenience reasons.
     for event in self.events:
@@ -605,7 +1700,7 @@ class Exchange2010CalendarEventList(object):
 
     # If we have requested all the details, basically repeat the previous 3 steps,
     # but instead of start/stop, we have a list of ID fields.
-    if self.details:
+    if self.details and self._fetch_details:
       log.debug(u'Received request for all details, retrieving now!')
       self.load_all_details()
 
@@ -613,12 +1708,10 @@ class Exchange2010CalendarEventList(object):
     """
     This function will retrieve *most* of the event data, excluding Organizer & Attendee details
     """
-    items = response.xpath(u'//m:FindItemResponseMessage/m:RootFolder/t:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES)
-    if not items:
-      items = response.xpath(u'//m:GetItemResponseMessage/m:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES)
+    items = self._calendar_items_in(response)
     if items:
       self.count = len(items)
-      log.debug(u'Found %s items' % self.count)
+      log.debug(u'Found %s items', self.count)
 
       for item in items:
         self._add_event(xml=soap_request.M.Items(deepcopy(item)))
@@ -627,47 +1720,310 @@ class Exchange2010CalendarEventList(object):
 
     return self
 
+  def _calendar_items_in(self, response):
+    items = response.xpath(u'//m:FindItemResponseMessage/m:RootFolder/t:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES)
+    if not items:
+      items = response.xpath(u'//m:GetItemResponseMessage/m:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES)
+    return items
+
   def _add_event(self, xml=None):
     log.debug(u'Adding new event to all events list.')
-    event = Exchange2010CalendarEvent(service=self.service, xml=xml)
-    log.debug(u'Subject of new event is %s' % event.subject)
+    event = Exchange2010CalendarEvent(service=self.service, xml=xml, fields=self.fields)
+    log.debug(u'Subject of new event is %s', event.subject)
     self.events.append(event)
     return self
 
-  def load_all_details(self):
+  def interval_index(self):
+    """
+    An :class:`~pyexchange.interval_index.ExchangeIntervalIndex` of these events, for finding conflicts, free
+    slots and overlaps without asking Exchange. The events need their start and end.
+    """
+    return ExchangeIntervalIndex.from_events(self.events)
+
+  def load_all_details(self, chunk_size=None, max_workers=None, retries=None):
     """
     This function will execute all the event lookups for known events.
 
     This is intended for use when you want to have a completely populated event entry, including
     Organizer & Attendee details.
+
+    Events are fetched ``chunk_size`` at a time, with up to ``max_workers`` requests in flight at once, and keep
+    their order. If a chunk fails, the error is raised and the events are left as they were.
+
+    Concurrent requests share the service's connection, so they're only sent concurrently by default when it's
+    safe to share between threads (like :class:`~pyexchange.connection.ExchangePooledNTLMAuthConnection`).
+    Otherwise chunks go one at a time.
+
+    A chunk that fails with a transient error from Exchange is sent again on its own, up to ``retries`` times
+    (once by default), without losing the chunks that succeeded.
     """
+    chunk_size = chunk_size or self.DETAILS_CHUNK_SIZE
+    max_workers = default_max_workers(self.service, max_workers, self.DETAILS_MAX_WORKERS)
+    retries = self.DETAILS_RETRIES if retries is None else retries
+
     log.debug(u"Loading all details")
     if self.count > 0:
-      # Now, empty out the events to prevent duplicates!
-      del(self.events[:])
+      log.debug(u"Requesting all event details for events: %s", self.event_ids)
 
-      # Send the SOAP request with the list of exchange ID values.
-      log.debug(u"Requesting all event details for events: {event_list}".format(event_list=str(self.event_ids)))
-      body = soap_request.get_item(exchange_id=self.event_ids, format=u'AllProperties')
-      response_xml = self.service.send(body)
+      def load_chunk(ids):
+        body = soap_request.get_item(exchange_id=ids, **calendar_item_shape(self.fields))
+        response_xml = self.service.send(body)
+        return [Exchange2010CalendarEvent(service=self.service, xml=soap_request.M.Items(item), fields=self.fields)
+                for item in self._calendar_items_in(response_xml)]
 
-      # Re-parse the results for all the details!
-      self._parse_response_for_all_events(response_xml)
+      loaded = map_in_chunks(load_chunk, self.event_ids, chunk_size,
+                             max_workers=max_workers,
+                             retries=retries,
+                             should_retry=should_retry_batch,
+                             backoff=self.service.retry_policy.backoff)
+
+      self.events = [event for chunk in loaded for event in chunk]
+      self.count = len(self.events)
 
     return self
 
+  def _load_details_from_xml(self, response):
+    # Empty out the events to prevent duplicates!
+    del(self.events[:])
+    return self._parse_response_for_all_events(response)
+
+
+class Exchange2010CalendarItemParser(object):
+  """
+  Reads the events in a response in a single pass. Each ``<t:CalendarItem>`` is walked once and every child is
+  handed to a handler picked by its tag, instead of searching the whole response again for every property.
+
+  :meth:`parse` returns the event's properties, along with its ID and change key. Given a list of ``fields`` (see
+  ``soap_request.CALENDAR_FIELD_URIS``), every other child is skipped and only those properties are returned.
+  """
+
+  # tag: (property, cast)
+  SIMPLE_PROPERTIES = {
+    TYPE_TAG % u'Subject': (u'subject', None),
+    TYPE_TAG % u'Location': (u'location', None),
+    TYPE_TAG % u'LegacyFreeBusyStatus': (u'availability', None),
+    TYPE_TAG % u'Start': (u'start', u'datetime'),
+    TYPE_TAG % u'End': (u'end', u'datetime'),
+    TYPE_TAG % u'CalendarItemType': (u'_type', None),
+    TYPE_TAG % u'ReminderMinutesBeforeStart': (u'reminder_minutes_before_start', u'int'),
+    TYPE_TAG % u'IsAllDayEvent': (u'is_all_day', u'bool'),
+  }
+
+  BODY_PROPERTIES = {
+    u'HTML': u'html_body',
+    u'Text': u'text_body',
+  }
+
+  # checked in this order, the first one found wins
+  RECURRENCE_TYPES = (
+    (TYPE_TAG % u'DailyRecurrence', u'daily'),
+    (TYPE_TAG % u'WeeklyRecurrence', u'weekly'),
+    (TYPE_TAG % u'AbsoluteMonthlyRecurrence', u'monthly'),
+    (TYPE_TAG % u'AbsoluteYearlyRecurrence', u'yearly'),
+  )
+
+  def __init__(self, event, fields=None):
+    self.event = event
+
+    # the tags to read, or None for all of them
+    self.tags = None
+    if fields is not None:
+      uris = soap_request.field_uris(fields, soap_request.CALENDAR_FIELD_URIS)
+      self.tags = set(TYPE_TAG % uri.split(u':', 1)[1] for uri in uris)
+      self.tags.add(TYPE_TAG % u'ItemId')
+
+    self.handlers = {
+      TYPE_TAG % u'ItemId': self._item_id,
+      TYPE_TAG % u'Body': self._body,
+      TYPE_TAG % u'Recurrence': self._recurrence,
+      TYPE_TAG % u'Organizer': self._organizer,
+      TYPE_TAG % u'RequiredAttendees': self._required_attendees,
+      TYPE_TAG % u'OptionalAttendees': self._optional_attendees,
+      TYPE_TAG % u'Resources': self._resources,
+      TYPE_TAG % u'ConflictingMeetings': self._conflicting_meetings,
+    }
+
+  def parse(self, response):
+    """ Returns (properties, id, change key) for the event(s) in the response. """
+    self.values = {}
+    self.recurrence = None
+    self._recurrence_seen = False
+    self.organizer = None
+    self.required_attendees = []
+    self.optional_attendees = []
+    self.resources = []
+    self.conflicting_event_ids = []
+    self.id_element = None
+
+    for item in response.xpath(u'//m:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES):
+      for child in item:
+        if self.tags is not None and child.tag not in self.tags:
+          continue
+
+        simple = self.SIMPLE_PROPERTIES.get(child.tag)
+
+        if simple is not None:
+          self._add(simple[0], child, simple[1])
+        else:
+          handler = self.handlers.get(child.tag)
+          if handler is not None:
+            handler(child)
+
+    result = self._collapse(self.values)
+
+    if self.recurrence is not None:
+      result[u'recurrence'] = self.recurrence
+
+    if self.organizer is not None:
+      if 'email' not in self.organizer:
+        self.organizer['email'] = None
+      result[u'organizer'] = ExchangeEventOrganizer(**self.organizer)
+
+    if self._reads(u'RequiredAttendees', u'OptionalAttendees'):
+      attendees = self.required_attendees + self.optional_attendees
+      result[u'_attendees'] = self.event._build_resource_dictionary([ExchangeEventResponse(**attendee) for attendee in attendees])
+    if self._reads(u'Resources'):
+      result[u'_resources'] = self.event._build_resource_dictionary([ExchangeEventResponse(**resource) for resource in self.resources])
+    if self._reads(u'ConflictingMeetings'):
+      result['_conflicting_event_ids'] = self.conflicting_event_ids
+
+    if self.id_element is None:
+      return result, None, None
+
+    return result, self.id_element.get(u"Id", None), self.id_element.get(u"ChangeKey", None)
+
+  def _reads(self, *names):
+    return self.tags is None or any(TYPE_TAG % name in self.tags for name in names)
+
+  def _add(self, key, node, cast=None, values=None):
+    if values is None:
+      values = self.values
+
+    if cast is None:
+      value = node.text
+    else:
+      value = ExtractionPlan.CASTS[cast](self.event.service, node.text)
+
+    values.setdefault(key, []).append(value)
+
+  def _collapse(self, values):
+    return dict((key, found[0] if len(found) == 1 else found) for key, found in values.items())
+
+  def _item_id(self, node):
+    if self.id_element is None:
+      self.id_element = node
+
+  def _body(self, node):
+    key = self.BODY_PROPERTIES.get(node.get(u'BodyType'))
+    if key is not None:
+      self._add(key, node)
+
+  def _recurrence(self, node):
+    patterns = set()
+
+    for pattern in node:
+      patterns.add(pattern.tag)
+
+      if pattern.tag == TYPE_TAG % u'EndDateRecurrence':
+        for end_date in pattern.iterchildren(TYPE_TAG % u'EndDate'):
+          self._add(u'recurrence_end_date', end_date, u'date_only_naive')
+
+      if pattern.tag == TYPE_TAG % u'WeeklyRecurrence':
+        for days in pattern.iterchildren(TYPE_TAG % u'DaysOfWeek'):
+          self._add(u'recurrence_days', days)
+
+      for interval in pattern.iterchildren(TYPE_TAG % u'Interval'):
+        self._add(u'recurrence_interval', interval, u'int')
+
+    # only the first <t:Recurrence> decides the type of recurrence
+    if self._recurrence_seen:
+      return
+    self._recurrence_seen = True
+
+    for tag, recurrence in self.RECURRENCE_TYPES:
+      if tag in patterns:
+        self.recurrence = recurrence
+        break
+
+  def _organizer(self, node):
+    if self.organizer is not None:
+      return
+
+    for mailbox in node.iterchildren(TYPE_TAG % u'Mailbox'):
+      values = {}
+      for child in mailbox:
+        if child.tag == TYPE_TAG % u'Name':
+          self._add(u'name', child, values=values)
+        elif child.tag == TYPE_TAG % u'EmailAddress':
+          self._add(u'email', child, values=values)
+
+      self.organizer = self._collapse(values)
+      return
+
+  def _attendees(self, node, required):
+    result = []
+
+    for attendee in node.iterchildren(TYPE_TAG % u'Attendee'):
+      values = {}
+
+      for child in attendee:
+        if child.tag == TYPE_TAG % u'Mailbox':
+          for field in child:
+            if field.tag == TYPE_TAG % u'Name':
+              self._add(u'name', field, values=values)
+            elif field.tag == TYPE_TAG % u'EmailAddress':
+              self._add(u'email', field, values=values)
+        elif child.tag == TYPE_TAG % u'ResponseType':
+          self._add(u'response', child, values=values)
+        elif child.tag == TYPE_TAG % u'LastResponseTime':
+          self._add(u'last_response', child, u'datetime', values=values)
+
+      properties = self._collapse(values)
+      properties[u'required'] = required
+
+      if u'last_response' not in properties:
+        properties[u'last_response'] = None
+
+      result.append(properties)
+
+    return result
+
+  def _required_attendees(self, node):
+    self.required_attendees.extend(self._attendees(node, required=True))
+
+  def _optional_attendees(self, node):
+    self.optional_attendees.extend(self._attendees(node, required=False))
+
+  def _resources(self, node):
+    self.resources.extend(self._attendees(node, required=True))
+
+  def _conflicting_meetings(self, node):
+    for item in node.iterchildren(TYPE_TAG % u'CalendarItem'):
+      for id_element in item.iterchildren(TYPE_TAG % u'ItemId'):
+        self.conflicting_event_ids.append(id_element.get(u"Id"))
+
 
 class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
+  UPDATE_OPERATION_TYPES = (
+    u'SendToNone', u'SendOnlyToAll', u'SendOnlyToChanged',
+    u'SendToAllAndSaveCopy', u'SendToChangedAndSaveCopy',
+  )
+
+  def __init__(self, service, id=None, calendar_id=u'calendar', xml=None, fields=None, **kwargs):
+    # only these properties are fetched and read, when given
+    self._fields = fields
+    super(Exchange2010CalendarEvent, self).__init__(service, id=id, calendar_id=calendar_id, xml=xml, **kwargs)
+
   def _init_from_service(self, id):
     log.debug(u'Creating new Exchange2010CalendarEvent object from ID')
-    body = soap_request.get_item(exchange_id=id, format=u'AllProperties')
+    body = soap_request.get_item(exchange_id=id, **calendar_item_shape(self._fields))
     response_xml = self.service.send(body)
-    properties = self._parse_response_for_get_event(response_xml)
+    properties, _, self._change_key = self._parse_calendar_items(response_xml)
 
     self._update_properties(properties)
     self._id = id
-    log.debug(u'Created new event object with ID: %s' % self._id)
+    log.debug(u'Created new event object with ID: %s', self._id)
 
     self._reset_dirty_attributes()
 
@@ -676,11 +2032,10 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
   def _init_from_xml(self, xml=None):
     log.debug(u'Creating new Exchange2010CalendarEvent object from XML')
 
-    properties = self._parse_response_for_get_event(xml)
+    properties, self._id, self._change_key = self._parse_calendar_items(xml)
     self._update_properties(properties)
-    self._id, self._change_key = self._parse_id_and_change_key_from_response(xml)
 
-    log.debug(u'Created new event object with ID: %s' % self._id)
+    log.debug(u'Created new event object with ID: %s', self._id)
     self._reset_dirty_attributes()
 
     return self
@@ -767,9 +2122,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
     if self._dirty_attributes:
       raise ValueError(u"There are unsaved changes to this invite - please update it first: %r" % self._dirty_attributes)
 
-    self.refresh_change_key()
-    body = soap_request.update_item(self, [], calendar_item_update_operation_type=u'SendOnlyToAll')
-    self.service.send(body)
+    self._send_with_change_key(lambda: soap_request.update_item(self, [], calendar_item_update_operation_type=u'SendOnlyToAll'))
 
     return self
 
@@ -797,21 +2150,16 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
       if kwargs['send_only_to_changed_attendees']:
         calendar_item_update_operation_type = u'SendToChangedAndSaveCopy'
 
-    VALID_UPDATE_OPERATION_TYPES = (
-      u'SendToNone', u'SendOnlyToAll', u'SendOnlyToChanged',
-      u'SendToAllAndSaveCopy', u'SendToChangedAndSaveCopy',
-    )
-    if calendar_item_update_operation_type not in VALID_UPDATE_OPERATION_TYPES:
+    if calendar_item_update_operation_type not in self.UPDATE_OPERATION_TYPES:
       raise ValueError('calendar_item_update_operation_type has unknown value')
 
     self.validate()
 
     if self._dirty_attributes:
-      log.debug(u"Updating these attributes: %r" % self._dirty_attributes)
-      self.refresh_change_key()
+      log.debug(u"Updating these attributes: %r", self._dirty_attributes)
 
-      body = soap_request.update_item(self, self._dirty_attributes, calendar_item_update_operation_type=calendar_item_update_operation_type)
-      self.service.send(body)
+      response_xml = self._send_with_change_key(lambda: soap_request.update_item(self, self._dirty_attributes, calendar_item_update_operation_type=calendar_item_update_operation_type))
+      self._keep_change_key_from_response(response_xml)
       self._reset_dirty_attributes()
     else:
       log.info(u"Update was called, but there's nothing to update. Doing nothing.")
@@ -830,8 +2178,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
     if not self.id:
       raise TypeError(u"You can't delete an event that hasn't been created yet.")
 
-    self.refresh_change_key()
-    self.service.send(soap_request.delete_event(self))
+    self._send_with_change_key(lambda: soap_request.delete_event(self))
     # TODO rsanders high - check return status to make sure it was actually sent
     return None
 
@@ -852,8 +2199,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
     if not self.id:
       raise TypeError(u"You can't move an event that hasn't been created yet.")
 
-    self.refresh_change_key()
-    response_xml = self.service.send(soap_request.move_event(self, folder_id))
+    response_xml = self._send_with_change_key(lambda: soap_request.move_event(self, folder_id))
     new_id, new_change_key = self._parse_id_and_change_key_from_response(response_xml)
     if not new_id:
       raise ValueError(u"MoveItem returned success but requested item not moved")
@@ -965,6 +2311,28 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
     return self
 
+  def _send_with_change_key(self, build_request):
+    """
+    Sends the request made by build_request() with an up to date change key. With the service's
+    optimistic_concurrency on, the change key we already have is tried first, and only refreshed (and the request
+    sent once more) if Exchange turns it down.
+    """
+    if not self.service.optimistic_concurrency or self._change_key is None:
+      self.refresh_change_key()
+      return self.service.send(build_request())
+
+    try:
+      return self.service.send(build_request())
+    except (ExchangeIrresolvableConflictException, ExchangeStaleChangeKeyException):
+      log.debug(u"Change key for %s is out of date, refreshing it and trying again", self._id)
+      self.refresh_change_key()
+      return self.service.send(build_request())
+
+  def _keep_change_key_from_response(self, response):
+    _, change_key = self._parse_id_and_change_key_from_response(response)
+    if change_key is not None:
+      self._change_key = change_key
+
   def _parse_id_and_change_key_from_response(self, response):
 
     id_elements = response.xpath(u'//m:Items/t:CalendarItem/t:ItemId', namespaces=soap_request.NAMESPACES)
@@ -975,217 +2343,9 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
     else:
       return None, None
 
-  def _parse_response_for_get_event(self, response):
-
-    result = self._parse_event_properties(response)
-
-    organizer_properties = self._parse_event_organizer(response)
-    if organizer_properties is not None:
-      if 'email' not in organizer_properties:
-        organizer_properties['email'] = None
-      result[u'organizer'] = ExchangeEventOrganizer(**organizer_properties)
-
-    attendee_properties = self._parse_event_attendees(response)
-    result[u'_attendees'] = self._build_resource_dictionary([ExchangeEventResponse(**attendee) for attendee in attendee_properties])
-
-    resource_properties = self._parse_event_resources(response)
-    result[u'_resources'] = self._build_resource_dictionary([ExchangeEventResponse(**resource) for resource in resource_properties])
-
-    result['_conflicting_event_ids'] = self._parse_event_conflicts(response)
-
-    return result
-
-  def _parse_event_properties(self, response):
-
-    property_map = {
-      u'subject': {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Subject',
-      },
-      u'location':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Location',
-      },
-      u'availability':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:LegacyFreeBusyStatus',
-      },
-      u'start':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Start',
-        u'cast': u'datetime',
-      },
-      u'end':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:End',
-        u'cast': u'datetime',
-      },
-      u'html_body':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Body[@BodyType="HTML"]',
-      },
-      u'text_body':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Body[@BodyType="Text"]',
-      },
-      u'_type':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:CalendarItemType',
-      },
-      u'reminder_minutes_before_start':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:ReminderMinutesBeforeStart',
-        u'cast': u'int',
-      },
-      u'is_all_day':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:IsAllDayEvent',
-        u'cast': u'bool',
-      },
-      u'recurrence_end_date':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:EndDateRecurrence/t:EndDate',
-        u'cast': u'date_only_naive',
-      },
-      u'recurrence_interval':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/*/t:Interval',
-        u'cast': u'int',
-      },
-      u'recurrence_days':
-      {
-        u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:WeeklyRecurrence/t:DaysOfWeek',
-      },
-    }
-
-    result = self.service._xpath_to_dict(element=response, property_map=property_map, namespace_map=soap_request.NAMESPACES)
-
-    try:
-      recurrence_node = response.xpath(u'//m:Items/t:CalendarItem/t:Recurrence', namespaces=soap_request.NAMESPACES)[0]
-    except IndexError:
-      recurrence_node = None
-
-    if recurrence_node is not None:
-
-      if recurrence_node.find('t:DailyRecurrence', namespaces=soap_request.NAMESPACES) is not None:
-        result['recurrence'] = 'daily'
-
-      elif recurrence_node.find('t:WeeklyRecurrence', namespaces=soap_request.NAMESPACES) is not None:
-        result['recurrence'] = 'weekly'
-
-      elif recurrence_node.find('t:AbsoluteMonthlyRecurrence', namespaces=soap_request.NAMESPACES) is not None:
-        result['recurrence'] = 'monthly'
-
-      elif recurrence_node.find('t:AbsoluteYearlyRecurrence', namespaces=soap_request.NAMESPACES) is not None:
-        result['recurrence'] = 'yearly'
-
-    return result
-
-  def _parse_event_organizer(self, response):
-
-    organizer = response.xpath(u'//m:Items/t:CalendarItem/t:Organizer/t:Mailbox', namespaces=soap_request.NAMESPACES)
-
-    property_map = {
-      u'name':
-      {
-        u'xpath': u't:Name'
-      },
-      u'email':
-      {
-        u'xpath': u't:EmailAddress'
-      },
-    }
-
-    if organizer:
-      return self.service._xpath_to_dict(element=organizer[0], property_map=property_map, namespace_map=soap_request.NAMESPACES)
-    else:
-      return None
-
-  def _parse_event_resources(self, response):
-    property_map = {
-      u'name':
-      {
-        u'xpath': u't:Mailbox/t:Name'
-      },
-      u'email':
-      {
-        u'xpath': u't:Mailbox/t:EmailAddress'
-      },
-      u'response':
-      {
-        u'xpath': u't:ResponseType'
-      },
-      u'last_response':
-      {
-        u'xpath': u't:LastResponseTime',
-        u'cast': u'datetime'
-      },
-    }
-
-    result = []
-
-    resources = response.xpath(u'//m:Items/t:CalendarItem/t:Resources/t:Attendee', namespaces=soap_request.NAMESPACES)
-
-    for attendee in resources:
-      attendee_properties = self.service._xpath_to_dict(element=attendee, property_map=property_map, namespace_map=soap_request.NAMESPACES)
-      attendee_properties[u'required'] = True
-
-      if u'last_response' not in attendee_properties:
-        attendee_properties[u'last_response'] = None
-
-      result.append(attendee_properties)
-
-    return result
-
-  def _parse_event_attendees(self, response):
-
-    property_map = {
-      u'name':
-      {
-        u'xpath': u't:Mailbox/t:Name'
-      },
-      u'email':
-      {
-        u'xpath': u't:Mailbox/t:EmailAddress'
-      },
-      u'response':
-      {
-        u'xpath': u't:ResponseType'
-      },
-      u'last_response':
-      {
-        u'xpath': u't:LastResponseTime',
-        u'cast': u'datetime'
-      },
-    }
-
-    result = []
-
-    required_attendees = response.xpath(u'//m:Items/t:CalendarItem/t:RequiredAttendees/t:Attendee', namespaces=soap_request.NAMESPACES)
-    for attendee in required_attendees:
-      attendee_properties = self.service._xpath_to_dict(element=attendee, property_map=property_map, namespace_map=soap_request.NAMESPACES)
-      attendee_properties[u'required'] = True
-
-      if u'last_response' not in attendee_properties:
-        attendee_properties[u'last_response'] = None
-
-      result.append(attendee_properties)
-
-    optional_attendees = response.xpath(u'//m:Items/t:CalendarItem/t:OptionalAttendees/t:Attendee', namespaces=soap_request.NAMESPACES)
-
-    for attendee in optional_attendees:
-      attendee_properties = self.service._xpath_to_dict(element=attendee, property_map=property_map, namespace_map=soap_request.NAMESPACES)
-      attendee_properties[u'required'] = False
-
-      if u'last_response' not in attendee_properties:
-        attendee_properties[u'last_response'] = None
-
-      result.append(attendee_properties)
-
-    return result
-
-  def _parse_event_conflicts(self, response):
-    conflicting_ids = response.xpath(u'//m:Items/t:CalendarItem/t:ConflictingMeetings/t:CalendarItem/t:ItemId', namespaces=soap_request.NAMESPACES)
-    return [id_element.get(u"Id") for id_element in conflicting_ids]
+  def _parse_calendar_items(self, response):
+    """ Returns (properties, id, change key) for the first calendar item in the response. """
+    return Exchange2010CalendarItemParser(self, fields=self._fields).parse(response)
 
 
 class Exchange2010FolderService(BaseExchangeFolderService):
@@ -1268,9 +2428,144 @@ class Exchange2010FolderService(BaseExchangeFolderService):
 
     return result
 
+  def iter_item_changes(self, folder_id, sync_state=None, max_changes=512):
+    """
+      iter_item_changes(folder_id, sync_state=None, max_changes=512)
+      :param str folder_id:  The folder to sync. Any folder ID, or one of the distinguished ones like 'calendar'.
+      :param str sync_state:  The ``sync_state`` you got back last time, or None to start from scratch.
+      :param int max_changes:  How many changes Exchange should send back at a time, up to 512.
+
+      Yields an ``ExchangeFolderChanges`` with the IDs of the items created, updated and deleted since
+      ``sync_state``, a page at a time, until Exchange has sent everything. Without a ``sync_state``, every item in
+      the folder comes back as created.
+
+      Each page has the ``sync_state`` to pick up from after it. Save it once you've dealt with the page, so a
+      failure part way through doesn't mean starting over. If Exchange won't take a saved ``sync_state`` any
+      more, ``ExchangeInvalidSyncStateException`` is raised and you need to start from scratch.
+
+      **Examples**::
+
+        for changes in service.folder().iter_item_changes('calendar', sync_state=saved_state):
+          handle(changes.created, changes.updated, changes.deleted)
+          saved_state = changes.sync_state
+
+    """
+    while True:
+      body = soap_request.sync_folder_items(folder_id=folder_id, sync_state=sync_state, max_changes=max_changes)
+      response_xml = self.service.send(body)
+      changes = self._parse_response_for_sync_folder_items(response_xml)
+
+      yield changes
+
+      if changes.includes_last_item or changes.sync_state is None or changes.sync_state == sync_state:
+        return
+
+      sync_state = changes.sync_state
+
+  def sync_items(self, folder_id, sync_state=None, max_changes=512):
+    """
+      sync_items(folder_id, sync_state=None, max_changes=512)
+
+      Like ``iter_item_changes``, but fetches every page and returns a single ``ExchangeFolderChanges``. An item
+      created and then deleted along the way isn't reported at all, and one created and then updated is only
+      reported as created.
+    """
+    return self._merge_item_changes(self.iter_item_changes(folder_id, sync_state=sync_state, max_changes=max_changes), sync_state)
+
+  def _parse_response_for_sync_folder_items(self, response):
+    """
+    <m:SyncFolderItemsResponseMessage ResponseClass="Success">
+      <m:ResponseCode>NoError</m:ResponseCode>
+      <m:SyncState>H4sIAAA==</m:SyncState>
+      <m:IncludesLastItemInRange>true</m:IncludesLastItemInRange>
+      <m:Changes>
+        <t:Create>
+          <t:CalendarItem>
+            <t:ItemId Id="id" ChangeKey="change_key"/>
+          </t:CalendarItem>
+        </t:Create>
+        <t:Delete>
+          <t:ItemId Id="id" ChangeKey="change_key"/>
+        </t:Delete>
+        <t:ReadFlagChange>
+          <t:ItemId Id="id" ChangeKey="change_key"/>
+          <t:IsRead>true</t:IsRead>
+        </t:ReadFlagChange>
+      </m:Changes>
+    </m:SyncFolderItemsResponseMessage>
+    """
+    messages = response.xpath(u'//m:SyncFolderItemsResponseMessage', namespaces=soap_request.NAMESPACES)
+    if not messages:
+      raise FailedExchangeException(u"Exchange server did not return any changes", None)
+
+    message = messages[0]
+    sync_state = message.findtext(u'm:SyncState', namespaces=soap_request.NAMESPACES)
+    includes_last_item = message.findtext(u'm:IncludesLastItemInRange', namespaces=soap_request.NAMESPACES) != u'false'
+
+    changes = []
+    for change in message.xpath(u'm:Changes/t:*', namespaces=soap_request.NAMESPACES):
+      kind = etree.QName(change).localname
+
+      if kind in (u'Delete', u'ReadFlagChange'):
+        item_id = change.find(u't:ItemId', namespaces=soap_request.NAMESPACES)
+      else:
+        item_id = change.find(u't:*/t:ItemId', namespaces=soap_request.NAMESPACES)
+
+      if item_id is None:
+        continue
+
+      is_read = change.findtext(u't:IsRead', namespaces=soap_request.NAMESPACES) == u'true'
+      changes.append((kind, item_id.get(u'Id'), is_read))
+
+    return self._collapse_item_changes(changes, sync_state, includes_last_item)
+
+  def _merge_item_changes(self, pages, sync_state):
+    changes = []
+    for page in pages:
+      changes.extend((u'Create', item_id, None) for item_id in page.created)
+      changes.extend((u'Update', item_id, None) for item_id in page.updated)
+      changes.extend((u'Delete', item_id, None) for item_id in page.deleted)
+      changes.extend((u'ReadFlagChange', item_id, is_read) for item_id, is_read in page.read_flag_changed)
+      sync_state = page.sync_state
+
+    return self._collapse_item_changes(changes, sync_state, True)
+
+  def _collapse_item_changes(self, changes, sync_state, includes_last_item):
+    """ Boils a list of (kind of change, item ID, is_read) down to the latest state of each item, keeping their order. """
+    states = OrderedDict()
+    read_flags = OrderedDict()
+
+    for kind, item_id, is_read in changes:
+      if kind == u'Create':
+        states[item_id] = kind
+      elif kind == u'Update':
+        if states.get(item_id) != u'Create':
+          states[item_id] = kind
+      elif kind == u'Delete':
+        read_flags.pop(item_id, None)
+        if states.get(item_id) == u'Create':
+          del states[item_id]
+        else:
+          states[item_id] = kind
+      elif kind == u'ReadFlagChange':
+        read_flags[item_id] = is_read
+
+    return ExchangeFolderChanges(
+      created=[item_id for item_id, kind in states.items() if kind == u'Create'],
+      updated=[item_id for item_id, kind in states.items() if kind == u'Update'],
+      deleted=[item_id for item_id, kind in states.items() if kind == u'Delete'],
+      read_flag_changed=list(read_flags.items()),
+      sync_state=sync_state,
+      includes_last_item=includes_last_item,
+    )
+
 
 class Exchange2010Folder(BaseExchangeFolder):
 
+  PROPERTY_MAP = {
+    u'display_name': {u'xpath': u't:DisplayName'},
+  }
+
   def _init_from_service(self, id):
 
     body = soap_request.get_folder(folder_id=id, format=u'AllProperties')
@@ -1365,15 +2660,11 @@ class Exchange2010Folder(BaseExchangeFolder):
 
   def _parse_folder_properties(self, response):
 
-    property_map = {
-      u'display_name': {u'xpath': u't:DisplayName'},
-    }
-
     self._id, self._change_key = self._parse_id_and_change_key_from_response(response)
     self._parent_id = self._parse_parent_id_and_change_key_from_response(response)[0]
     self.folder_type = etree.QName(response).localname
 
-    return self.service._xpath_to_dict(element=response, property_map=property_map, namespace_map=soap_request.NAMESPACES)
+    return self.service._xpath_to_dict(element=response, property_map=self.PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
 
   def _parse_id_and_change_key_from_response(self, response):
 
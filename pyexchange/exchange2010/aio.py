@@ -0,0 +1,178 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import logging
+import time
+
+from lxml import etree
+
+from . import soap_request
+from ..concurrency import chunks
+from . import (Exchange2010Service, Exchange2010CalendarService, Exchange2010EmailService, Exchange2010FolderService,
+               Exchange2010CalendarEvent, Exchange2010CalendarEventList, Exchange2010EmailItem, Exchange2010EmailList,
+               Exchange2010AttachmentItem, Exchange2010Folder, EMAIL_ITEM_DETAIL_ALL, EMAIL_ITEM_DETAIL_IDS)
+
+log = logging.getLogger("pyexchange")
+
+
+class AsyncExchange2010Service(Exchange2010Service):
+  """
+  A non-blocking twin of :class:`Exchange2010Service`. Every read returns a future straight away, so a single
+  thread (or event loop) can keep many Exchange calls in flight at once. ::
+
+      connection = ExchangePooledNTLMAuthConnection(url=URL, username=USERNAME, password=PASSWORD, pool_size=50)
+      transport = ExchangeThreadedTransport(connection, max_workers=50)
+      service = AsyncExchange2010Service(transport)
+
+      futures = [service.calendar(id=room).get_event(id=event_id) for room, event_id in lookups]
+      events = [future.result() for future in futures]
+
+  Requests go through an :class:`~pyexchange.connection.ExchangeBaseAsyncTransport`. The futures handed back are
+  the transport's own, so a transport built on an event loop gives you futures you can ``await``.
+
+  Request building and response parsing are shared with the blocking service. Calling :meth:`send` directly
+  blocks until the response is in.
+  """
+
+  def __init__(self, transport, retry_policy=None):
+    super(AsyncExchange2010Service, self).__init__(connection=None, retry_policy=retry_policy)
+    self.transport = transport
+
+  def calendar(self, id="calendar"):
+    return AsyncExchange2010CalendarService(service=self, calendar_id=id)
+
+  def mail(self, folder_id="inbox"):
+    return AsyncExchange2010EmailService(service=self, folder_id=folder_id)
+
+  def folder(self):
+    return AsyncExchange2010FolderService(service=self)
+
+  def send(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", idempotent=None, check_response_codes=True):
+    return self.send_async(xml, headers=headers, retries=retries, timeout=timeout, encoding=encoding, idempotent=idempotent,
+                           check_response_codes=check_response_codes).result()
+
+  def send_async(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", idempotent=None, check_response_codes=True):
+    """ Like :meth:`send`, but returns a future for the parsed response. """
+    if idempotent is None:
+      idempotent = self._is_idempotent(xml)
+
+    request_xml = self._wrap_soap_xml_request(xml)
+    body = etree.tostring(request_xml, encoding=encoding)
+    headers = {
+      "Accept": "text/xml",
+      "Content-type": "text/xml; charset=%s " % encoding
+    }
+
+    # like ExchangeRetryPolicy.execute, timeout covers every attempt and the waits between them
+    deadline = time.time() + timeout if timeout else None
+
+    result = self.transport.create_future()
+    self._attempt(result, body, headers, retries, deadline, encoding, idempotent, check_response_codes, retry=0)
+    return result
+
+  def _attempt(self, result, body, headers, retries, deadline, encoding, idempotent, check_response_codes, retry):
+    # retries are driven from here, so the transport only makes one attempt each time
+    response = self.transport.send(body, headers, 0, self._remaining(deadline), encoding=encoding, idempotent=idempotent)
+
+    def on_response(future):
+      try:
+        result.set_result(self._parse(future.result(), encoding=encoding, check_response_codes=check_response_codes))
+      except Exception as err:
+        if retry >= retries or not self.retry_policy.is_retryable(err, idempotent=idempotent):
+          result.set_exception(err)
+          return
+
+        delay = self.retry_policy.backoff(retry, err)
+        remaining = self._remaining(deadline)
+        if remaining is not None and delay >= remaining:
+          log.debug(u'Not retrying after %s, the deadline would pass first', type(err).__name__)
+          result.set_exception(err)
+          return
+
+        log.info(u'Retrying in %.2fs after %s (retry %d of %d)', delay, type(err).__name__, retry + 1, retries)
+        self.transport.call_later(delay, lambda: self._attempt(result, body, headers, retries, deadline, encoding, idempotent, check_response_codes, retry + 1))
+
+    response.add_done_callback(on_response)
+
+  def _remaining(self, deadline):
+    if deadline is None:
+      return None
+    return max(deadline - time.time(), 0.001)
+
+  def _then(self, future, fn):
+    return self.transport.then(future, fn)
+
+  def _gather(self, futures):
+    return self.transport.gather(futures)
+
+
+class AsyncExchange2010CalendarService(Exchange2010CalendarService):
+  """ Calendar reads that return futures. See :class:`Exchange2010CalendarService` for the arguments. """
+
+  def get_event(self, id):
+    body = soap_request.get_item(exchange_id=id, format=u'AllProperties')
+    return self.service._then(self.service.send_async(body), lambda response: Exchange2010CalendarEvent(service=self.service, xml=response))
+
+  def list_events(self, start=None, end=None, details=False):
+    body = soap_request.get_calendar_items(format=u'AllProperties', start=start, end=end)
+
+    def build_list(response):
+      event_list = Exchange2010CalendarEventList(service=self.service, start=start, end=end, details=details, xml=response)
+
+      if not details or event_list.count == 0:
+        return event_list
+
+      body = soap_request.get_item(exchange_id=event_list.event_ids, format=u'AllProperties')
+      return self.service._then(self.service.send_async(body), event_list._load_details_from_xml)
+
+    return self.service._then(self.service.send_async(body), build_list)
+
+
+class AsyncExchange2010EmailService(Exchange2010EmailService):
+  """ Email reads that return futures. See :class:`Exchange2010EmailService` for the arguments. """
+
+  def get_email(self, email_id):
+    body = soap_request.get_email(email_id)
+    return self.service._then(self.service.send_async(body), lambda response: Exchange2010EmailItem(self.service, xml=response))
+
+  def get_attachment(self, attachment_id):
+    body = soap_request.get_attachment(attachment_id)
+    return self.service._then(self.service.send_async(body), lambda response: Exchange2010AttachmentItem(self.service, xml=response))
+
+  def list_emails(self, per_page=10, offset=0, folder_id=None, detail=EMAIL_ITEM_DETAIL_ALL):
+    """ Lists the emails in ``folder_id``, or in this service's folder if it isn't given. """
+    folder_id = folder_id or self.folder_id
+    body = soap_request.find_emails(folder_id=folder_id, max_per_page=per_page, offset=offset, detail=detail)
+
+    def build_list(response):
+      email_list = Exchange2010EmailList(self.service, folder_id=folder_id, max_entries=per_page, offset=offset, detail=detail, xml=response)
+
+      if detail != EMAIL_ITEM_DETAIL_IDS:
+        return email_list
+
+      def add_emails(fetched):
+        for emails in fetched:
+          email_list.emails.extend(emails)
+        return email_list
+
+      requests = [self.service._then(self.service.send_async(soap_request.get_email(ids)), email_list._emails_from_response)
+                  for ids in chunks(email_list.email_ids, email_list.FETCH_CHUNK_SIZE)]
+
+      return self.service._then(self.service._gather(requests), add_emails)
+
+    return self.service._then(self.service.send_async(body), build_list)
+
+
+class AsyncExchange2010FolderService(Exchange2010FolderService):
+  """ Folder reads that return futures. See :class:`Exchange2010FolderService` for the arguments. """
+
+  def get_folder(self, id):
+    body = soap_request.get_folder(folder_id=id, format=u'AllProperties')
+    return self.service._then(self.service.send_async(body), lambda response: Exchange2010Folder(service=self.service, xml=response))
+
+  def find_folder(self, parent_id):
+    body = soap_request.find_folder(parent_id=parent_id, format=u'AllProperties')
+    return self.service._then(self.service.send_async(body), self._parse_response_for_find_folder)
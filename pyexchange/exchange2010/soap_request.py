@@ -18,6 +18,8 @@ T = ElementMaker(namespace=TYPE_NS, nsmap=NAMESPACES)
 
 EXCHANGE_DATETIME_FORMAT = u"%Y-%m-%dT%H:%M:%SZ"
 EXCHANGE_DATE_FORMAT = u"%Y-%m-%d"
+# GetUserAvailability takes times in the request's TimeZone, without an offset
+AVAILABILITY_DATETIME_FORMAT = u"%Y-%m-%dT%H:%M:%S"
 
 DISTINGUISHED_IDS = (
   'calendar', 'contacts', 'deleteditems', 'drafts', 'inbox', 'journal', 'notes', 'outbox', 'sentitems',
@@ -27,6 +29,139 @@ DISTINGUISHED_IDS = (
   'Archiverecoverableitemsdeletions', 'Archiverecoverableitemsversions', 'Archiverecoverableitemspurges',
 )
 
+# The FieldURIs to ask for to get back each property of an event or an email. Only these are sent back when a
+# caller passes ``fields``, on top of the item's ID.
+CALENDAR_FIELD_URIS = {
+  u'subject': (u'item:Subject',),
+  u'location': (u'calendar:Location',),
+  u'availability': (u'calendar:LegacyFreeBusyStatus',),
+  u'start': (u'calendar:Start',),
+  u'end': (u'calendar:End',),
+  u'html_body': (u'item:Body',),
+  u'text_body': (u'item:Body',),
+  u'type': (u'calendar:CalendarItemType',),
+  u'reminder_minutes_before_start': (u'item:ReminderMinutesBeforeStart',),
+  u'is_all_day': (u'calendar:IsAllDayEvent',),
+  u'recurrence': (u'calendar:Recurrence',),
+  u'recurrence_end_date': (u'calendar:Recurrence',),
+  u'recurrence_days': (u'calendar:Recurrence',),
+  u'recurrence_interval': (u'calendar:Recurrence',),
+  u'organizer': (u'calendar:Organizer',),
+  u'attendees': (u'calendar:RequiredAttendees', u'calendar:OptionalAttendees'),
+  u'required_attendees': (u'calendar:RequiredAttendees',),
+  u'optional_attendees': (u'calendar:OptionalAttendees',),
+  u'resources': (u'calendar:Resources',),
+  u'conflicting_event_ids': (u'calendar:ConflictingMeetings',),
+}
+
+EMAIL_FIELD_URIS = {
+  u'subject': (u'item:Subject',),
+  u'body_html': (u'item:Body',),
+  u'size': (u'item:Size',),
+  u'sent_time': (u'item:DateTimeSent',),
+  u'created_time': (u'item:DateTimeCreated',),
+  u'received_time': (u'item:DateTimeReceived',),
+  u'has_attachments': (u'item:HasAttachments',),
+  u'attachments': (u'item:HasAttachments', u'item:Attachments'),
+  u'is_read': (u'message:IsRead',),
+  u'sender': (u'message:From',),
+  u'recipients': (u'message:ToRecipients',),
+  u'cc_recipients': (u'message:CcRecipients',),
+}
+
+# FieldURIs that FindItem (and so a CalendarView) refuses to send back - only GetItem returns them.
+FIND_ITEM_EXCLUDED_FIELD_URIS = frozenset([
+  u'item:Body', u'item:UniqueBody', u'item:MimeContent', u'item:Attachments',
+  u'calendar:RequiredAttendees', u'calendar:OptionalAttendees', u'calendar:Resources',
+  u'calendar:ConflictingMeetings', u'calendar:AdjacentMeetings',
+  u'message:ToRecipients', u'message:CcRecipients', u'message:BccRecipients',
+])
+
+# The BodyType to ask GetItem for, for each body property.
+BODY_TYPES = {
+  u'html_body': u'HTML',
+  u'text_body': u'Text',
+  u'body_html': u'HTML',
+}
+
+
+def field_uris(fields, known_fields):
+  """
+  Turns a list of property names (like u'subject') into the FieldURIs to ask Exchange for, using one of the
+  *_FIELD_URIS maps above. FieldURIs (like u'item:Categories') can be passed as they are.
+  """
+  result = []
+  for field in fields:
+    if field in known_fields:
+      uris = known_fields[field]
+    elif u':' in field:
+      uris = (field,)
+    else:
+      raise ValueError(u'Unknown field: %s' % field)
+
+    for uri in uris:
+      if uri not in result:
+        result.append(uri)
+
+  return result
+
+
+def find_item_field_uris(fields, known_fields):
+  """
+  Like :func:`field_uris`, for a FindItem. Raises ValueError for properties FindItem won't send back (see
+  FIND_ITEM_EXCLUDED_FIELD_URIS), which have to be fetched with a GetItem.
+  """
+  result = field_uris(fields, known_fields)
+
+  excluded = [uri for uri in result if uri in FIND_ITEM_EXCLUDED_FIELD_URIS]
+  if excluded:
+    raise ValueError(u'FindItem can\'t return %s - fetch them with GetItem' % u', '.join(excluded))
+
+  return result
+
+
+def needs_get_item(fields, known_fields):
+  """ Whether any of these fields can only be fetched with a GetItem. """
+  return any(uri in FIND_ITEM_EXCLUDED_FIELD_URIS for uri in field_uris(fields, known_fields))
+
+
+def find_item_fields(fields, known_fields):
+  """ The fields that FindItem can send back, leaving out the ones only a GetItem returns. """
+  return [field for field in fields if not needs_get_item([field], known_fields)]
+
+
+def body_type(fields):
+  """
+  The BodyType to ask for to get back the body in ``fields`` (see BODY_TYPES), or None to leave it to Exchange -
+  when there's no body in ``fields``, or both the HTML and the text one.
+  """
+  if fields is None:
+    return None
+
+  body_types = set(BODY_TYPES[field] for field in fields if field in BODY_TYPES)
+  return body_types.pop() if len(body_types) == 1 else None
+
+
+def item_shape(format, additional_properties=None, body_type=None):
+  """
+    <m:ItemShape>
+      <t:BaseShape>{format}</t:BaseShape>
+      <t:BodyType>{body_type}</t:BodyType>
+      <t:AdditionalProperties>
+        <t:FieldURI FieldURI="{uri}"/>
+      </t:AdditionalProperties>
+    </m:ItemShape>
+  """
+  shape = M.ItemShape(T.BaseShape(format))
+
+  if body_type:
+    shape.append(T.BodyType(body_type))
+
+  if additional_properties:
+    shape.append(T.AdditionalProperties(*[T.FieldURI(FieldURI=uri) for uri in additional_properties]))
+
+  return shape
+
 
 def exchange_header():
 
@@ -75,7 +210,7 @@ def delete_field(field_uri):
   return root
 
 
-def get_item(exchange_id, format=u"Default"):
+def get_item(exchange_id, format=u"Default", additional_properties=None, body_type=None):
   """
     Requests a calendar item from the store.
 
@@ -84,6 +219,9 @@ def get_item(exchange_id, format=u"Default"):
     format controls how much data you get back from Exchange. Full docs are here, but acceptible values
     are IdOnly, Default, and AllProperties.
 
+    additional_properties is a list of FieldURIs to get back on top of the format - usually with IdOnly,
+    to get just those. body_type is the BodyType (HTML or Text) to get the body back as.
+
     http://msdn.microsoft.com/en-us/library/aa564509(v=exchg.140).aspx
 
     <m:GetItem  xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
@@ -106,24 +244,20 @@ def get_item(exchange_id, format=u"Default"):
     elements = [T.ItemId(Id=exchange_id)]
 
   root = M.GetItem(
-    M.ItemShape(
-      T.BaseShape(format)
-    ),
+    item_shape(format, additional_properties, body_type),
     M.ItemIds(
       *elements
     )
   )
   return root
 
-def get_calendar_items(format=u"Default", start=None, end=None, max_entries=999999):
+def get_calendar_items(format=u"Default", start=None, end=None, max_entries=999999, additional_properties=None):
   start = start.strftime(EXCHANGE_DATETIME_FORMAT)
   end = end.strftime(EXCHANGE_DATETIME_FORMAT)
 
   root = M.FindItem(
     {u'Traversal': u'Shallow'},
-    M.ItemShape(
-      T.BaseShape(format)
-    ),
+    item_shape(format, additional_properties),
     M.CalendarView({
       u'MaxEntriesReturned': unicode(max_entries),
       u'StartDate': start,
@@ -135,6 +269,44 @@ def get_calendar_items(format=u"Default", start=None, end=None, max_entries=9999
   return root
 
 
+def get_user_availability(emails, start, end):
+  """
+    Requests the free/busy times of many mailboxes between start and end. Exchange wants a TimeZone even for UTC,
+    and the times in the response are in that time zone.
+
+    http://msdn.microsoft.com/en-us/library/aa564001(v=exchg.140).aspx
+  """
+  start = convert_datetime_to_utc(start).strftime(AVAILABILITY_DATETIME_FORMAT)
+  end = convert_datetime_to_utc(end).strftime(AVAILABILITY_DATETIME_FORMAT)
+
+  def utc_transition():
+    return [T.Bias(u'0'), T.Time(u'00:00:00'), T.DayOrder(u'1'), T.Month(u'1'), T.DayOfWeek(u'Sunday')]
+
+  root = M.GetUserAvailabilityRequest(
+    T.TimeZone(
+      T.Bias(u'0'),
+      T.StandardTime(*utc_transition()),
+      T.DaylightTime(*utc_transition()),
+    ),
+    M.MailboxDataArray(
+      *[T.MailboxData(
+        T.Email(T.Address(email)),
+        T.AttendeeType(u'Required'),
+        T.ExcludeConflicts(u'false'),
+      ) for email in emails]
+    ),
+    T.FreeBusyViewOptions(
+      T.TimeWindow(
+        T.StartTime(start),
+        T.EndTime(end),
+      ),
+      T.RequestedView(u'FreeBusy'),
+    ),
+  )
+
+  return root
+
+
 def get_master(exchange_id, format=u"Default"):
   """
     Requests a calendar item from the store.
@@ -252,6 +424,39 @@ def find_folder(parent_id, format=u"Default"):
   return root
 
 
+def sync_folder_items(folder_id, sync_state=None, max_changes=512, format=u"IdOnly", additional_properties=None):
+  """
+    Requests the changes to the items in a folder since sync_state. Without a sync_state, every item in the
+    folder comes back as created.
+
+    http://msdn.microsoft.com/en-us/library/aa563967(v=exchg.140).aspx
+
+    <m:SyncFolderItems>
+      <m:ItemShape>
+        <t:BaseShape>{format}</t:BaseShape>
+      </m:ItemShape>
+      <m:SyncFolderId>
+        <t:DistinguishedFolderId Id="{folder_id}"/>
+      </m:SyncFolderId>
+      <m:SyncState>{sync_state}</m:SyncState>
+      <m:MaxChangesReturned>{max_changes}</m:MaxChangesReturned>
+    </m:SyncFolderItems>
+  """
+  id = T.DistinguishedFolderId(Id=folder_id) if folder_id in DISTINGUISHED_IDS else T.FolderId(Id=folder_id)
+
+  elements = [
+    item_shape(format, additional_properties),
+    M.SyncFolderId(id),
+  ]
+
+  if sync_state is not None:
+    elements.append(M.SyncState(sync_state))
+
+  elements.append(M.MaxChangesReturned(unicode(max_changes)))
+
+  return M.SyncFolderItems(*elements)
+
+
 def delete_folder(folder):
 
   root = M.DeleteFolder(
@@ -316,23 +521,37 @@ def new_event(event):
 </m:CreateItem>
   """
 
-  id = T.DistinguishedFolderId(Id=event.calendar_id) if event.calendar_id in DISTINGUISHED_IDS else T.FolderId(Id=event.calendar_id)
+  return new_events([event])
 
-  start = convert_datetime_to_utc(event.start)
-  end = convert_datetime_to_utc(event.end)
+
+def new_events(events):
+  """
+  Requests many new events be created in the store, in the calendar of the first one. Exchange answers with a
+  CreateItemResponseMessage for each, in the same order.
+  """
+  calendar_id = events[0].calendar_id
+  id = T.DistinguishedFolderId(Id=calendar_id) if calendar_id in DISTINGUISHED_IDS else T.FolderId(Id=calendar_id)
 
   root = M.CreateItem(
     M.SavedItemFolderId(id),
     M.Items(
-      T.CalendarItem(
-        T.Subject(event.subject),
-        T.Body(event.body or u'', BodyType="HTML"),
-      )
+      *[calendar_item(event) for event in events]
     ),
     SendMeetingInvitations="SendToAllAndSaveCopy"
   )
+  return root
+
 
-  calendar_node = root.xpath(u'/m:CreateItem/m:Items/t:CalendarItem', namespaces=NAMESPACES)[0]
+def calendar_item(event):
+  """ The <t:CalendarItem> for a new event. """
+
+  start = convert_datetime_to_utc(event.start)
+  end = convert_datetime_to_utc(event.end)
+
+  calendar_node = T.CalendarItem(
+    T.Subject(event.subject),
+    T.Body(event.body or u'', BodyType="HTML"),
+  )
 
   if event.reminder_minutes_before_start:
     calendar_node.append(T.ReminderIsSet('true'))
@@ -389,7 +608,7 @@ def new_event(event):
       )
     )
 
-  return root
+  return calendar_node
 
 
 def delete_event(event):
@@ -410,26 +629,39 @@ def delete_event(event):
     </DeleteItem>
 
     """
-    root = M.DeleteItem(
-      M.ItemIds(
-        T.ItemId(Id=event.id, ChangeKey=event.change_key)
-      ),
-      DeleteType="HardDelete",
-      SendMeetingCancellations="SendToAllAndSaveCopy",
-      AffectedTaskOccurrences="AllOccurrences"
-    )
+    return delete_events([event])
 
-    return root
+
+def delete_events(events):
+  """
+  Requests many items be deleted from the store, sending cancellations like delete_event. Exchange answers with a
+  DeleteItemResponseMessage for each, in the same order.
+  """
+  root = M.DeleteItem(
+    M.ItemIds(
+      *[T.ItemId(Id=event.id, ChangeKey=event.change_key) for event in events]
+    ),
+    DeleteType="HardDelete",
+    SendMeetingCancellations="SendToAllAndSaveCopy",
+    AffectedTaskOccurrences="AllOccurrences"
+  )
+
+  return root
 
 
 def move_event(event, folder_id):
+  return move_events([event], folder_id)
+
+
+def move_events(events, folder_id):
+  """ Moves many items to folder_id. Exchange answers with a MoveItemResponseMessage for each, in the same order. """
 
   id = T.DistinguishedFolderId(Id=folder_id) if folder_id in DISTINGUISHED_IDS else T.FolderId(Id=folder_id)
 
   root = M.MoveItem(
     M.ToFolderId(id),
     M.ItemIds(
-        T.ItemId(Id=event.id, ChangeKey=event.change_key)
+        *[T.ItemId(Id=event.id, ChangeKey=event.change_key) for event in events]
     )
   )
   return root
@@ -459,20 +691,30 @@ def update_property_node(node_to_insert, field_uri):
 
 def update_item(event, updated_attributes, calendar_item_update_operation_type):
   """ Saves updates to an event in the store. Only request changes for attributes that have actually changed."""
+  return update_items([(event, updated_attributes)], calendar_item_update_operation_type)
+
+
+def update_items(changes, calendar_item_update_operation_type):
+  """
+    Saves updates to many events in one request. changes is a list of (event, updated_attributes), and
+    Exchange answers with an UpdateItemResponseMessage for each, in the same order.
+  """
 
   root = M.UpdateItem(
     M.ItemChanges(
-      T.ItemChange(
-        T.ItemId(Id=event.id, ChangeKey=event.change_key),
-        T.Updates()
-      )
+      *[item_change(event, updated_attributes) for event, updated_attributes in changes]
     ),
     ConflictResolution=u"AlwaysOverwrite",
     MessageDisposition=u"SendAndSaveCopy",
     SendMeetingInvitationsOrCancellations=calendar_item_update_operation_type
   )
+  return root
+
 
-  update_node = root.xpath(u'/m:UpdateItem/m:ItemChanges/t:ItemChange/t:Updates', namespaces=NAMESPACES)[0]
+def item_change(event, updated_attributes):
+  """ The <t:ItemChange> for an event, with a SetItemField or DeleteItemField for each of the updated attributes. """
+
+  update_node = T.Updates()
 
   # if not send_only_to_changed_attendees:
   #   # We want to resend invites, which you do by setting an attribute to the same value it has. Right now, events
@@ -610,13 +852,16 @@ def update_item(event, updated_attributes, calendar_item_update_operation_type):
         update_property_node(field_uri="calendar:Recurrence", node_to_insert=recurrence_node)
       )
 
-  return root
+  return T.ItemChange(
+    T.ItemId(Id=event.id, ChangeKey=event.change_key),
+    update_node
+  )
 
 
 
 ### Email API utility functions will be here
 
-def find_emails(folder_id="inbox", max_per_page=10, offset=0, detail="all"):
+def find_emails(folder_id="inbox", max_per_page=10, offset=0, detail="all", additional_properties=None):
     """
     Finds the emails in a specififed folder (folder_id)
     In general the message is like :
@@ -633,11 +878,15 @@ def find_emails(folder_id="inbox", max_per_page=10, offset=0, detail="all"):
     :param folder_id:
     :param max_per_page:
     :param offset:
+    :param additional_properties: FieldURIs to get back with detail="all", instead of every property
     :return: the xml object
     """
     shape = "AllProperties"
     if detail != "all":
         shape = "IdOnly"
+        additional_properties = None
+    elif additional_properties:
+        shape = "IdOnly"
 
 
     limit_node = M.IndexedPageItemView(
@@ -650,9 +899,7 @@ def find_emails(folder_id="inbox", max_per_page=10, offset=0, detail="all"):
 
     root = M.FindItem(
         {u'Traversal': u'Shallow'},
-        M.ItemShape(
-            T.BaseShape(shape)
-        ),
+        item_shape(shape, additional_properties),
         limit_node,
         M.ParentFolderIds(id)
     )
@@ -661,7 +908,7 @@ def find_emails(folder_id="inbox", max_per_page=10, offset=0, detail="all"):
 
 
 
-def get_email(email_id):
+def get_email(email_id, additional_properties=None, body_type=None):
     """
     Gets an email item back
 
@@ -677,15 +924,20 @@ def get_email(email_id):
       </ItemIds>
     </GetItem>
 
-    :param email_id:
+    :param email_id: an id, or a list of ids to get them all in one request
+    :param additional_properties: FieldURIs to get back instead of the default set of properties
+    :param body_type: the BodyType (HTML or Text) to get the body back as
     :return: xml object
     """
 
+    if type(email_id) == list:
+        ids = [T.ItemId(Id=item) for item in email_id]
+    else:
+        ids = [T.ItemId(Id=email_id)]
+
     root = M.GetItem(
-        M.ItemShape(
-            T.BaseShape("Default")
-        ),
-        M.ItemIds(T.ItemId(Id=email_id))
+        item_shape("IdOnly" if additional_properties else "Default", additional_properties, body_type),
+        M.ItemIds(*ids)
     )
 
     return root
@@ -702,16 +954,19 @@ def get_attachment(attachment_id):
       </AttachmentIds>
     </GetAttachment>
 
-    :param attachment_id: the Exchange attachment id
+    :param attachment_id: the Exchange attachment id, or a list of them
     :return: xml object
     """
+    if type(attachment_id) == list:
+        ids = [T.AttachmentId(Id=item) for item in attachment_id]
+    else:
+        ids = [T.AttachmentId(Id=attachment_id)]
+
     root = M.GetAttachment(
         M.AttachmentShape(
             T.IncludeMimeContent("true"),
         ),
-        M.AttachmentIds(
-            T.AttachmentId(Id=attachment_id)
-        )
+        M.AttachmentIds(*ids)
     )
 
     return root
@@ -0,0 +1,197 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+from bisect import bisect_left, bisect_right
+
+from .utils import convert_datetime_to_utc
+
+
+def merge_intervals(intervals):
+  """ Merges (start, end) pairs that overlap or touch, and returns them sorted by start. """
+  merged = []
+
+  for start, end in sorted(intervals):
+    if merged and start <= merged[-1][1]:
+      if end > merged[-1][1]:
+        merged[-1] = (merged[-1][0], end)
+    else:
+      merged.append((start, end))
+
+  return merged
+
+
+class _Node(object):
+  """ The intervals that contain ``center``, plus a subtree for the ones entirely before and after it. """
+
+  def __init__(self, intervals):
+    starts = sorted(start for start, _, _ in intervals)
+    self.center = center = starts[len(starts) // 2]
+
+    here, before, after = [], [], []
+    for interval in intervals:
+      start, end, _ = interval
+      if start > center:
+        after.append(interval)
+      elif end < center or (end == center and start != end):
+        before.append(interval)
+      else:
+        here.append(interval)
+
+    # the interval starting at the center always stays here, so every node holds at least one interval
+    self.by_start = sorted(here, key=lambda interval: interval[0])
+    self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+    self.left = _Node(before) if before else None
+    self.right = _Node(after) if after else None
+
+
+class ExchangeIntervalIndex(object):
+  """
+  An in-memory index of events by time, for checking conflicts without going back to Exchange. ::
+
+      events = service.calendar().list_events(start=start, end=end)
+      index = events.interval_index()
+
+      index.overlapping(start, end)     # the events between start and end
+      index.conflicts(event)            # the other events that overlap this one
+      index.free_slots(start, end)      # the gaps between events, as (start, end) pairs
+      index.max_concurrency(start, end) # the most events going on at once
+
+  Events are half-open, so back-to-back events don't overlap. Queries take O(log n + k) time, where k is the
+  number of results. The index doesn't change when the events do - build a new one instead.
+  """
+
+  def __init__(self, intervals=()):
+    """ intervals is a list of (start, end, item), where start and end are datetimes. """
+    self._intervals = []
+    for start, end, item in intervals:
+      start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+      if start is None or end is None:
+        raise ValueError(u'Every interval needs a start and an end')
+      if end < start:
+        raise ValueError(u'Intervals must not end before they start')
+      self._intervals.append((start, end, item))
+
+    self._root = _Node(self._intervals) if self._intervals else None
+
+    self._busy = merge_intervals((start, end) for start, end, _ in self._intervals if start != end)
+    self._busy_ends = [end for _, end in self._busy]
+
+    self._times, self._levels = [], []
+    level = 0
+    for time, change in sorted([(start, 1) for start, end, _ in self._intervals if start != end] +
+                               [(end, -1) for start, end, _ in self._intervals if start != end]):
+      level += change
+      if self._times and self._times[-1] == time:
+        self._levels[-1] = level
+      else:
+        self._times.append(time)
+        self._levels.append(level)
+
+  @classmethod
+  def from_events(cls, events):
+    """ Builds an index of calendar events. Takes a list of events or an event list, like from ``list_events()``. """
+    events = getattr(events, u'events', events)
+
+    for event in events:
+      if event.start is None or event.end is None:
+        raise ValueError(u'Event %s has no start or end - ask for both when fetching it' % event.id)
+
+    return cls((event.start, event.end, event) for event in events)
+
+  def __len__(self):
+    return len(self._intervals)
+
+  def overlapping(self, start, end):
+    """ The items that overlap start to end, in no particular order. """
+    start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+
+    found = []
+    nodes = [self._root] if self._root else []
+
+    while nodes:
+      node = nodes.pop()
+
+      if end <= node.center:
+        for interval_start, _, item in node.by_start:
+          if interval_start >= end:
+            break
+          found.append(item)
+        if node.left:
+          nodes.append(node.left)
+
+      elif start > node.center:
+        for _, interval_end, item in node.by_end:
+          if interval_end <= start:
+            break
+          found.append(item)
+        if node.right:
+          nodes.append(node.right)
+
+      else:
+        # only an empty interval sitting right at the start of the query can miss it
+        found.extend(item for _, interval_end, item in node.by_start if interval_end > start)
+        if node.left:
+          nodes.append(node.left)
+        if node.right:
+          nodes.append(node.right)
+
+    return found
+
+  def conflicts(self, event):
+    """ The other events that overlap this one. """
+    return [other for other in self.overlapping(event.start, event.end) if other is not event]
+
+  def busy(self, start=None, end=None):
+    """ The times something is going on, as merged (start, end) pairs, cut down to start and end if given. """
+    return list(self._busy_between(start, end))
+
+  def free_slots(self, start, end, min_duration=None):
+    """ The gaps between start and end with nothing going on, as (start, end) pairs. """
+    start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+
+    slots = []
+    free_from = start
+    for busy_start, busy_end in self._busy_between(start, end):
+      if busy_start > free_from:
+        slots.append((free_from, busy_start))
+      free_from = busy_end
+
+    if end > free_from:
+      slots.append((free_from, end))
+
+    if min_duration is not None:
+      slots = [(slot_start, slot_end) for slot_start, slot_end in slots if slot_end - slot_start >= min_duration]
+
+    return slots
+
+  def max_concurrency(self, start=None, end=None):
+    """ The most items going on at the same time between start and end, or at any time if they aren't given. """
+    if start is None and end is None:
+      return max(self._levels) if self._levels else 0
+
+    start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+
+    first = bisect_right(self._times, start) if start is not None else 0
+    last = bisect_left(self._times, end) if end is not None else len(self._times)
+
+    levels = self._levels[first:last]
+    if first > 0:
+      levels.append(self._levels[first - 1])
+
+    return max(levels) if levels else 0
+
+  def _busy_between(self, start, end):
+    start, end = convert_datetime_to_utc(start), convert_datetime_to_utc(end)
+
+    index = bisect_right(self._busy_ends, start) if start is not None else 0
+    while index < len(self._busy):
+      busy_start, busy_end = self._busy[index]
+      if end is not None and busy_start >= end:
+        break
+      index += 1
+
+      yield (max(busy_start, start) if start is not None else busy_start,
+             min(busy_end, end) if end is not None else busy_end)
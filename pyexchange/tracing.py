@@ -0,0 +1,110 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import itertools
+import logging
+import random
+
+from lxml import etree
+
+# Headers that carry credentials. Their values are never logged.
+SENSITIVE_HEADERS = frozenset([u'authorization', u'proxy-authorization', u'cookie', u'set-cookie', u'www-authenticate'])
+
+
+class ExchangeWireTracer(object):
+  """
+  Logs the requests and responses that go over the wire, for debugging.
+
+  Nothing is serialized unless the tracer's logger is enabled at its level, so leaving tracing configured in
+  production costs next to nothing. By default bodies go to the ``pyexchange.wire`` logger at DEBUG::
+
+      logging.getLogger('pyexchange.wire').setLevel(logging.DEBUG)
+
+  To keep the volume down on a busy service, trace a sample of requests and cap how much of each body is kept::
+
+      connection = ExchangeNTLMAuthConnection(url, username, password,
+                                              wire_tracer=ExchangeWireTracer(sample_rate=0.01, max_body_size=2048))
+
+  ``redact_bodies=True`` logs only the size of each body, and ``redactor`` can be any function that takes the
+  body as bytes and returns what should be logged instead. Credential headers are always masked.
+  """
+
+  def __init__(self, logger=u'pyexchange.wire', level=logging.DEBUG, sample_rate=1.0, max_body_size=8192,
+               pretty_print=False, redact_bodies=False, redactor=None):
+    self.log = logger if isinstance(logger, logging.Logger) else logging.getLogger(logger)
+    self.level = level
+    self.sample_rate = sample_rate
+    self.max_body_size = max_body_size
+    self.pretty_print = pretty_print
+    self.redact_bodies = redact_bodies
+    self.redactor = redactor
+    self._ids = itertools.count(1)
+
+  def begin(self):
+    """ Returns an :class:`ExchangeWireTrace` for the next request, or None if it shouldn't be traced. """
+    if not self.log.isEnabledFor(self.level):
+      return None
+
+    if self.sample_rate < 1 and random.random() >= self.sample_rate:
+      return None
+
+    return ExchangeWireTrace(self, next(self._ids))
+
+  def format_headers(self, headers):
+    if not headers:
+      return u'{}'
+
+    masked = dict((name, u'<redacted>' if name.lower() in SENSITIVE_HEADERS else value) for name, value in headers.items())
+    return u'%r' % masked
+
+  def format_body(self, body):
+    if body is None:
+      return u'<streamed>'
+
+    if not isinstance(body, bytes):
+      body = body.encode(u'utf-8')
+
+    if self.redactor is not None:
+      body = self.redactor(body)
+
+    if self.redact_bodies:
+      return u'<%d bytes, redacted>' % len(body)
+
+    if self.pretty_print:
+      body = self._pretty_print(body)
+
+    size = len(body)
+    if self.max_body_size is not None and size > self.max_body_size:
+      body = body[:self.max_body_size]
+      return body.decode(u'utf-8', u'replace') + u'... (%d more bytes)' % (size - self.max_body_size)
+
+    return body.decode(u'utf-8', u'replace')
+
+  def _pretty_print(self, body):
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False, remove_blank_text=True)
+    try:
+      return etree.tostring(etree.fromstring(body, parser), pretty_print=True)
+    except etree.XMLSyntaxError:
+      return body
+
+
+class ExchangeWireTrace(object):
+  """ One traced request and its response. Log lines share an id so they can be matched up when sampling. """
+
+  def __init__(self, tracer, id):
+    self.tracer = tracer
+    self.id = id
+
+  def request(self, url, headers, body):
+    self.tracer.log.log(self.tracer.level, u'[%s] POST %s headers=%s\n%s', self.id, url,
+                        self.tracer.format_headers(headers), self.tracer.format_body(body))
+
+  def response(self, status_code, headers, body):
+    self.tracer.log.log(self.tracer.level, u'[%s] %s headers=%s\n%s', self.id, status_code,
+                        self.tracer.format_headers(headers), self.tracer.format_body(body))
+
+  def error(self, err):
+    self.tracer.log.log(self.tracer.level, u'[%s] failed: %s', self.id, err)
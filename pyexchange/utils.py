@@ -4,6 +4,8 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
+import base64
+
 from pytz import utc
 
 
@@ -15,3 +17,33 @@ def convert_datetime_to_utc(datetime_to_convert):
     return datetime_to_convert.astimezone(utc)
   else:
     return utc.localize(datetime_to_convert)
+
+
+class ChunkedBase64Decoder(object):
+  """
+  Decodes base64 text that arrives in pieces of any size, and writes the decoded bytes to ``sink`` as it goes.
+  Whitespace is ignored. Call close() at the end to check nothing was left over.
+  """
+
+  def __init__(self, sink):
+    self.sink = sink
+    self.size = 0
+    self._pending = b''
+
+  def write(self, text):
+    if not isinstance(text, bytes):
+      text = text.encode(u'ascii')
+
+    data = self._pending + b''.join(text.split())
+    usable = len(data) - len(data) % 4
+
+    self._pending = data[usable:]
+
+    if usable:
+      decoded = base64.b64decode(data[:usable])
+      self.sink.write(decoded)
+      self.size += len(decoded)
+
+  def close(self):
+    if self._pending:
+      raise ValueError(u'Base64 content ended part way through a block')
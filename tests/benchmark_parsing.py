@@ -0,0 +1,98 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+
+Micro-benchmark for turning Exchange XML into objects. Run it from the root of the repo:
+
+    python -m tests.benchmark_parsing [iterations]
+
+"before" runs every property's xpath with ``element.xpath(...)``, compiling it each time, which is what
+``_xpath_to_dict`` did before extraction plans. "after" uses the cached plans. The "xpath parser" is the
+one-search-per-property event parser that the single pass parser replaced.
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from mock import patch
+
+from pyexchange import Exchange2010Service
+from pyexchange.exchange2010 import Exchange2010CalendarEvent, Exchange2010CalendarEventList, Exchange2010EmailItem, soap_request
+
+from .exchange2010.fixtures import GET_ITEM_RESPONSE, LIST_EVENTS_RESPONSE, get_emails_response
+from .exchange2010.xpath_event_parser import parse_response_for_get_event
+
+service = Exchange2010Service(connection=None)
+
+
+def xpath_to_dict(element, property_map, namespace_map):
+  """ _xpath_to_dict as it was before extraction plans, less its logging. """
+  result = {}
+
+  for key in property_map:
+    item = property_map[key]
+    nodes = element.xpath(item[u'xpath'], namespaces=namespace_map)
+
+    if nodes:
+      cast = item.get(u'cast', None)
+      result_for_node = []
+
+      for node in nodes:
+        if cast == u'datetime':
+          result_for_node.append(service._parse_date(node.text))
+        elif cast == u'date_only_naive':
+          result_for_node.append(service._parse_date_only_naive(node.text))
+        elif cast == u'int':
+          result_for_node.append(int(node.text))
+        elif cast == u'bool':
+          result_for_node.append(node.text.lower() == u'true')
+        else:
+          result_for_node.append(node.text)
+
+      result[key] = result_for_node[0] if len(result_for_node) == 1 else result_for_node
+
+  return result
+
+
+def time_it(fn, iterations):
+  fn()
+  return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def compare(name, fn, iterations):
+  with patch.object(service, u'_xpath_to_dict', side_effect=xpath_to_dict):
+    before = time_it(fn, iterations)
+
+  after = time_it(fn, iterations)
+
+  print(u'{name:<28} before {before:8.1f}us   after {after:8.1f}us   {speedup:4.1f}x'.format(
+    name=name,
+    before=before,
+    after=after,
+    speedup=before / after,
+  ))
+
+
+def run(name, fn, iterations):
+  print(u'{name:<28} {took:8.1f}us'.format(name=name, took=time_it(fn, iterations)))
+
+
+def main(iterations=500):
+  event = service._parse(GET_ITEM_RESPONSE.encode(u'utf-8'))
+  event_list = service._parse(LIST_EVENTS_RESPONSE.encode(u'utf-8'))
+  email = service._parse(get_emails_response([u'email1']).encode(u'utf-8'))
+  parser = Exchange2010CalendarEvent(service=service)
+
+  compare(u'event, xpath parser', lambda: parse_response_for_get_event(parser, event), iterations)
+  compare(u'email (GetItem)', lambda: Exchange2010EmailItem(service, xml=email), iterations)
+  run(u'event, single pass parser', lambda: parser._parse_calendar_items(event), iterations)
+  run(u'event (GetItem)', lambda: Exchange2010CalendarEvent(service=service, xml=event), iterations)
+  run(u'3 events (FindItem)', lambda: Exchange2010CalendarEventList(service=service, xml=event_list), iterations)
+  run(u'plan lookup', lambda: service._extraction_plan(Exchange2010EmailItem.MESSAGE_PROPERTY_MAP, soap_request.NAMESPACES), iterations)
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:2]])
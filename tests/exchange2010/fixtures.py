@@ -5,6 +5,7 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
+import base64
 from datetime import datetime, timedelta, date
 from pytz import utc
 from collections import namedtuple
@@ -1248,6 +1249,21 @@ a-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema" MajorVersion="14" Minor
   </s:Body>
 </s:Envelope>"""
 
+INTERNAL_SERVER_TRANSIENT_ERROR = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <m:GetItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:GetItemResponseMessage ResponseClass="Error">
+          <m:MessageText>An internal server error occurred. Try again later.</m:MessageText>
+          <m:ResponseCode>ErrorInternalServerTransientError</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+          <m:Items/>
+        </m:GetItemResponseMessage>
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
 SOAP_FAULT = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
   <s:Body>
     <s:Fault>
@@ -1715,3 +1731,319 @@ LIST_EVENTS_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/
     </m:FindItemResponse>
   </s:Body>
 </s:Envelope>"""
+
+
+# Builders for responses with any number of calendar items. Each event is an (id, start) pair.
+
+CALENDAR_ITEM_TEMPLATE = u"""
+              <t:CalendarItem>
+                <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+                <t:Subject>Subject {id}</t:Subject>
+                <t:Start>{start}</t:Start>
+                <t:End>{end}</t:End>
+              </t:CalendarItem>"""
+
+
+def calendar_items_xml(events):
+  return u''.join(CALENDAR_ITEM_TEMPLATE.format(
+    id=id,
+    start=start.strftime(EXCHANGE_DATETIME_FORMAT),
+    end=(start + timedelta(hours=1)).strftime(EXCHANGE_DATETIME_FORMAT),
+  ) for id, start in events)
+
+
+def find_calendar_items_response(events, includes_last_item_in_range=True):
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:FindItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:FindItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:RootFolder TotalItemsInView="{count}" IncludesLastItemInRange="{last}">
+            <t:Items>{items}
+            </t:Items>
+          </m:RootFolder>
+        </m:FindItemResponseMessage>
+      </m:ResponseMessages>
+    </m:FindItemResponse>
+  </s:Body>
+</s:Envelope>""".format(count=len(events), last=u'true' if includes_last_item_in_range else u'false', items=calendar_items_xml(events))
+
+
+def get_calendar_items_response(events):
+  messages = u''.join(u"""
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>{item}
+          </m:Items>
+        </m:GetItemResponseMessage>""".format(item=calendar_items_xml([event])) for event in events)
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>""".format(messages=messages)
+
+
+# Builders for responses with any number of email messages, identified by their ids.
+
+MESSAGE_TEMPLATE = u"""
+              <t:Message>
+                <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+                <t:Subject>Subject {id}</t:Subject>
+                <t:Body BodyType="HTML">Body of {id}</t:Body>
+                <t:Size>1024</t:Size>
+                <t:DateTimeSent>2050-04-22T01:01:01Z</t:DateTimeSent>
+                <t:DateTimeCreated>2050-04-22T01:01:02Z</t:DateTimeCreated>
+                <t:DateTimeReceived>2050-04-22T01:01:03Z</t:DateTimeReceived>
+                <t:HasAttachments>false</t:HasAttachments>
+                <t:From>
+                  <t:Mailbox>
+                    <t:Name>Sender</t:Name>
+                    <t:EmailAddress>sender@test.linkedin.com</t:EmailAddress>
+                    <t:RoutingType>SMTP</t:RoutingType>
+                  </t:Mailbox>
+                </t:From>
+                <t:IsRead>false</t:IsRead>
+              </t:Message>"""
+
+MESSAGE_ID_ONLY_TEMPLATE = u"""
+              <t:Message>
+                <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+              </t:Message>"""
+
+
+def find_emails_response(ids, offset=0, total=None, id_only=False):
+  template = MESSAGE_ID_ONLY_TEMPLATE if id_only else MESSAGE_TEMPLATE
+  total = len(ids) if total is None else total
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:FindItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:FindItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:RootFolder IndexedPagingOffset="{next_offset}" TotalItemsInView="{total}" IncludesLastItemInRange="{last}">
+            <t:Items>{items}
+            </t:Items>
+          </m:RootFolder>
+        </m:FindItemResponseMessage>
+      </m:ResponseMessages>
+    </m:FindItemResponse>
+  </s:Body>
+</s:Envelope>""".format(
+    next_offset=offset + len(ids),
+    total=total,
+    last=u'true' if offset + len(ids) >= total else u'false',
+    items=u''.join(template.format(id=id) for id in ids),
+  )
+
+
+def get_emails_response(ids, missing=()):
+  """ A GetItem response with a message for each id, in order. The ones in ``missing`` get ErrorItemNotFound. """
+  messages = u''.join(u"""
+        <m:GetItemResponseMessage ResponseClass="Error">
+          <m:MessageText>The specified object was not found in the store.</m:MessageText>
+          <m:ResponseCode>ErrorItemNotFound</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+          <m:Items />
+        </m:GetItemResponseMessage>""" if id in missing else u"""
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>{message}
+          </m:Items>
+        </m:GetItemResponseMessage>""".format(message=MESSAGE_TEMPLATE.format(id=id)) for id in ids)
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>""".format(messages=messages)
+
+
+def get_attachments_response(attachments):
+  """ attachments is a list of (id, name, content) - content as bytes, or an error code string to fail that one """
+  messages = []
+
+  for id, name, content in attachments:
+    if not isinstance(content, bytes):
+      messages.append(u"""
+        <m:GetAttachmentResponseMessage ResponseClass="Error">
+          <m:MessageText>Failed</m:MessageText>
+          <m:ResponseCode>{code}</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+          <m:Attachments/>
+        </m:GetAttachmentResponseMessage>""".format(code=content))
+      continue
+
+    messages.append(u"""
+        <m:GetAttachmentResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Attachments>
+            <t:FileAttachment>
+              <t:AttachmentId Id="{id}"/>
+              <t:Name>{name}</t:Name>
+              <t:ContentType>application/octet-stream</t:ContentType>
+              <t:ContentId>content-{id}</t:ContentId>
+              <t:Content>{content}</t:Content>
+            </t:FileAttachment>
+          </m:Attachments>
+        </m:GetAttachmentResponseMessage>""".format(id=id, name=name, content=base64.b64encode(content).decode('ascii')))
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetAttachmentResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}
+      </m:ResponseMessages>
+    </m:GetAttachmentResponse>
+  </s:Body>
+</s:Envelope>""".format(messages=u''.join(messages))
+
+
+def sync_folder_items_response(changes, sync_state, includes_last_item_in_range=True, item_tag=u'CalendarItem'):
+  """ changes is a list of (kind, id) - kind being Create, Update or Delete - or (u'ReadFlagChange', id, is_read) """
+  elements = []
+  for change in changes:
+    kind, id = change[0], change[1]
+
+    if kind == u'Delete':
+      elements.append(u"""
+          <t:Delete>
+            <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+          </t:Delete>""".format(id=id))
+    elif kind == u'ReadFlagChange':
+      elements.append(u"""
+          <t:ReadFlagChange>
+            <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+            <t:IsRead>{is_read}</t:IsRead>
+          </t:ReadFlagChange>""".format(id=id, is_read=u'true' if change[2] else u'false'))
+    else:
+      elements.append(u"""
+          <t:{kind}>
+            <t:{tag}>
+              <t:ItemId Id="{id}" ChangeKey="ck-{id}"/>
+            </t:{tag}>
+          </t:{kind}>""".format(kind=kind, tag=item_tag, id=id))
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:SyncFolderItemsResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:SyncFolderItemsResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:SyncState>{sync_state}</m:SyncState>
+          <m:IncludesLastItemInRange>{last}</m:IncludesLastItemInRange>
+          <m:Changes>{changes}
+          </m:Changes>
+        </m:SyncFolderItemsResponseMessage>
+      </m:ResponseMessages>
+    </m:SyncFolderItemsResponse>
+  </s:Body>
+</s:Envelope>""".format(sync_state=sync_state, last=u'true' if includes_last_item_in_range else u'false', changes=u''.join(elements))
+
+
+INVALID_SYNC_STATE_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:SyncFolderItemsResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:SyncFolderItemsResponseMessage ResponseClass="Error">
+          <m:MessageText>Synchronization state data is corrupt or otherwise invalid.</m:MessageText>
+          <m:ResponseCode>ErrorInvalidSyncStateData</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+        </m:SyncFolderItemsResponseMessage>
+      </m:ResponseMessages>
+    </m:SyncFolderItemsResponse>
+  </s:Body>
+</s:Envelope>"""
+
+
+def batch_response(operation, results, item_tag=u'CalendarItem'):
+  """
+  A response with a message per item, in order. results is a list of (id, change_key) for the items that worked,
+  None for ones that worked without sending an item back (like DeleteItem), or an error code for ones that failed.
+  """
+  messages = []
+  for result in results:
+    if result is None:
+      messages.append(u"""
+        <m:{operation}ResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+        </m:{operation}ResponseMessage>""".format(operation=operation))
+    elif isinstance(result, tuple):
+      messages.append(u"""
+        <m:{operation}ResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:{tag}>
+              <t:ItemId Id="{id}" ChangeKey="{change_key}"/>
+            </t:{tag}>
+          </m:Items>
+        </m:{operation}ResponseMessage>""".format(operation=operation, tag=item_tag, id=result[0], change_key=result[1]))
+    else:
+      messages.append(u"""
+        <m:{operation}ResponseMessage ResponseClass="Error">
+          <m:MessageText>It didn't work.</m:MessageText>
+          <m:ResponseCode>{code}</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+        </m:{operation}ResponseMessage>""".format(operation=operation, code=result))
+
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:{operation}Response xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}
+      </m:ResponseMessages>
+    </m:{operation}Response>
+  </s:Body>
+</s:Envelope>""".format(operation=operation, messages=u''.join(messages))
+
+
+def get_user_availability_response(mailboxes):
+  """
+  A GetUserAvailability response with a FreeBusyResponse for each mailbox, in order. Each is a list of
+  (start, end, busy type) with the times as Exchange writes them, or an error code.
+  """
+  responses = []
+  for mailbox in mailboxes:
+    if isinstance(mailbox, list):
+      events = u''.join(u"""
+              <CalendarEvent>
+                <StartTime>{start}</StartTime>
+                <EndTime>{end}</EndTime>
+                <BusyType>{busy_type}</BusyType>
+              </CalendarEvent>""".format(start=start, end=end, busy_type=busy_type) for start, end, busy_type in mailbox)
+      responses.append(u"""
+        <FreeBusyResponse>
+          <ResponseMessage ResponseClass="Success">
+            <ResponseCode>NoError</ResponseCode>
+          </ResponseMessage>
+          <FreeBusyView>
+            <FreeBusyViewType xmlns="http://schemas.microsoft.com/exchange/services/2006/types">FreeBusy</FreeBusyViewType>
+            <CalendarEventArray xmlns="http://schemas.microsoft.com/exchange/services/2006/types">{events}
+            </CalendarEventArray>
+          </FreeBusyView>
+        </FreeBusyResponse>""".format(events=events))
+    else:
+      responses.append(u"""
+        <FreeBusyResponse>
+          <ResponseMessage ResponseClass="Error">
+            <MessageText>It didn't work.</MessageText>
+            <ResponseCode>{code}</ResponseCode>
+            <DescriptiveLinkKey>0</DescriptiveLinkKey>
+          </ResponseMessage>
+        </FreeBusyResponse>""".format(code=mailbox))
+
+  return u"""<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+    <GetUserAvailabilityResponse xmlns="http://schemas.microsoft.com/exchange/services/2006/messages">
+      <FreeBusyResponseArray>{responses}
+      </FreeBusyResponseArray>
+    </GetUserAvailabilityResponse>
+  </soap:Body>
+</soap:Envelope>""".format(responses=u''.join(responses))
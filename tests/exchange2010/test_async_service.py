@@ -0,0 +1,172 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from mock import patch
+from pytest import raises
+from pyexchange.concurrency import ExchangeScheduler
+from pyexchange.connection import ExchangeFakeTransport, ExchangeNTLMAuthConnection, ExchangePooledNTLMAuthConnection, ExchangeThreadedTransport, ExchangeRetryPolicy
+from pyexchange.exchange2010 import soap_request
+from pyexchange.exchange2010.aio import AsyncExchange2010Service
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+
+
+class Test_AsyncExchange2010Service(unittest.TestCase):
+
+  def service_for(self, *responses):
+    self.transport = ExchangeFakeTransport(responses=list(responses))
+    return AsyncExchange2010Service(self.transport, retry_policy=ExchangeRetryPolicy(backoff_factor=0))
+
+  def test_get_event_returns_a_future(self):
+    service = self.service_for(GET_ITEM_RESPONSE)
+
+    event = service.calendar().get_event(id=TEST_EVENT.id).result()
+
+    assert event.id == TEST_EVENT.id
+    assert event.subject == TEST_EVENT.subject
+    assert TEST_EVENT.id in self.transport.requests[0].decode('utf-8')
+
+  def test_list_events(self):
+    service = self.service_for(LIST_EVENTS_RESPONSE)
+
+    event_list = service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END).result()
+
+    assert event_list.count == 3
+    assert event_list.events[1].subject == u'Event Subject 2'
+
+  def test_list_events_with_details_makes_a_second_request(self):
+    service = self.service_for(LIST_EVENTS_RESPONSE, LIST_EVENTS_RESPONSE)
+
+    event_list = service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, details=True).result()
+
+    assert len(self.transport.requests) == 2
+    assert len(event_list.events) == 3
+
+  def test_folder_reads(self):
+    service = self.service_for(GET_FOLDER_RESPONSE)
+
+    folder = service.folder().get_folder(id=TEST_FOLDER.id).result()
+
+    assert folder.id == TEST_FOLDER.id
+
+  def test_list_emails_in_another_folder(self):
+    service = self.service_for(find_emails_response([u'email1', u'email2']))
+
+    email_list = service.mail().list_emails(folder_id=u'sentitems').result(timeout=5)
+
+    assert u'Id="sentitems"' in self.transport.requests[0].decode('utf-8')
+    assert email_list.folder_id == u'sentitems'
+    assert len(email_list.emails) == 2
+
+  def test_list_emails_defaults_to_the_service_folder(self):
+    service = self.service_for(find_emails_response([]))
+
+    service.mail(folder_id=u'drafts').list_emails().result(timeout=5)
+
+    assert u'Id="drafts"' in self.transport.requests[0].decode('utf-8')
+
+  def test_exchange_errors_end_up_in_the_future(self):
+    service = self.service_for(ITEM_DOES_NOT_EXIST)
+
+    future = service.calendar().get_event(id=TEST_EVENT.id)
+
+    with raises(ExchangeItemNotFoundException):
+      future.result()
+
+  def test_transient_errors_are_retried(self):
+    service = self.service_for(INTERNAL_SERVER_TRANSIENT_ERROR, GET_ITEM_RESPONSE)
+
+    event = service.calendar().get_event(id=TEST_EVENT.id).result(timeout=5)
+
+    assert event.subject == TEST_EVENT.subject
+    assert len(self.transport.requests) == 2
+
+  def test_retries_stop_at_the_deadline(self):
+    service = self.service_for(INTERNAL_SERVER_TRANSIENT_ERROR, GET_ITEM_RESPONSE)
+
+    with patch.object(service.retry_policy, 'backoff', return_value=5):
+      future = service.send_async(soap_request.get_item(exchange_id=TEST_EVENT.id, format=u'AllProperties'), timeout=1)
+
+      with raises(ExchangeInternalServerTransientErrorException):
+        future.result(timeout=5)
+
+    assert len(self.transport.requests) == 1
+
+  def test_attempts_only_get_the_time_that_is_left(self):
+    service = self.service_for(GET_ITEM_RESPONSE)
+
+    with patch.object(self.transport, 'send', wraps=self.transport.send) as send:
+      service.calendar().get_event(id=TEST_EVENT.id).result(timeout=5)
+
+    assert 0 < send.call_args[0][3] <= 30
+
+  def test_the_transport_makes_one_attempt_each_time(self):
+    service = self.service_for(INTERNAL_SERVER_TRANSIENT_ERROR, GET_ITEM_RESPONSE)
+
+    with patch.object(self.transport, 'send', wraps=self.transport.send) as send:
+      service.calendar().get_event(id=TEST_EVENT.id).result(timeout=5)
+
+    assert [args[2] for args, _ in send.call_args_list] == [0, 0]
+
+  def test_blocking_send_still_works(self):
+    service = self.service_for(GET_ITEM_RESPONSE)
+
+    event = service.calendar().event(id=TEST_EVENT.id)
+
+    assert event.subject == TEST_EVENT.subject
+
+
+class Test_ThreadedTransport(unittest.TestCase):
+
+  def test_requests_run_on_the_pool(self):
+    connection = ExchangePooledNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD, pool_size=4)
+    transport = ExchangeThreadedTransport(connection, max_workers=4)
+    service = AsyncExchange2010Service(transport)
+
+    with patch.object(connection, 'send', return_value=GET_ITEM_RESPONSE) as send:
+      futures = [service.calendar().get_event(id=TEST_EVENT.id) for _ in range(20)]
+      assert all(future.result(timeout=5).subject == TEST_EVENT.subject for future in futures)
+
+    assert transport.pool.max_workers == 4
+    assert send.call_count == 20
+    transport.close()
+
+  def test_a_connection_that_is_not_thread_safe_gets_one_worker(self):
+    connection = ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD)
+    transport = ExchangeThreadedTransport(connection, max_workers=20)
+
+    assert transport.pool.max_workers == 1
+    transport.close()
+
+
+class Test_ExchangeScheduler(unittest.TestCase):
+
+  def test_calls_run_in_order_on_one_thread(self):
+    scheduler = ExchangeScheduler()
+    calls = []
+    done = threading.Event()
+
+    threads_before = threading.active_count()
+    for delay in [0.2, 0.1, 0.3, 0.1]:
+      scheduler.call_later(delay, lambda delay=delay: calls.append((delay, threading.current_thread())))
+    scheduler.call_later(0.4, done.set)
+
+    assert threading.active_count() == threads_before + 1
+    assert done.wait(5)
+    assert [delay for delay, _ in calls] == [0.1, 0.1, 0.2, 0.3]
+    assert len(set(thread for _, thread in calls)) == 1
+
+  def test_an_error_does_not_stop_later_calls(self):
+    scheduler = ExchangeScheduler()
+    done = threading.Event()
+
+    scheduler.call_later(0, lambda: 1 / 0)
+    scheduler.call_later(0.01, done.set)
+
+    assert done.wait(5)
@@ -0,0 +1,330 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from lxml import etree
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.concurrency import map_concurrently
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import FailedExchangeException, ExchangeItemNotFoundException, ExchangeIrresolvableConflictException
+from pyexchange.exchange2010 import Exchange2010CalendarEvent, Exchange2010CalendarService, soap_request
+
+from .fixtures import *  # noqa
+
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+EVENT_IDS = [u'event%d' % n for n in range(5)]
+
+
+class FakeExchange(object):
+  """
+  Answers batched requests item by item. Error codes queued up in ``failures`` are handed out to writes to those IDs
+  first. New events are told apart by their subject.
+  """
+
+  def __init__(self, service):
+    self.service = service
+    self.requests = []
+    self.failures = {}
+    self.lock = threading.Lock()
+
+  def __call__(self, body, **kwargs):
+    operation = etree.QName(body).localname
+
+    with self.lock:
+      if operation == u'CreateItem':
+        item_ids = [(item.findtext(T % u'Subject'), None) for item in body.iter(T % u'CalendarItem')]
+      else:
+        item_ids = [(item_id.get(u'Id'), item_id.get(u'ChangeKey')) for item_id in body.iter(T % u'ItemId')]
+      self.requests.append((operation, item_ids))
+
+      results = []
+      for id, change_key in item_ids:
+        failures = self.failures.get(id)
+        if failures and operation != u'GetItem':
+          results.append(failures.pop(0))
+        elif operation == u'GetItem':
+          results.append((id, u'fresh-%s' % id))
+        elif operation == u'CreateItem':
+          results.append((u'created-%s' % id, u'ck-created-%s' % id))
+        elif operation == u'DeleteItem':
+          results.append(None)
+        elif operation == u'MoveItem':
+          results.append((u'moved-%s' % id, u'ck-moved-%s' % id))
+        else:
+          results.append((id, u'new-%s' % id))
+
+    response = self.service._parse(batch_response(operation, results).encode('utf-8'), check_response_codes=False)
+    assert kwargs.get('check_response_codes') is False
+    return response
+
+  def operations(self):
+    return [operation for operation, _ in self.requests]
+
+
+class BulkEventTestCase(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def setUp(self):
+    self.exchange = FakeExchange(self.service)
+    response = self.service._parse(get_calendar_items_response([(id, TEST_EVENT_LIST_START) for id in EVENT_IDS]).encode('utf-8'))
+    self.events = [Exchange2010CalendarEvent(service=self.service, xml=soap_request.M.Items(item)) for item in list(response.iter(T % u'CalendarItem'))]
+
+
+class Test_UpdatingManyEvents(BulkEventTestCase):
+
+  def test_events_are_updated_in_chunks(self):
+    for event in self.events:
+      event.location = u'Building 2'
+
+    with patch.object(Exchange2010CalendarService, 'BATCH_CHUNK_SIZE', 2):
+      with patch.object(self.service, 'send', side_effect=self.exchange):
+        results = self.service.calendar().update_events(self.events)
+
+    sent = sorted(item_ids for operation, item_ids in self.exchange.requests)
+    assert sent == [[(id, u'ck-%s' % id) for id in EVENT_IDS[i:i + 2]] for i in (0, 2, 4)]
+    assert self.exchange.operations() == [u'UpdateItem'] * 3
+
+    assert [result.event for result in results] == self.events
+    assert [result.error for result in results] == [None] * 5
+    assert [event.change_key for event in self.events] == [u'new-%s' % id for id in EVENT_IDS]
+    assert all(not event._dirty_attributes for event in self.events)
+
+  def test_only_changed_attributes_are_sent(self):
+    self.events[0].location = u'Building 2'
+
+    with patch.object(self.service, 'send', side_effect=self.exchange) as send:
+      results = self.service.calendar().update_events(self.events)
+
+    body = send.call_args[0][0]
+    assert [field.get(u'FieldURI') for field in body.iter(T % u'FieldURI')] == [u'calendar:Location']
+    assert len(self.exchange.requests[0][1]) == 1
+    assert [result.error for result in results] == [None] * 5
+
+  def test_failures_are_reported_per_event(self):
+    for event in self.events:
+      event.location = u'Building 2'
+    self.exchange.failures = {EVENT_IDS[1]: [u'ErrorItemNotFound']}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().update_events(self.events)
+
+    assert isinstance(results[1].error, ExchangeItemNotFoundException)
+    assert [result.error for i, result in enumerate(results) if i != 1] == [None] * 4
+    assert self.events[1].change_key == u'ck-%s' % EVENT_IDS[1]
+    assert self.events[1]._dirty_attributes
+
+  def test_stale_change_keys_are_refreshed_and_sent_again(self):
+    for event in self.events:
+      event.location = u'Building 2'
+    self.exchange.failures = {EVENT_IDS[2]: [u'ErrorIrresolvableConflict'], EVENT_IDS[3]: [u'ErrorChangeKeyRequiredForWriteOperations']}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().update_events(self.events)
+
+    assert self.exchange.operations() == [u'UpdateItem', u'GetItem', u'UpdateItem']
+    assert self.exchange.requests[2][1] == [(EVENT_IDS[2], u'fresh-%s' % EVENT_IDS[2]), (EVENT_IDS[3], u'fresh-%s' % EVENT_IDS[3])]
+    assert [result.error for result in results] == [None] * 5
+
+  def test_conflicts_are_only_retried_once(self):
+    self.events[0].location = u'Building 2'
+    self.exchange.failures = {EVENT_IDS[0]: [u'ErrorIrresolvableConflict', u'ErrorIrresolvableConflict']}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().update_events(self.events[:1])
+
+    assert isinstance(results[0].error, ExchangeIrresolvableConflictException)
+    assert len(self.exchange.requests) == 3
+
+  def test_a_failed_request_fails_its_events_only(self):
+    for event in self.events:
+      event.location = u'Building 2'
+
+    def respond(body, **kwargs):
+      if self.events[0].id in [item_id.get(u'Id') for item_id in body.iter(T % u'ItemId')]:
+        raise FailedExchangeException(u'Unable to connect to Exchange')
+      return self.exchange(body, **kwargs)
+
+    with patch.object(Exchange2010CalendarService, 'BATCH_CHUNK_SIZE', 2):
+      with patch.object(self.service, 'send', side_effect=respond):
+        results = self.service.calendar().update_events(self.events)
+
+    assert [type(result.error) for result in results] == [FailedExchangeException] * 2 + [type(None)] * 3
+
+  def test_invalid_events_are_not_sent(self):
+    new_event = self.service.calendar().new_event(subject=u'Not created yet', start=TEST_EVENT.start, end=TEST_EVENT.end)
+    self.events[0].location = u'Building 2'
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().update_events([new_event, self.events[0]])
+
+    assert isinstance(results[0].error, TypeError)
+    assert results[1].error is None
+    assert self.exchange.requests[0][1] == [(EVENT_IDS[0], u'ck-%s' % EVENT_IDS[0])]
+
+
+class Test_SendingBulkRequests(BulkEventTestCase):
+
+  def send_updates(self):
+    for event in self.events:
+      event.location = u'Building 2'
+
+    with patch(u'pyexchange.exchange2010.map_concurrently', wraps=map_concurrently) as mock_map:
+      with patch.object(Exchange2010CalendarService, 'BATCH_CHUNK_SIZE', 2):
+        with patch.object(self.service, 'send', side_effect=self.exchange):
+          self.service.calendar().update_events(self.events)
+
+    return mock_map.call_args[1][u'max_workers']
+
+  def test_a_shared_connection_is_used_from_one_thread(self):
+    assert self.send_updates() == 1
+
+  def test_a_thread_safe_connection_is_used_concurrently(self):
+    with patch.object(self.service.connection, 'thread_safe', True):
+      assert self.send_updates() == Exchange2010CalendarService.BATCH_MAX_WORKERS
+
+
+class Test_CreatingManyEvents(BulkEventTestCase):
+
+  def new_events(self, count, calendar_id=u'calendar'):
+    return [self.service.calendar(id=calendar_id).new_event(subject=u'new%d' % n, start=TEST_EVENT.start, end=TEST_EVENT.end) for n in range(count)]
+
+  def test_events_are_created_in_chunks(self):
+    events = self.new_events(5)
+
+    with patch.object(Exchange2010CalendarService, 'BATCH_CHUNK_SIZE', 2):
+      with patch.object(self.service, 'send', side_effect=self.exchange):
+        results = self.service.calendar().create_events(events)
+
+    assert sorted(item_ids for operation, item_ids in self.exchange.requests) == [[(u'new%d' % n, None) for n in range(i, min(i + 2, 5))] for i in (0, 2, 4)]
+    assert self.exchange.operations() == [u'CreateItem'] * 3
+
+    assert [result.event for result in results] == events
+    assert [result.error for result in results] == [None] * 5
+    assert [(event.id, event.change_key) for event in events] == [(u'created-new%d' % n, u'ck-created-new%d' % n) for n in range(5)]
+
+  def test_each_request_goes_to_one_calendar(self):
+    events = self.new_events(2, u'calendar') + self.new_events(1, u'other-calendar')
+
+    with patch.object(self.service, 'send', side_effect=self.exchange) as send:
+      results = self.service.calendar().create_events(events)
+
+    folders = sorted(next(body.iter(T % u'DistinguishedFolderId', T % u'FolderId')).get(u'Id') for (body,), _ in send.call_args_list)
+    assert folders == [u'calendar', u'other-calendar']
+    assert [result.error for result in results] == [None] * 3
+    assert [event.id for event in events] == [u'created-new0', u'created-new1', u'created-new0']
+
+  def test_failures_are_reported_per_event(self):
+    events = self.new_events(3)
+    self.exchange.failures = {u'new1': [u'ErrorCalendarDurationIsTooLong']}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().create_events(events)
+
+    assert isinstance(results[1].error, FailedExchangeException)
+    assert events[1].id is None
+    assert [result.error for i, result in enumerate(results) if i != 1] == [None] * 2
+
+  def test_failed_requests_are_not_sent_again(self):
+    events = self.new_events(2)
+
+    with patch.object(self.service, 'send', side_effect=FailedExchangeException(u'Unable to connect to Exchange')) as send:
+      results = self.service.calendar().create_events(events)
+
+    assert send.call_count == 1
+    assert [type(result.error) for result in results] == [FailedExchangeException] * 2
+    assert [event.id for event in events] == [None] * 2
+
+  def test_invalid_events_are_not_sent(self):
+    events = self.new_events(2)
+    events[0].end = events[0].start - timedelta(hours=1)
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().create_events(events)
+
+    assert isinstance(results[0].error, ValueError)
+    assert results[1].error is None
+    assert self.exchange.requests == [(u'CreateItem', [(u'new1', None)])]
+
+
+class Test_CancellingManyEvents(BulkEventTestCase):
+
+  def test_events_are_cancelled_in_chunks(self):
+    with patch.object(Exchange2010CalendarService, 'BATCH_CHUNK_SIZE', 2):
+      with patch.object(self.service, 'send', side_effect=self.exchange) as send:
+        results = self.service.calendar().cancel_events(self.events)
+
+    sent = sorted(item_ids for operation, item_ids in self.exchange.requests)
+    assert sent == [[(id, u'ck-%s' % id) for id in EVENT_IDS[i:i + 2]] for i in (0, 2, 4)]
+    assert self.exchange.operations() == [u'DeleteItem'] * 3
+    assert [result.event for result in results] == self.events
+    assert [result.error for result in results] == [None] * 5
+
+    body = send.call_args[0][0]
+    assert body.get(u'DeleteType') == u'HardDelete'
+    assert body.get(u'SendMeetingCancellations') == u'SendToAllAndSaveCopy'
+    assert body.get(u'AffectedTaskOccurrences') == u'AllOccurrences'
+
+  def test_missing_change_keys_are_looked_up_together(self):
+    for event in self.events:
+      event._change_key = None
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().cancel_events(self.events)
+
+    assert self.exchange.operations() == [u'GetItem', u'DeleteItem']
+    assert self.exchange.requests[1][1] == [(id, u'fresh-%s' % id) for id in EVENT_IDS]
+    assert [result.error for result in results] == [None] * 5
+
+  def test_failures_are_reported_per_event(self):
+    new_event = self.service.calendar().new_event(subject=u'Not created yet', start=TEST_EVENT.start, end=TEST_EVENT.end)
+    self.exchange.failures = {EVENT_IDS[0]: [u'ErrorItemNotFound']}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().cancel_events([new_event] + self.events[:2])
+
+    assert isinstance(results[0].error, TypeError)
+    assert isinstance(results[1].error, ExchangeItemNotFoundException)
+    assert results[2].error is None
+    assert self.exchange.requests[0][1] == [(id, u'ck-%s' % id) for id in EVENT_IDS[:2]]
+
+
+class Test_MovingManyEvents(BulkEventTestCase):
+
+  def test_events_are_moved_in_chunks(self):
+    with patch.object(self.service, 'send', side_effect=self.exchange) as send:
+      results = self.service.calendar().move_events(self.events, u'new-calendar', chunk_size=2)
+
+    sent = sorted(item_ids for operation, item_ids in self.exchange.requests)
+    assert sent == [[(id, u'ck-%s' % id) for id in EVENT_IDS[i:i + 2]] for i in (0, 2, 4)]
+    assert self.exchange.operations() == [u'MoveItem'] * 3
+    assert next(send.call_args[0][0].iter(T % u'FolderId')).get(u'Id') == u'new-calendar'
+
+    assert [result.error for result in results] == [None] * 5
+    assert [(event.id, event.change_key) for event in self.events] == [(u'moved-%s' % id, u'ck-moved-%s' % id) for id in EVENT_IDS]
+    assert [event.calendar_id for event in self.events] == [u'new-calendar'] * 5
+
+  def test_failed_events_stay_where_they_were(self):
+    calendar_id = self.events[1].calendar_id
+    self.exchange.failures = {EVENT_IDS[1]: [u'ErrorItemNotFound'], EVENT_IDS[2]: [(u'', u'')]}
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      results = self.service.calendar().move_events(self.events[:3], u'new-calendar')
+
+    assert results[0].error is None
+    assert isinstance(results[1].error, ExchangeItemNotFoundException)
+    assert isinstance(results[2].error, ValueError)
+    assert (self.events[1].id, self.events[1].calendar_id) == (EVENT_IDS[1], calendar_id)
+
+  def test_folder_id_is_required(self):
+    with raises(TypeError):
+      self.service.calendar().move_events(self.events, None)
@@ -0,0 +1,68 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import Exchange2010CalendarEvent
+
+from .fixtures import *  # noqa
+from .xpath_event_parser import parse_response_for_get_event
+
+CALENDAR_RESPONSES = [
+  GET_ITEM_RESPONSE,
+  CONFLICTING_EVENTS_RESPONSE,
+  GET_ITEM_RESPONSE_ID_ONLY,
+  GET_RECURRING_MASTER_DAILY_EVENT,
+  GET_RECURRING_MASTER_WEEKLY_EVENT,
+  GET_RECURRING_MASTER_MONTHLY_EVENT,
+  GET_RECURRING_MASTER_YEARLY_EVENT,
+  GET_DAILY_OCCURRENCES,
+  GET_EVENT_OCCURRENCE,
+  GET_EMPTY_OCCURRENCES,
+  LIST_EVENTS_RESPONSE,
+  CREATE_ITEM_RESPONSE,
+  UPDATE_ITEM_RESPONSE,
+  MOVE_EVENT_RESPONSE,
+]
+
+
+class Test_SinglePassCalendarItemParser(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+    cls.event = Exchange2010CalendarEvent(service=cls.service)
+
+  def outcome(self, parse, response):
+    try:
+      return parse(response)
+    except Exception as err:
+      return type(err)
+
+  def test_matches_the_xpath_parser(self):
+    for fixture in CALENDAR_RESPONSES:
+      response = self.service._parse(fixture.encode('utf-8'))
+
+      expected = self.outcome(lambda response: parse_response_for_get_event(self.event, response), response)
+      actual = self.outcome(lambda response: self.event._parse_calendar_items(response)[0], response)
+
+      assert actual == expected
+
+  def test_matches_the_id_parser(self):
+    for fixture in CALENDAR_RESPONSES:
+      response = self.service._parse(fixture.encode('utf-8'))
+
+      _, id, change_key = self.event._parse_calendar_items(response)
+      assert (id, change_key) == self.event._parse_id_and_change_key_from_response(response)
+
+  def test_event_from_xml(self):
+    event = Exchange2010CalendarEvent(service=self.service, xml=self.service._parse(GET_ITEM_RESPONSE.encode('utf-8')))
+
+    assert event.id == TEST_EVENT.id
+    assert event.subject == TEST_EVENT.subject
+    assert event.organizer.email == ORGANIZER.email
+    assert len(event.attendees) == len(ATTENDEE_LIST)
@@ -0,0 +1,141 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.cache import ExchangeEventCache
+from pyexchange.concurrency import map_in_chunks
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import ExchangeItemNotFoundException, FailedExchangeException
+from pyexchange.exchange2010 import Exchange2010CalendarService
+
+from .fixtures import *  # noqa
+
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+EVENT_IDS = [u'event%d' % n for n in range(3)]
+
+
+class FakeExchange(object):
+  """ Answers GetItem requests. ``change_keys`` overrides what IdOnly requests say an event's change key is. """
+
+  def __init__(self, service):
+    self.service = service
+    self.requests = []
+    self.change_keys = {}
+    self.missing = set()
+    self.empty = set()
+    self.lock = threading.Lock()
+
+  def __call__(self, body, **kwargs):
+    shape = next(body.iter(T % u'BaseShape')).text
+    ids = [item_id.get(u'Id') for item_id in body.iter(T % u'ItemId')]
+    with self.lock:
+      self.requests.append((shape, ids))
+
+    if shape == u'IdOnly':
+      results = [u'ErrorItemNotFound' if id in self.missing else None if id in self.empty else (id, self.change_keys.get(id, u'ck-%s' % id)) for id in ids]
+      response = batch_response(u'GetItem', results)
+    elif self.empty.intersection(ids):
+      response = batch_response(u'GetItem', [None] * len(ids))
+    else:
+      response = get_calendar_items_response([(id, TEST_EVENT_LIST_START) for id in ids])
+
+    return self.service._parse(response.encode('utf-8'), check_response_codes=False)
+
+
+class Test_EventCache(unittest.TestCase):
+
+  def setUp(self):
+    self.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+    self.service.event_cache = ExchangeEventCache()
+    self.exchange = FakeExchange(self.service)
+
+  def get_events(self, ids):
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      return self.service.calendar().get_events(ids)
+
+  def test_new_events_are_fetched_and_cached(self):
+    events = self.get_events(EVENT_IDS)
+
+    assert self.exchange.requests == [(u'AllProperties', EVENT_IDS)]
+    assert [event.id for event in events] == EVENT_IDS
+    assert len(self.service.event_cache) == 3
+
+  def test_unchanged_events_come_from_the_cache(self):
+    first = self.get_events(EVENT_IDS)
+    self.exchange.requests = []
+
+    events = self.get_events(EVENT_IDS)
+
+    assert [shape for shape, _ in self.exchange.requests] == [u'IdOnly']
+    assert [(event.id, event.change_key, event.subject, event.start) for event in events] == \
+           [(event.id, event.change_key, event.subject, event.start) for event in first]
+
+  def test_only_changed_events_are_fetched_again(self):
+    self.get_events(EVENT_IDS)
+    self.exchange.requests = []
+    self.exchange.change_keys = {EVENT_IDS[1]: u'changed'}
+
+    events = self.get_events(EVENT_IDS)
+
+    assert self.exchange.requests[1] == (u'AllProperties', [EVENT_IDS[1]])
+    assert [event.id for event in events] == EVENT_IDS
+
+  def test_deleted_events_are_dropped_from_the_cache(self):
+    self.get_events(EVENT_IDS)
+    self.exchange.missing = set([EVENT_IDS[0]])
+
+    with raises(ExchangeItemNotFoundException):
+      self.get_events(EVENT_IDS)
+
+    assert sorted(self.service.event_cache.get_many(EVENT_IDS)) == EVENT_IDS[1:]
+
+  def test_a_message_without_an_item_raises(self):
+    self.exchange.empty = set([EVENT_IDS[0]])
+
+    with raises(FailedExchangeException):
+      self.get_events(EVENT_IDS[:1])
+
+    assert len(self.service.event_cache) == 0
+
+  def test_a_revalidation_message_without_an_item_raises(self):
+    self.get_events(EVENT_IDS)
+    self.exchange.empty = set([EVENT_IDS[0]])
+
+    with raises(FailedExchangeException):
+      self.get_events(EVENT_IDS)
+
+    assert sorted(self.service.event_cache.get_many(EVENT_IDS)) == EVENT_IDS
+
+  def test_get_event_uses_the_cache(self):
+    self.get_events(EVENT_IDS[:1])
+    self.exchange.requests = []
+
+    with patch.object(self.service, 'send', side_effect=self.exchange):
+      event = self.service.calendar().get_event(id=EVENT_IDS[0])
+
+    assert event.id == EVENT_IDS[0]
+    assert event.subject is not None
+    assert self.exchange.requests == [(u'IdOnly', EVENT_IDS[:1])]
+
+  def test_events_are_fetched_concurrently_only_on_a_thread_safe_connection(self):
+    for thread_safe, max_workers in [(False, 1), (True, Exchange2010CalendarService.BATCH_MAX_WORKERS)]:
+      with patch(u'pyexchange.exchange2010.map_in_chunks', wraps=map_in_chunks) as mock_map:
+        with patch.object(self.service.connection, 'thread_safe', thread_safe):
+          self.get_events(EVENT_IDS)
+
+      assert mock_map.call_args[1][u'max_workers'] == max_workers
+
+  def test_without_a_cache_everything_is_fetched(self):
+    self.service.event_cache = None
+    self.get_events(EVENT_IDS)
+    self.get_events(EVENT_IDS)
+
+    assert [shape for shape, _ in self.exchange.requests] == [u'AllProperties', u'AllProperties']
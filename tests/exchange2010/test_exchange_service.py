@@ -1 +1,130 @@
-__author__ = 'rsanders'
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import httpretty
+import unittest
+from io import BytesIO
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.base import soap
+from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeRetryPolicy
+from pyexchange.exceptions import *  # noqa
+from pyexchange.exchange2010 import soap_request
+
+from .fixtures import *  # noqa
+
+ENTITY_RESPONSE = u"""<?xml version="1.0"?>
+<!DOCTYPE s:Envelope [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages">
+      <m:ResponseMessages>
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:MessageText>&secret;</m:MessageText>
+        </m:GetItemResponseMessage>
+      </m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
+
+class Test_ParsingResponses(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def subject_of(self, tree):
+    return tree.xpath(u'//t:Subject', namespaces={u't': u'http://schemas.microsoft.com/exchange/services/2006/types'})[0].text
+
+  def test_bytes_are_parsed_as_is(self):
+    tree = self.service._parse(GET_ITEM_RESPONSE.encode('utf-8'))
+    assert self.subject_of(tree) == TEST_EVENT.subject
+
+  def test_text_is_still_accepted(self):
+    tree = self.service._parse(GET_ITEM_RESPONSE)
+    assert self.subject_of(tree) == TEST_EVENT.subject
+
+  def test_streams_are_parsed(self):
+    tree = self.service._parse(BytesIO(GET_ITEM_RESPONSE.encode('utf-8')))
+    assert self.subject_of(tree) == TEST_EVENT.subject
+
+  def test_entities_are_not_resolved(self):
+    tree = self.service._parse(ENTITY_RESPONSE.encode('utf-8'))
+    assert u'root:' not in (tree.xpath(u'string(//*[local-name()="MessageText"])') or u'')
+
+  def test_garbage_raises(self):
+    with raises(FailedExchangeException):
+      self.service._parse(b'<garbage xml')
+
+
+class Test_Retrying(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD),
+                                      retry_policy=ExchangeRetryPolicy(backoff_factor=0))
+
+  @httpretty.activate
+  def test_connection_failures_are_retried_by_the_service(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL,
+                           responses=[
+                             httpretty.Response(body="", status=503),
+                             httpretty.Response(body=GET_ITEM_RESPONSE.encode('utf-8'), status=200),
+                           ])
+
+    self.service.send(soap_request.get_item(exchange_id=TEST_EVENT.id), retries=2)
+
+    assert len(httpretty.latest_requests()) == 2
+
+  @httpretty.activate
+  def test_retries_are_not_stacked_on_the_connection_retries(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, body="", status=503)
+
+    with raises(FailedExchangeException):
+      self.service.send(soap_request.get_item(exchange_id=TEST_EVENT.id), retries=2)
+
+    assert len(httpretty.latest_requests()) == 3
+
+  def test_the_connection_makes_one_attempt_each_time(self):
+    with patch.object(self.service.connection, 'send', return_value=GET_ITEM_RESPONSE.encode('utf-8')) as send:
+      self.service.send(soap_request.get_item(exchange_id=TEST_EVENT.id), retries=2)
+
+    assert send.call_args[0][2] == 0
+
+
+class Test_ExtractionPlans(unittest.TestCase):
+
+  PROPERTY_MAP = {
+    u'subject': {u'xpath': u'//t:Subject'},
+  }
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=None)
+
+  def test_a_map_gets_the_same_plan_every_time(self):
+    plan = self.service._extraction_plan(self.PROPERTY_MAP, soap_request.NAMESPACES)
+
+    assert self.service._extraction_plan(self.PROPERTY_MAP, soap_request.NAMESPACES) is plan
+
+  def test_an_equal_map_built_on_the_fly_shares_the_plan(self):
+    plan = self.service._extraction_plan(self.PROPERTY_MAP, soap_request.NAMESPACES)
+
+    assert self.service._extraction_plan(dict(self.PROPERTY_MAP), dict(soap_request.NAMESPACES)) is plan
+
+  def test_a_changed_map_gets_a_new_plan(self):
+    plan = self.service._extraction_plan(self.PROPERTY_MAP, soap_request.NAMESPACES)
+
+    assert self.service._extraction_plan({u'subject': {u'xpath': u'//t:Location'}}, soap_request.NAMESPACES) is not plan
+
+  def test_maps_built_on_the_fly_are_not_all_kept(self):
+    for _ in range(soap.MAX_PLANS_BY_IDENTITY * 2):
+      self.service._extraction_plan(dict(self.PROPERTY_MAP), soap_request.NAMESPACES)
+
+    assert len(soap._plans.by_identity) <= soap.MAX_PLANS_BY_IDENTITY
@@ -0,0 +1,212 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from lxml import etree
+from pytest import raises
+from mock import patch
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import soap_request
+
+from .fixtures import *  # noqa
+
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+
+def base_shape(body):
+  return next(body.iter(T % u'BaseShape')).text
+
+
+def field_uris(body):
+  return [field.get(u'FieldURI') for field in body.iter(T % u'FieldURI')]
+
+
+def body_type(body):
+  return next((node.text for node in body.iter(T % u'BodyType')), None)
+
+
+def requested_ids(body):
+  return [item_id.get(u'Id') for item_id in body.iter(T % u'ItemId')]
+
+
+class Test_FieldSelectionRequests(unittest.TestCase):
+
+  def test_field_names_are_turned_into_field_uris(self):
+    uris = soap_request.field_uris([u'subject', u'attendees', u'start', u'item:Categories'], soap_request.CALENDAR_FIELD_URIS)
+
+    assert uris == [u'item:Subject', u'calendar:RequiredAttendees', u'calendar:OptionalAttendees', u'calendar:Start', u'item:Categories']
+
+  def test_field_uris_are_only_asked_for_once(self):
+    assert soap_request.field_uris([u'html_body', u'text_body'], soap_request.CALENDAR_FIELD_URIS) == [u'item:Body']
+
+  def test_unknown_fields_are_refused(self):
+    with raises(ValueError):
+      soap_request.field_uris([u'nope'], soap_request.CALENDAR_FIELD_URIS)
+
+  def test_find_item_refuses_fields_only_get_item_returns(self):
+    with raises(ValueError):
+      soap_request.find_item_field_uris([u'subject', u'required_attendees'], soap_request.CALENDAR_FIELD_URIS)
+
+    assert soap_request.find_item_field_uris([u'subject'], soap_request.CALENDAR_FIELD_URIS) == [u'item:Subject']
+
+  def test_fields_find_item_can_return(self):
+    fields = [u'subject', u'html_body', u'attendees', u'start']
+
+    assert soap_request.needs_get_item(fields, soap_request.CALENDAR_FIELD_URIS)
+    assert soap_request.find_item_fields(fields, soap_request.CALENDAR_FIELD_URIS) == [u'subject', u'start']
+    assert not soap_request.needs_get_item([u'subject', u'is_read'], soap_request.EMAIL_FIELD_URIS)
+
+  def test_the_body_type_follows_the_body_asked_for(self):
+    assert soap_request.body_type([u'subject', u'html_body']) == u'HTML'
+    assert soap_request.body_type([u'text_body']) == u'Text'
+    assert soap_request.body_type([u'body_html']) == u'HTML'
+    assert soap_request.body_type([u'html_body', u'text_body']) is None
+    assert soap_request.body_type([u'subject']) is None
+
+  def test_get_item_with_a_body_type(self):
+    body = soap_request.get_item(exchange_id=u'id', format=u'IdOnly', additional_properties=[u'item:Body'], body_type=u'Text')
+
+    assert body_type(body) == u'Text'
+    assert [etree.QName(node).localname for node in body[0]] == [u'BaseShape', u'BodyType', u'AdditionalProperties']
+
+  def test_get_item_with_additional_properties(self):
+    body = soap_request.get_item(exchange_id=u'id', format=u'IdOnly', additional_properties=[u'item:Subject'])
+
+    assert base_shape(body) == u'IdOnly'
+    assert field_uris(body) == [u'item:Subject']
+
+  def test_get_item_without_additional_properties(self):
+    body = soap_request.get_item(exchange_id=u'id', format=u'AllProperties')
+
+    assert base_shape(body) == u'AllProperties'
+    assert list(body.iter(T % u'AdditionalProperties')) == []
+
+  def test_find_emails_with_additional_properties(self):
+    body = soap_request.find_emails(additional_properties=[u'item:Subject'])
+
+    assert base_shape(body) == u'IdOnly'
+    assert field_uris(body) == [u'item:Subject']
+
+  def test_find_emails_for_ids_ignores_additional_properties(self):
+    body = soap_request.find_emails(detail=u'ids', additional_properties=[u'item:Subject'])
+
+    assert base_shape(body) == u'IdOnly'
+    assert field_uris(body) == []
+
+
+class Test_ListingEventsWithFields(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def response(self, fixture):
+    return self.service._parse(fixture.encode('utf-8'))
+
+  def test_only_the_fields_are_asked_for(self):
+    with patch.object(self.service, 'send', return_value=self.response(LIST_EVENTS_RESPONSE)) as send:
+      self.service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, fields=[u'subject', u'start', u'end'])
+
+    body = send.call_args[0][0]
+    assert base_shape(body) == u'IdOnly'
+    assert field_uris(body) == [u'item:Subject', u'calendar:Start', u'calendar:End']
+
+  def test_other_fields_are_skipped(self):
+    with patch.object(self.service, 'send', return_value=self.response(LIST_EVENTS_RESPONSE)):
+      event_list = self.service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, fields=[u'subject'])
+
+    for event in event_list.events:
+      assert event.id is not None
+      assert event.subject is not None
+      assert event.start is None
+      assert event.location is None
+
+  def test_paging_always_asks_for_start_and_end(self):
+    response = self.service._parse(find_calendar_items_response([(u'one', TEST_EVENT_LIST_START)]).encode('utf-8'))
+
+    with patch.object(self.service, 'send', return_value=response) as send:
+      list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=10, fields=[u'subject']))
+
+    assert field_uris(send.call_args[0][0]) == [u'item:Subject', u'calendar:Start', u'calendar:End']
+
+  def test_fields_a_calendar_view_cant_return_are_loaded_with_the_details(self):
+    events = [(u'one', TEST_EVENT_LIST_START), (u'two', TEST_EVENT_LIST_START)]
+    requests = []
+
+    def respond(body, **kwargs):
+      requests.append(body)
+      if etree.QName(body).localname == u'FindItem':
+        return self.response(find_calendar_items_response(events))
+      return self.response(get_calendar_items_response([event for event in events if event[0] in requested_ids(body)]))
+
+    with patch.object(self.service, 'send', side_effect=respond):
+      event_list = self.service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, fields=[u'subject', u'html_body', u'attendees'])
+
+    find_item, get_item = requests
+    assert field_uris(find_item) == [u'item:Subject']
+    assert field_uris(get_item) == [u'item:Subject', u'item:Body', u'calendar:RequiredAttendees', u'calendar:OptionalAttendees']
+    assert body_type(get_item) == u'HTML'
+    assert [event.id for event in event_list.events] == [u'one', u'two']
+
+  def test_iterating_refuses_fields_a_calendar_view_cant_return(self):
+    with patch.object(self.service, 'send_stream') as send_stream:
+      with raises(ValueError):
+        list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, fields=[u'text_body']))
+
+    assert send_stream.call_count == 0
+
+  def test_get_event_with_fields(self):
+    with patch.object(self.service, 'send', return_value=self.response(GET_ITEM_RESPONSE)) as send:
+      event = self.service.calendar().get_event(id=TEST_EVENT.id, fields=[u'subject', u'organizer'])
+
+    assert field_uris(send.call_args[0][0]) == [u'item:Subject', u'calendar:Organizer']
+    assert event.subject == TEST_EVENT.subject
+    assert event.organizer.email == ORGANIZER.email
+    assert event.attendees == []
+    assert event.location is None
+
+
+class Test_ListingEmailsWithFields(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def test_only_the_fields_are_asked_for_and_read(self):
+    response = self.service._parse(find_emails_response([u'one', u'two']).encode('utf-8'))
+
+    with patch.object(self.service, 'send', return_value=response) as send:
+      email_list = self.service.mail().list_emails(fields=[u'subject', u'is_read'])
+
+    body = send.call_args[0][0]
+    assert base_shape(body) == u'IdOnly'
+    assert field_uris(body) == [u'item:Subject', u'message:IsRead']
+
+    email = email_list.emails[0]
+    assert email.id == u'one'
+    assert email.subject == u'Subject one'
+    assert email.body_html == u''
+    assert email.sender is None
+
+  def test_fields_find_item_cant_return_are_fetched_by_id(self):
+    requests = []
+
+    def respond(body, **kwargs):
+      requests.append(body)
+      if etree.QName(body).localname == u'FindItem':
+        return self.service._parse(find_emails_response([u'one', u'two'], id_only=True).encode('utf-8'))
+      return self.service._parse(get_emails_response(requested_ids(body)).encode('utf-8'))
+
+    with patch.object(self.service, 'send', side_effect=respond):
+      email_list = self.service.mail().list_emails(fields=[u'subject', u'body_html'])
+
+    find_item, get_item = requests
+    assert base_shape(find_item) == u'IdOnly'
+    assert field_uris(find_item) == []
+    assert field_uris(get_item) == [u'item:Subject', u'item:Body']
+    assert body_type(get_item) == u'HTML'
+    assert [email.id for email in email_list.emails] == [u'one', u'two']
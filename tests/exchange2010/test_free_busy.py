@@ -0,0 +1,142 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from datetime import datetime, timedelta
+from mock import patch
+from pytz import utc
+from pyexchange import Exchange2010Service
+from pyexchange.concurrency import map_concurrently
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import FailedExchangeException
+from pyexchange.exchange2010 import Exchange2010CalendarService
+
+from .fixtures import *  # noqa
+
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+START = utc.localize(datetime(2014, 5, 1, 8))
+END = utc.localize(datetime(2014, 5, 1, 18))
+
+
+def text(body, tag):
+  return next(body.iter(T % tag)).text
+
+
+class FakeAvailability(object):
+  """ Answers GetUserAvailability requests from ``calendars``, a dict of email to (start, end, busy type) or an error code. """
+
+  def __init__(self, service, calendars):
+    self.service = service
+    self.calendars = calendars
+    self.requests = []
+    self.lock = threading.Lock()
+
+  def __call__(self, body, **kwargs):
+    emails = [address.text for address in body.iter(T % u'Address')]
+    with self.lock:
+      self.requests.append((emails, text(body, u'StartTime'), text(body, u'EndTime')))
+
+    mailboxes = [self.calendars.get(email, []) for email in emails]
+    return self.service._parse(get_user_availability_response(mailboxes).encode('utf-8'), check_response_codes=False)
+
+
+class Test_GettingFreeBusy(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def get_free_busy(self, calendars, emails, start=START, end=END, **kwargs):
+    self.exchange = FakeAvailability(self.service, calendars)
+    with patch.object(self.service, 'send', side_effect=self.exchange) as send:
+      results = self.service.calendar().get_free_busy(emails, start, end, **kwargs)
+    self.body = send.call_args[0][0]
+    return results
+
+  def test_the_request(self):
+    self.get_free_busy({}, [u'alice@example.com', u'bob@example.com'])
+
+    assert self.exchange.requests == [([u'alice@example.com', u'bob@example.com'], u'2014-05-01T08:00:00', u'2014-05-01T18:00:00')]
+    assert text(self.body, u'Bias') == u'0'
+    assert text(self.body, u'RequestedView') == u'FreeBusy'
+
+  def test_busy_times_are_merged_and_cut_to_the_window(self):
+    calendars = {
+      u'alice@example.com': [
+        (u'2014-05-01T07:00:00', u'2014-05-01T09:00:00', u'Busy'),
+        (u'2014-05-01T09:00:00', u'2014-05-01T10:00:00', u'Tentative'),
+        (u'2014-05-01T12:00:00', u'2014-05-01T13:00:00', u'Free'),
+        (u'2014-05-01T15:00:00', u'2014-05-01T20:00:00', u'OOF'),
+      ],
+    }
+
+    results = self.get_free_busy(calendars, [u'alice@example.com', u'bob@example.com'])
+
+    assert [result.email for result in results] == [u'alice@example.com', u'bob@example.com']
+    assert results[0].busy == [(START, START + timedelta(hours=2)), (START + timedelta(hours=7), END)]
+    assert results[0].error is None
+    assert results[1].busy == []
+
+  def test_busy_types_can_be_chosen(self):
+    calendars = {u'alice@example.com': [(u'2014-05-01T09:00:00', u'2014-05-01T10:00:00', u'Tentative')]}
+
+    results = self.get_free_busy(calendars, [u'alice@example.com'], busy_types=[u'Busy', u'OOF'])
+
+    assert results[0].busy == []
+
+  def test_mailboxes_are_sent_in_chunks(self):
+    emails = [u'person%d@example.com' % n for n in range(250)]
+    calendars = {u'person249@example.com': [(u'2014-05-01T09:00:00', u'2014-05-01T10:00:00', u'Busy')]}
+
+    with patch.object(Exchange2010CalendarService, 'AVAILABILITY_CHUNK_SIZE', 100):
+      results = self.get_free_busy(calendars, emails)
+
+    assert sorted(len(emails) for emails, _, _ in self.exchange.requests) == [50, 100, 100]
+    assert [result.email for result in results] == emails
+    assert results[-1].busy == [(START + timedelta(hours=1), START + timedelta(hours=2))]
+
+  def test_long_windows_are_split_up(self):
+    end = START + timedelta(days=60)
+    calendars = {u'alice@example.com': [(u'2014-06-10T00:00:00', u'2014-06-14T00:00:00', u'OOF')]}
+
+    results = self.get_free_busy(calendars, [u'alice@example.com'], end=end)
+
+    assert sorted(window for _, window, _ in self.exchange.requests) == [u'2014-05-01T08:00:00', u'2014-06-12T08:00:00']
+    assert results[0].busy == [(utc.localize(datetime(2014, 6, 10)), utc.localize(datetime(2014, 6, 14)))]
+
+  def test_failures_are_reported_per_mailbox(self):
+    calendars = {u'gone@example.com': u'ErrorMailRecipientNotFound'}
+
+    results = self.get_free_busy(calendars, [u'alice@example.com', u'gone@example.com'])
+
+    assert results[0].busy == [] and results[0].error is None
+    assert results[1].busy is None
+    assert isinstance(results[1].error, FailedExchangeException)
+
+  def test_a_failed_request_fails_its_mailboxes_only(self):
+    exchange = FakeAvailability(self.service, {})
+
+    def respond(body, **kwargs):
+      if u'person0@example.com' in [address.text for address in body.iter(T % u'Address')]:
+        raise FailedExchangeException(u'Unable to connect to Exchange')
+      return exchange(body, **kwargs)
+
+    with patch.object(self.service, 'send', side_effect=respond):
+      results = self.service.calendar().get_free_busy([u'person%d@example.com' % n for n in range(4)], START, END, chunk_size=2)
+
+    assert [type(result.error) for result in results] == [FailedExchangeException] * 2 + [type(None)] * 2
+
+  def test_requests_are_concurrent_only_on_a_thread_safe_connection(self):
+    emails = [u'person%d@example.com' % n for n in range(4)]
+
+    for thread_safe, max_workers in [(False, 1), (True, Exchange2010CalendarService.BATCH_MAX_WORKERS)]:
+      with patch(u'pyexchange.exchange2010.map_concurrently', wraps=map_concurrently) as mock_map:
+        with patch.object(self.service.connection, 'thread_safe', thread_safe):
+          self.get_free_busy({}, emails, chunk_size=2)
+
+      assert mock_map.call_args[1][u'max_workers'] == max_workers
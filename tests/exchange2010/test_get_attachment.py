@@ -0,0 +1,235 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import os
+import threading
+import unittest
+from io import BytesIO
+from mock import patch
+from httpretty import HTTPretty, httprettified
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.concurrency import map_concurrently
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import *  # noqa
+from pyexchange.utils import ChunkedBase64Decoder
+
+from .fixtures import *  # noqa
+
+
+class Test_DownloadingAttachments(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  @httprettified
+  def test_content_is_decoded_into_the_sink(self):
+    content = os.urandom(3 * 1024 * 1024 + 7)
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL,
+                           body=get_attachments_response([(u'attachment1', u'big.bin', content)]).encode('utf-8'),
+                           content_type='text/xml; charset=utf-8')
+
+    sink = BytesIO()
+    attachment = self.service.mail().download_attachment(u'attachment1', sink)
+
+    assert sink.getvalue() == content
+    assert attachment.id == u'attachment1'
+    assert attachment.name == u'big.bin'
+    assert attachment.content_type == u'application/octet-stream'
+    assert attachment.content is None
+    assert attachment.size == len(content)
+
+  @httprettified
+  def test_exchange_errors_are_raised(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL,
+                           body=get_attachments_response([(u'attachment1', u'gone.bin', u'ErrorItemNotFound')]).encode('utf-8'),
+                           content_type='text/xml; charset=utf-8')
+
+    with raises(ExchangeItemNotFoundException):
+      self.service.mail().download_attachment(u'attachment1', BytesIO())
+
+  @httprettified
+  def test_soap_faults_are_raised(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=SOAP_FAULT.encode('utf-8'), content_type='text/xml; charset=utf-8')
+
+    with raises(FailedExchangeException):
+      self.service.mail().download_attachment(u'attachment1', BytesIO())
+
+
+def test_base64_can_arrive_in_any_size_of_piece():
+  content = os.urandom(1000)
+  encoded = base64.encodestring(content) if hasattr(base64, 'encodestring') else base64.encodebytes(content)
+
+  for size in (1, 3, 5, 77, 4096):
+    sink = BytesIO()
+    decoder = ChunkedBase64Decoder(sink)
+    for start in range(0, len(encoded), size):
+      decoder.write(encoded[start:start + size])
+    decoder.close()
+
+    assert sink.getvalue() == content
+    assert decoder.size == len(content)
+
+
+def test_truncated_base64_raises():
+  decoder = ChunkedBase64Decoder(BytesIO())
+  decoder.write(b'QUJDRA')
+
+  with raises(ValueError):
+    decoder.close()
+
+
+class Test_DownloadingAttachmentsInBulk(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def setUp(self):
+    self.contents = dict((u'attachment%d' % n, os.urandom(100 * (n + 1))) for n in range(6))
+    self.requests = []
+    self.sinks = {}
+    self.lock = threading.Lock()
+
+  def respond(self, body):
+    ids = [attachment_id.get(u'Id') for attachment_id in body.iter(u'{http://schemas.microsoft.com/exchange/services/2006/types}AttachmentId')]
+
+    with self.lock:
+      self.requests.append(ids)
+
+    return BytesIO(get_attachments_response([(id, id + u'.bin', self.contents.get(id, u'ErrorItemNotFound')) for id in ids]).encode('utf-8'))
+
+  def open_sink(self, attachment):
+    sink = ClosableBytesIO()
+    with self.lock:
+      self.sinks[attachment.id] = sink
+    return sink
+
+  def test_attachments_are_grouped_and_streamed_to_their_own_sinks(self):
+    ids = sorted(self.contents)
+
+    with patch.object(self.service, 'send_stream', side_effect=self.respond):
+      results = self.service.mail().download_attachments(ids, self.open_sink, max_per_request=4)
+
+    assert sorted(self.requests) == [ids[0:4], ids[4:6]]
+    assert [result.id for result in results] == ids
+    assert all(result.error is None for result in results)
+    assert [result.attachment.name for result in results] == [id + u'.bin' for id in ids]
+
+    for id in ids:
+      assert self.sinks[id].value == self.contents[id]
+      assert self.sinks[id].closed
+
+  def test_requests_stay_under_the_size_budget(self):
+    attachments = [{u'attachment_id': id, u'size': len(self.contents[id])} for id in sorted(self.contents)]
+
+    with patch.object(self.service, 'send_stream', side_effect=self.respond):
+      self.service.mail().download_attachments(attachments, self.open_sink, max_request_size=1000)
+
+    # 100 + 200 + 300 + 400 | 500 | 600
+    assert sorted(self.requests) == [[u'attachment0', u'attachment1', u'attachment2', u'attachment3'], [u'attachment4'], [u'attachment5']]
+
+  def test_one_failing_attachment_does_not_stop_the_rest(self):
+    ids = [u'attachment0', u'missing', u'attachment1']
+
+    with patch.object(self.service, 'send_stream', side_effect=self.respond):
+      results = self.service.mail().download_attachments(ids, self.open_sink)
+
+    assert isinstance(results[1].error, ExchangeItemNotFoundException)
+    assert results[1].attachment is None
+    assert results[0].attachment.id == u'attachment0'
+    assert results[2].attachment.id == u'attachment1'
+    assert self.sinks[u'attachment1'].value == self.contents[u'attachment1']
+
+  def interrupt_first_response(self, body):
+    response = self.respond(body).getvalue()
+    if len(self.requests) > 1:
+      return BytesIO(response)
+
+    # cut the response off a little way into the second attachment's content
+    second_content = response.index(b'<t:Content>', response.index(b'<t:Content>') + 1)
+    return InterruptedStream(response[:second_content + 50])
+
+  def test_a_cut_off_request_closes_its_sink_and_only_fetches_the_rest_again(self):
+    ids = [u'attachment0', u'attachment1', u'missing', u'attachment2']
+    opened = []
+
+    def open_sink(attachment):
+      opened.append(attachment.id)
+      return self.open_sink(attachment)
+
+    with patch.object(self.service, 'send_stream', side_effect=self.interrupt_first_response):
+      with patch.object(self.service.retry_policy, 'backoff', return_value=0):
+        results = self.service.mail().download_attachments(ids, open_sink)
+
+    assert self.requests == [ids, [u'attachment1', u'missing', u'attachment2']]
+    assert opened == [u'attachment0', u'attachment1', u'attachment1', u'attachment2']
+    assert [result.error is None for result in results] == [True, True, False, True]
+    assert all(sink.closed for sink in self.sinks.values())
+    assert self.sinks[u'attachment1'].value == self.contents[u'attachment1']
+
+  def keep_cutting_off(self, body):
+    response = self.respond(body).getvalue()
+    return InterruptedStream(response[:response.rindex(b'<t:Content>') + 50])
+
+  def test_a_request_that_keeps_getting_cut_off_is_retried_as_often_as_asked(self):
+    sinks = []
+
+    def open_sink(attachment):
+      sinks.append(self.open_sink(attachment))
+      return sinks[-1]
+
+    with patch.object(self.service, 'send_stream', side_effect=self.keep_cutting_off):
+      with patch.object(self.service.retry_policy, 'backoff', return_value=0):
+        results = self.service.mail().download_attachments([u'attachment0', u'attachment1'], open_sink, retries=3)
+
+    assert self.requests == [[u'attachment0', u'attachment1']] + [[u'attachment1']] * 3
+    assert results[0].error is None
+    assert isinstance(results[1].error, ExchangeResponseInterruptedException)
+    assert [sink.closed for sink in sinks] == [True] * 5
+
+  def test_a_failed_request_does_not_lose_the_others(self):
+    ids = [u'attachment0', u'attachment1', u'attachment2', u'attachment3']
+
+    def respond(body):
+      if u'attachment2' in [attachment_id.get(u'Id') for attachment_id in body.iter(u'{http://schemas.microsoft.com/exchange/services/2006/types}AttachmentId')]:
+        raise FailedExchangeException(u'Unable to connect to Exchange')
+      return self.respond(body)
+
+    with patch.object(self.service, 'send_stream', side_effect=respond):
+      results = self.service.mail().download_attachments(ids, self.open_sink, max_per_request=2)
+
+    assert [result.error is None for result in results] == [True, True, False, False]
+    assert self.sinks[u'attachment1'].value == self.contents[u'attachment1']
+    assert str(results[2].error) == u'Unable to connect to Exchange'
+
+  def test_attachments_are_fetched_one_request_at_a_time_on_a_shared_connection(self):
+    ids = sorted(self.contents)
+
+    with patch(u'pyexchange.exchange2010.map_concurrently', wraps=map_concurrently) as mock_map:
+      with patch.object(self.service, 'send_stream', side_effect=self.respond):
+        self.service.mail().download_attachments(ids, self.open_sink, max_per_request=2)
+
+    assert mock_map.call_args[1][u'max_workers'] == 1
+
+
+class InterruptedStream(BytesIO):
+  """ Hands out its content, then fails like a dropped connection would. """
+
+  def read(self, size=-1):
+    data = BytesIO.read(self, size)
+    if not data:
+      raise ExchangeResponseInterruptedException(u'The response from Exchange was cut off')
+    return data
+
+
+class ClosableBytesIO(BytesIO):
+  """ Keeps its content around after it's been closed. """
+
+  def close(self):
+    self.value = self.getvalue()
+    BytesIO.close(self)
@@ -8,7 +8,7 @@ from httpretty import HTTPretty, httprettified, activate
 import unittest
 from pytest import raises
 from pyexchange import Exchange2010Service
-from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeRetryPolicy
 from pyexchange.exceptions import *  # noqa
 
 from .fixtures import *  # noqa
@@ -157,6 +157,27 @@ class Test_FailingToGetEvents(unittest.TestCase):
     with raises(FailedExchangeException):
      self.service.calendar().get_event(id=TEST_EVENT.id)
 
+  @activate
+  def test_transient_server_errors_are_retried(self):
+
+    service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD,
+        retry_policy=ExchangeRetryPolicy(backoff_factor=0),
+      )
+    )
+
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      responses=[
+        HTTPretty.Response(body=INTERNAL_SERVER_TRANSIENT_ERROR.encode('utf-8'), status=200, content_type='text/xml; charset=utf-8'),
+        HTTPretty.Response(body=GET_ITEM_RESPONSE.encode('utf-8'), status=200, content_type='text/xml; charset=utf-8'),
+      ]
+    )
+
+    event = service.calendar().get_event(id=TEST_EVENT.id)
+    assert event.subject == TEST_EVENT.subject
+
   @activate
   def test_requesting_an_event_and_getting_garbage_xml_throws_exception(self):
 
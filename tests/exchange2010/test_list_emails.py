@@ -0,0 +1,207 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from lxml import etree
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeFakeTransport, ExchangeRetryPolicy
+from pyexchange.exchange2010 import Exchange2010EmailList, EMAIL_ITEM_DETAIL_IDS
+from pyexchange.exchange2010.aio import AsyncExchange2010Service
+from pyexchange.exceptions import ExchangeInternalServerTransientErrorException
+
+from .fixtures import *  # noqa
+
+MESSAGE_IDS = [u'message%d' % n for n in range(7)]
+
+
+def requested_ids(body):
+  return [item_id.get(u'Id') for item_id in body.iter(u'{http://schemas.microsoft.com/exchange/services/2006/types}ItemId')]
+
+
+class Test_ListingEmailsById(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD),
+                                      retry_policy=ExchangeRetryPolicy(backoff_factor=0))
+
+  def setUp(self):
+    self.requests = []
+    self.failures = {}
+    self.lock = threading.Lock()
+
+  def respond(self, body, **kwargs):
+    with self.lock:
+      self.requests.append(body)
+      ids = requested_ids(body)
+      failing = bool(ids) and self.failures.get(ids[0], 0) > 0
+      if failing:
+        self.failures[ids[0]] -= 1
+
+    if failing:
+      raise ExchangeInternalServerTransientErrorException(u'Exchange Fault (ErrorInternalServerTransientError) from Exchange server')
+
+    if etree.QName(body).localname == u'FindItem':
+      return self.service._parse(find_emails_response(MESSAGE_IDS, id_only=True).encode('utf-8'))
+
+    return self.service._parse(get_emails_response(requested_ids(body)).encode('utf-8'))
+
+  def test_emails_are_fetched_in_batches(self):
+    with patch.object(Exchange2010EmailList, 'FETCH_CHUNK_SIZE', 3):
+      with patch.object(self.service, 'send', side_effect=self.respond):
+        email_list = self.service.mail().list_emails(per_page=10, detail=EMAIL_ITEM_DETAIL_IDS)
+
+    get_items = [requested_ids(body) for body in self.requests if etree.QName(body).localname == u'GetItem']
+
+    assert sorted(get_items) == [MESSAGE_IDS[0:3], MESSAGE_IDS[3:6], MESSAGE_IDS[6:7]]
+    assert email_list.email_ids == MESSAGE_IDS
+    assert [email.id for email in email_list.emails] == MESSAGE_IDS
+    assert email_list.emails[4].subject == u'Subject message4'
+
+  def test_a_shared_connection_is_used_from_one_thread(self):
+    threads = set()
+
+    def respond(body, **kwargs):
+      threads.add(threading.current_thread())
+      return self.respond(body)
+
+    with patch.object(Exchange2010EmailList, 'FETCH_CHUNK_SIZE', 3):
+      with patch.object(self.service, 'send', side_effect=respond):
+        self.service.mail().list_emails(per_page=10, detail=EMAIL_ITEM_DETAIL_IDS)
+
+    assert len(self.requests) == 4
+    assert len(threads) == 1
+
+  def test_a_thread_safe_connection_is_used_concurrently(self):
+    with patch.object(self.service.connection, 'thread_safe', True):
+      with patch('pyexchange.exchange2010.map_in_chunks', return_value=[]) as map_in_chunks:
+        self.service.mail().get_emails(MESSAGE_IDS)
+
+    assert map_in_chunks.call_args[1]['max_workers'] == Exchange2010EmailList.FETCH_MAX_WORKERS
+
+  def test_a_request_that_fails_once_is_retried_by_default(self):
+    self.failures[u'message3'] = 1
+
+    with patch.object(Exchange2010EmailList, 'FETCH_CHUNK_SIZE', 3):
+      with patch.object(self.service, 'send', side_effect=self.respond):
+        emails = self.service.mail().get_emails(MESSAGE_IDS)
+
+    assert len(self.requests) == 4
+    assert [email.id for email in emails] == MESSAGE_IDS
+
+  def test_a_request_is_retried_as_often_as_asked(self):
+    self.failures[u'message3'] = 5
+
+    with patch.object(Exchange2010EmailList, 'FETCH_CHUNK_SIZE', 3):
+      with patch.object(self.service, 'send', side_effect=self.respond):
+        with raises(ExchangeInternalServerTransientErrorException):
+          self.service.mail().get_emails(MESSAGE_IDS, retries=2)
+
+    assert len([body for body in self.requests if requested_ids(body)[0] == u'message3']) == 3
+
+  def test_no_ids_no_requests(self):
+    with patch.object(self.service, 'send', return_value=self.service._parse(find_emails_response([], id_only=True).encode('utf-8'))) as send:
+      email_list = self.service.mail().list_emails(detail=EMAIL_ITEM_DETAIL_IDS)
+
+    assert send.call_count == 1
+    assert email_list.emails == []
+
+  def test_async_service_batches_too(self):
+    transport = ExchangeFakeTransport(responder=lambda body: get_emails_response(requested_ids(etree.fromstring(body))).encode('utf-8')
+                                      if b'GetItem' in body else find_emails_response(MESSAGE_IDS, id_only=True).encode('utf-8'))
+    service = AsyncExchange2010Service(transport, retry_policy=ExchangeRetryPolicy(backoff_factor=0))
+
+    email_list = service.mail().list_emails(detail=EMAIL_ITEM_DETAIL_IDS).result()
+
+    assert len(transport.requests) == 2
+    assert [email.id for email in email_list.emails] == MESSAGE_IDS
+
+
+class Test_IteratingOverAFolder(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def setUp(self):
+    self.folder = [u'message%d' % n for n in range(10)]
+    self.offsets = []
+    self.lock = threading.Lock()
+
+  def find_items(self, body):
+    """ Answers FindItem with an IndexedPageItemView over self.folder, newest mail first. """
+    view = body.find(u'{http://schemas.microsoft.com/exchange/services/2006/messages}IndexedPageItemView')
+    offset = int(view.get(u'Offset'))
+    max_entries = int(view.get(u'MaxEntriesReturned'))
+
+    with self.lock:
+      self.offsets.append(offset)
+      folder = list(self.folder)
+
+    return self.service._parse(find_emails_response(folder[offset:offset + max_entries], offset=offset, total=len(folder)).encode('utf-8'))
+
+  def test_walks_the_whole_folder(self):
+    with patch.object(self.service, 'send', side_effect=self.find_items):
+      ids = [email.id for email in self.service.mail().iter_emails(per_page=4)]
+
+    assert ids == self.folder
+    assert self.offsets == [0, 4, 8]
+
+  def test_pages_are_fetched_lazily(self):
+    with patch.object(self.service, 'send', side_effect=self.find_items):
+      emails = self.service.mail().iter_emails(per_page=4)
+      next(emails)
+
+    assert self.offsets == [0]
+
+  def test_mail_arriving_midway_is_not_repeated(self):
+    folder = list(self.folder)
+
+    def new_mail_arrives(body):
+      response = self.find_items(body)
+      if len(self.offsets) == 1:
+        self.folder.insert(0, u'new message')
+      return response
+
+    with patch.object(self.service, 'send', side_effect=new_mail_arrives):
+      ids = [email.id for email in self.service.mail().iter_emails(per_page=4)]
+
+    assert ids == folder
+
+  def test_prefetching(self):
+    threads = set()
+
+    def find_items(body, **kwargs):
+      threads.add(threading.current_thread())
+      return self.find_items(body)
+
+    with patch.object(self.service.connection, 'thread_safe', True):
+      with patch.object(self.service, 'send', side_effect=find_items):
+        ids = [email.id for email in self.service.mail().iter_emails(per_page=3, prefetch=True)]
+
+    assert ids == self.folder
+    assert sorted(self.offsets) == [0, 3, 6, 9]
+    assert len(threads) == 2
+
+  def test_a_shared_connection_is_not_prefetched_from(self):
+    threads = set()
+
+    def find_items(body, **kwargs):
+      threads.add(threading.current_thread())
+      return self.find_items(body)
+
+    with patch.object(self.service, 'send', side_effect=find_items):
+      emails = self.service.mail().iter_emails(per_page=3, prefetch=True)
+      next(emails)
+      offsets = list(self.offsets)
+      ids = [u'message0'] + [email.id for email in emails]
+
+    assert offsets == [0]
+    assert ids == self.folder
+    assert threads == set([threading.current_thread()])
@@ -1,9 +1,13 @@
 
+import threading
 import unittest
+from lxml import etree
+from mock import patch
 from pytest import raises
 from httpretty import HTTPretty, httprettified
 from pyexchange import Exchange2010Service
-from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import Exchange2010CalendarEventList
+from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeRetryPolicy
 from pyexchange.exceptions import *
 
 from .fixtures import *
@@ -81,3 +85,233 @@ class Test_FailingToListEvents(unittest.TestCase):
         #        start=TEST_EVENT_LIST_START,
         #        end=TEST_EVENT_LIST_END
         #    )
+
+
+class Test_IteratingOverEvents(unittest.TestCase):
+    service = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = Exchange2010Service(
+            connection=ExchangeNTLMAuthConnection(
+                url=FAKE_EXCHANGE_URL,
+                username=FAKE_EXCHANGE_USERNAME,
+                password=FAKE_EXCHANGE_PASSWORD
+            )
+        )
+
+    @httprettified
+    def test_events_are_streamed(self):
+        HTTPretty.register_uri(
+            HTTPretty.POST, FAKE_EXCHANGE_URL,
+            body=LIST_EVENTS_RESPONSE.encode('utf-8'),
+            content_type='text/xml; charset=utf-8'
+        )
+
+        events = list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END))
+        expected = self.service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END).events
+
+        assert [event.subject for event in events] == ['Event Subject 1', 'Event Subject 2', 'Subject 3']
+        assert [event.id for event in events] == [event.id for event in expected]
+        assert [event.start for event in events] == [event.start for event in expected]
+
+    @httprettified
+    def test_exchange_errors_are_raised(self):
+        HTTPretty.register_uri(
+            HTTPretty.POST, FAKE_EXCHANGE_URL,
+            body=ITEM_DOES_NOT_EXIST.encode('utf-8'),
+            content_type='text/xml; charset=utf-8'
+        )
+
+        with raises(ExchangeItemNotFoundException):
+            list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END))
+
+    @httprettified
+    def test_soap_faults_are_raised(self):
+        HTTPretty.register_uri(
+            HTTPretty.POST, FAKE_EXCHANGE_URL,
+            body=SOAP_FAULT.encode('utf-8'),
+            content_type='text/xml; charset=utf-8'
+        )
+
+        with raises(FailedExchangeException):
+            list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END))
+
+
+class Test_LoadingAllDetails(unittest.TestCase):
+    service = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = Exchange2010Service(
+            connection=ExchangeNTLMAuthConnection(
+                url=FAKE_EXCHANGE_URL,
+                username=FAKE_EXCHANGE_USERNAME,
+                password=FAKE_EXCHANGE_PASSWORD
+            ),
+            retry_policy=ExchangeRetryPolicy(backoff_factor=0)
+        )
+
+    def setUp(self):
+        self.events = [(u'id%d' % n, TEST_EVENT_LIST_START + timedelta(hours=n)) for n in range(7)]
+        self.requested = []
+        self.failures = {}
+        self.failure = ExchangeInternalServerTransientErrorException(u'Exchange Fault (ErrorInternalServerTransientError) from Exchange server')
+        self.lock = threading.Lock()
+
+    def respond(self, body):
+        ids = [item_id.get(u'Id') for item_id in body.iter(u'{http://schemas.microsoft.com/exchange/services/2006/types}ItemId')]
+
+        with self.lock:
+            self.requested.append(ids)
+            failing = self.failures.get(ids[0], 0) > 0
+            if failing:
+                self.failures[ids[0]] -= 1
+
+        if failing:
+            raise self.failure
+
+        events = [event for event in self.events if event[0] in ids]
+        return self.service._parse(get_calendar_items_response(events).encode('utf-8'))
+
+    def event_list(self):
+        response = self.service._parse(find_calendar_items_response(self.events).encode('utf-8'))
+        return Exchange2010CalendarEventList(service=self.service, xml=response)
+
+    def test_details_are_loaded_in_chunks_and_keep_their_order(self):
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            event_list = self.event_list().load_all_details(chunk_size=3, max_workers=3)
+
+        assert sorted(self.requested) == [[u'id0', u'id1', u'id2'], [u'id3', u'id4', u'id5'], [u'id6']]
+        assert [event.id for event in event_list.events] == [id for id, _ in self.events]
+        assert event_list.count == 7
+
+    def test_details_are_loaded_one_chunk_at_a_time_on_a_shared_connection(self):
+        threads = set()
+
+        def respond(body):
+            threads.add(threading.current_thread())
+            return self.respond(body)
+
+        with patch.object(self.service, 'send', side_effect=respond):
+            self.event_list().load_all_details(chunk_size=3)
+
+        assert len(self.requested) == 3
+        assert len(threads) == 1
+
+    def test_a_chunk_that_fails_once_is_retried_by_default(self):
+        self.failures[u'id3'] = 1
+
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            event_list = self.event_list().load_all_details(chunk_size=3, max_workers=3)
+
+        assert len(self.requested) == 4
+        assert self.requested.count([u'id3', u'id4', u'id5']) == 2
+        assert [event.id for event in event_list.events] == [id for id, _ in self.events]
+
+    def test_a_chunk_is_retried_as_often_as_asked(self):
+        self.failures[u'id3'] = 3
+
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            event_list = self.event_list().load_all_details(chunk_size=3, max_workers=3, retries=5)
+
+        assert len(self.requested) == 6
+        assert [event.id for event in event_list.events] == [id for id, _ in self.events]
+
+    def test_chunks_are_not_retried_with_no_retries(self):
+        self.failures[u'id3'] = 1
+
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            with raises(ExchangeInternalServerTransientErrorException):
+                self.event_list().load_all_details(chunk_size=3, max_workers=3, retries=0)
+
+        assert len(self.requested) == 3
+
+    def test_a_chunk_that_keeps_failing_raises_and_leaves_the_events_alone(self):
+        self.failures[u'id3'] = 10
+
+        event_list = self.event_list()
+        summaries = list(event_list.events)
+
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            with raises(ExchangeInternalServerTransientErrorException):
+                event_list.load_all_details(chunk_size=3, max_workers=3, retries=5)
+
+        assert event_list.events == summaries
+        assert len(self.requested) == 8
+
+    def test_other_failures_are_never_retried(self):
+        self.failures[u'id3'] = 1
+        self.failure = FailedExchangeException(u'Exchange Fault (ErrorServerBusy) from Exchange server')
+
+        with patch.object(self.service, 'send', side_effect=self.respond):
+            with raises(FailedExchangeException):
+                self.event_list().load_all_details(chunk_size=3, max_workers=3, retries=1)
+
+        assert len(self.requested) == 3
+
+
+class Test_PagingThroughEvents(unittest.TestCase):
+    service = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = Exchange2010Service(
+            connection=ExchangeNTLMAuthConnection(
+                url=FAKE_EXCHANGE_URL,
+                username=FAKE_EXCHANGE_USERNAME,
+                password=FAKE_EXCHANGE_PASSWORD
+            )
+        )
+
+    def setUp(self):
+        # hour long events every half hour, so every event overlaps the next one
+        self.events = [(u'id%d' % n, TEST_EVENT_LIST_START + timedelta(minutes=30 * n)) for n in range(10)]
+        self.pages = []
+
+    def calendar_view(self, body):
+        """ Answers a CalendarView the way Exchange does: sorted by start, and cut short at MaxEntriesReturned. """
+        view = body.find(u'{http://schemas.microsoft.com/exchange/services/2006/messages}CalendarView')
+        start = datetime.strptime(view.get(u'StartDate'), EXCHANGE_DATETIME_FORMAT)
+        max_entries = int(view.get(u'MaxEntriesReturned'))
+        self.pages.append(start)
+
+        in_range = [event for event in self.events if event[1] + timedelta(hours=1) > start]
+        page = in_range[:max_entries]
+
+        return self.service._parse(find_calendar_items_response(page, includes_last_item_in_range=len(page) == len(in_range)).encode('utf-8'))
+
+    def test_pages_are_followed_and_deduplicated(self):
+        with patch.object(self.service, 'send', side_effect=self.calendar_view):
+            events = list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=4))
+
+        assert [event.id for event in events] == [id for id, _ in self.events]
+        assert len(self.pages) > 1
+        assert self.pages[0] == TEST_EVENT_LIST_START
+
+    def test_pages_are_fetched_lazily(self):
+        with patch.object(self.service, 'send', side_effect=self.calendar_view):
+            events = self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=4)
+            next(events)
+
+        assert len(self.pages) == 1
+
+    def test_list_events_can_page(self):
+        with patch.object(self.service, 'send', side_effect=self.calendar_view):
+            event_list = self.service.calendar().list_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=3)
+
+        assert event_list.count == 10
+        assert event_list.event_ids == [id for id, _ in self.events]
+
+    def test_page_size_is_sent(self):
+        with patch.object(self.service, 'send', side_effect=self.calendar_view) as send:
+            list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=4))
+
+        assert b'MaxEntriesReturned="4"' in etree.tostring(send.call_args[0][0])
+
+    def test_too_many_events_at_once_raises(self):
+        self.events = [(u'id%d' % n, TEST_EVENT_LIST_START) for n in range(5)]
+
+        with patch.object(self.service, 'send', side_effect=self.calendar_view):
+            with raises(FailedExchangeException):
+                list(self.service.calendar().iter_events(start=TEST_EVENT_LIST_START, end=TEST_EVENT_LIST_END, page_size=2))
@@ -0,0 +1,130 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from lxml import etree
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import ExchangeIrresolvableConflictException, ExchangeStaleChangeKeyException
+from pyexchange.exchange2010 import Exchange2010CalendarEvent
+
+from .fixtures import *  # noqa
+
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+UPDATED_CHANGE_KEY = u'updated-change-key'
+REFRESHED_CHANGE_KEY = u'refreshed-change-key'
+
+
+def item_response(operation, change_key, id=TEST_EVENT.id):
+  return u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:{operation}Response xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:{operation}ResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:CalendarItem>
+              <t:ItemId Id="{id}" ChangeKey="{change_key}"/>
+            </t:CalendarItem>
+          </m:Items>
+        </m:{operation}ResponseMessage>
+      </m:ResponseMessages>
+    </m:{operation}Response>
+  </s:Body>
+</s:Envelope>""".format(operation=operation, id=id, change_key=change_key)
+
+
+class Test_OptimisticConcurrency(unittest.TestCase):
+
+  def setUp(self):
+    self.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+    self.service.optimistic_concurrency = True
+
+    self.event = Exchange2010CalendarEvent(service=self.service, xml=self.service._parse(GET_ITEM_RESPONSE.encode('utf-8')))
+    self.requests = []
+    self.failures = []
+
+  def respond(self, body):
+    operation = etree.QName(body).localname
+    self.requests.append((operation, [item_id.get(u'ChangeKey') for item_id in body.iter(T % u'ItemId')]))
+
+    if operation == u'GetItem':
+      return self.service._parse(item_response(u'GetItem', REFRESHED_CHANGE_KEY).encode('utf-8'))
+
+    if self.failures:
+      raise self.failures.pop(0)
+
+    return self.service._parse(item_response(operation, UPDATED_CHANGE_KEY, id=TEST_EVENT_MOVED.id).encode('utf-8'))
+
+  def test_update_sends_the_cached_change_key(self):
+    self.event.location = u'New location'
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.event.update()
+
+    assert self.requests == [(u'UpdateItem', [TEST_EVENT.change_key])]
+    assert self.event.change_key == UPDATED_CHANGE_KEY
+
+  def test_stale_change_keys_are_refreshed_once(self):
+    for error in (ExchangeIrresolvableConflictException, ExchangeStaleChangeKeyException):
+      self.requests = []
+      self.failures = [error(u'stale')]
+      self.event.location = u'New location'
+
+      with patch.object(self.service, 'send', side_effect=self.respond):
+        self.event.update()
+
+      assert [operation for operation, _ in self.requests] == [u'UpdateItem', u'GetItem', u'UpdateItem']
+      assert self.requests[2][1] == [REFRESHED_CHANGE_KEY]
+
+  def test_a_second_conflict_is_raised(self):
+    self.failures = [ExchangeIrresolvableConflictException(u'stale'), ExchangeIrresolvableConflictException(u'still stale')]
+    self.event.location = u'New location'
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      with raises(ExchangeIrresolvableConflictException):
+        self.event.update()
+
+    assert len(self.requests) == 3
+
+  def test_cancel_sends_the_cached_change_key(self):
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.event.cancel()
+
+    assert self.requests == [(u'DeleteItem', [TEST_EVENT.change_key])]
+
+  def test_move_keeps_the_new_id_and_change_key(self):
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.event.move_to(u'other-calendar')
+
+    assert self.requests == [(u'MoveItem', [TEST_EVENT.change_key])]
+    assert self.event.id == TEST_EVENT_MOVED.id
+    assert self.event.change_key == UPDATED_CHANGE_KEY
+
+  def test_change_key_is_looked_up_when_there_is_none(self):
+    self.event._change_key = None
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.event.cancel()
+
+    assert [operation for operation, _ in self.requests] == [u'GetItem', u'DeleteItem']
+
+  def test_off_by_default(self):
+    self.service.optimistic_concurrency = False
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.event.cancel()
+
+    assert [operation for operation, _ in self.requests] == [u'GetItem', u'DeleteItem']
+
+  def test_events_from_the_service_have_a_change_key(self):
+    with patch.object(self.service, 'send', return_value=self.service._parse(GET_ITEM_RESPONSE.encode('utf-8'))):
+      event = self.service.calendar().get_event(id=TEST_EVENT.id)
+
+    assert event.change_key == TEST_EVENT.change_key
@@ -0,0 +1,123 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import unittest
+from lxml import etree
+from mock import patch
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import ExchangeItemNotFoundException
+from pyexchange.exchange2010 import Exchange2010EmailList
+
+from .fixtures import *  # noqa
+
+M = u'{http://schemas.microsoft.com/exchange/services/2006/messages}%s'
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+
+def requested_ids(body):
+  return [item_id.get(u'Id') for item_id in body.iter(T % u'ItemId')]
+
+
+class Test_SyncingAMailFolder(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def setUp(self):
+    self.requests = []
+    self.lock = threading.Lock()
+    self.pages = []
+    self.missing = set()
+
+  def respond(self, body, **kwargs):
+    with self.lock:
+      self.requests.append(body)
+
+    if etree.QName(body).localname == u'SyncFolderItems':
+      return self.service._parse(self.pages.pop(0).encode('utf-8'))
+
+    return self.service._parse(get_emails_response(requested_ids(body), self.missing).encode('utf-8'), check_response_codes=False)
+
+  def sync_requests(self):
+    return [body for body in self.requests if etree.QName(body).localname == u'SyncFolderItems']
+
+  def test_changes_are_yielded_a_page_at_a_time(self):
+    self.pages = [
+      sync_folder_items_response([(u'Create', u'one'), (u'ReadFlagChange', u'two', True)], u'state2', includes_last_item_in_range=False, item_tag=u'Message'),
+      sync_folder_items_response([(u'Delete', u'three'), (u'ReadFlagChange', u'four', False)], u'state3', item_tag=u'Message'),
+    ]
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      pages = list(self.service.mail(folder_id=u'inbox').iter_changes(sync_state=u'state1', max_changes=2))
+
+    assert [body.findtext(M % u'MaxChangesReturned') for body in self.sync_requests()] == [u'2', u'2']
+    assert [body.findtext(M % u'SyncState') for body in self.sync_requests()] == [u'state1', u'state2']
+
+    assert pages[0].created == [u'one']
+    assert pages[0].read_flag_changed == [(u'two', True)]
+    assert pages[0].emails is None
+    assert pages[0].sync_state == u'state2'
+    assert pages[1].deleted == [u'three']
+    assert pages[1].read_flag_changed == [(u'four', False)]
+    assert pages[1].sync_state == u'state3'
+
+  def test_any_folder_can_be_synced(self):
+    self.pages = [sync_folder_items_response([], u'state', item_tag=u'Message')] * 2
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      self.service.mail(folder_id=u'sentitems').sync_emails()
+      self.service.mail(folder_id=u'AAMkADk=').sync_emails()
+
+    first, second = [body.find(M % u'SyncFolderId')[0] for body in self.sync_requests()]
+    assert (etree.QName(first).localname, first.get(u'Id')) == (u'DistinguishedFolderId', u'sentitems')
+    assert (etree.QName(second).localname, second.get(u'Id')) == (u'FolderId', u'AAMkADk=')
+
+  def test_created_messages_can_be_fetched(self):
+    ids = [u'message%d' % n for n in range(5)]
+    self.pages = [sync_folder_items_response([(u'Create', id) for id in ids], u'state2', item_tag=u'Message')]
+
+    with patch.object(Exchange2010EmailList, 'FETCH_CHUNK_SIZE', 2):
+      with patch.object(self.service, 'send', side_effect=self.respond):
+        changes = self.service.mail().sync_emails(hydrate=True)
+
+    get_items = [requested_ids(body) for body in self.requests if etree.QName(body).localname == u'GetItem']
+
+    assert sorted(get_items) == [ids[0:2], ids[2:4], ids[4:5]]
+    assert [email.id for email in changes.emails] == ids
+    assert changes.emails[3].subject == u'Subject message3'
+
+  def test_messages_deleted_before_they_are_fetched_are_skipped(self):
+    self.pages = [sync_folder_items_response([(u'Create', u'one'), (u'Create', u'two'), (u'Create', u'three')], u'state2', item_tag=u'Message')]
+    self.missing = set([u'two'])
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      changes = self.service.mail().sync_emails(hydrate=True)
+
+    assert changes.created == [u'one', u'two', u'three']
+    assert [email.id for email in changes.emails] == [u'one', u'three']
+    assert [requested_ids(body) for body in self.requests if etree.QName(body).localname == u'GetItem'] == [[u'one', u'two', u'three']]
+
+  def test_missing_messages_raise_unless_skipped(self):
+    self.missing = set([u'two'])
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      with raises(ExchangeItemNotFoundException):
+        self.service.mail().get_emails([u'one', u'two'])
+
+  def test_only_the_fields_are_fetched(self):
+    self.pages = [sync_folder_items_response([(u'Create', u'one')], u'state2', item_tag=u'Message')]
+
+    with patch.object(self.service, 'send', side_effect=self.respond):
+      changes = self.service.mail().sync_emails(hydrate=True, fields=[u'subject'])
+
+    get_item = [body for body in self.requests if etree.QName(body).localname == u'GetItem'][0]
+    assert [field.get(u'FieldURI') for field in get_item.iter(T % u'FieldURI')] == [u'item:Subject']
+    assert changes.emails[0].subject == u'Subject one'
+    assert changes.emails[0].body_html == u''
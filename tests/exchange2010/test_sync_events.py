@@ -0,0 +1,98 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from httpretty import HTTPretty, httprettified
+from pytest import raises
+from mock import patch
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import ExchangeInvalidSyncStateException
+
+from .fixtures import *  # noqa
+
+M = u'{http://schemas.microsoft.com/exchange/services/2006/messages}%s'
+T = u'{http://schemas.microsoft.com/exchange/services/2006/types}%s'
+
+
+class Test_SyncingACalendar(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(connection=ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD))
+
+  def responses(self, *fixtures):
+    return [self.service._parse(fixture.encode('utf-8')) for fixture in fixtures]
+
+  def test_first_sync_has_no_sync_state(self):
+    with patch.object(self.service, 'send', side_effect=self.responses(sync_folder_items_response([(u'Create', u'one')], u'state1'))) as send:
+      changes = self.service.calendar().sync_events(max_changes=100)
+
+    body = send.call_args[0][0]
+    assert body.find(M % u'SyncState') is None
+    assert body.findtext(M % u'MaxChangesReturned') == u'100'
+    assert body.find(u'%s/%s' % (M % u'SyncFolderId', T % u'DistinguishedFolderId')).get(u'Id') == u'calendar'
+
+    assert changes.created == [u'one']
+    assert changes.sync_state == u'state1'
+
+  def test_changes_since_a_sync_state(self):
+    response = sync_folder_items_response([(u'Create', u'one'), (u'Update', u'two'), (u'Delete', u'three')], u'state2')
+
+    with patch.object(self.service, 'send', side_effect=self.responses(response)) as send:
+      changes = self.service.calendar().sync_events(sync_state=u'state1')
+
+    assert send.call_args[0][0].findtext(M % u'SyncState') == u'state1'
+    assert changes.created == [u'one']
+    assert changes.updated == [u'two']
+    assert changes.deleted == [u'three']
+    assert changes.sync_state == u'state2'
+
+  def test_pages_are_followed_until_the_last_item(self):
+    pages = self.responses(
+      sync_folder_items_response([(u'Create', u'one'), (u'Create', u'two')], u'state2', includes_last_item_in_range=False),
+      sync_folder_items_response([(u'Update', u'one'), (u'Delete', u'two'), (u'Update', u'three')], u'state3'),
+    )
+
+    with patch.object(self.service, 'send', side_effect=pages) as send:
+      changes = self.service.calendar().sync_events(sync_state=u'state1', max_changes=2)
+
+    assert [body.findtext(M % u'SyncState') for (body,), _ in send.call_args_list] == [u'state1', u'state2']
+    assert changes.created == [u'one']
+    assert changes.updated == [u'three']
+    assert changes.deleted == []
+    assert changes.sync_state == u'state3'
+
+  def test_each_page_has_its_own_sync_state(self):
+    pages = self.responses(
+      sync_folder_items_response([(u'Create', u'one')], u'state2', includes_last_item_in_range=False),
+      sync_folder_items_response([(u'Delete', u'one')], u'state3'),
+    )
+
+    with patch.object(self.service, 'send', side_effect=pages):
+      changes = list(self.service.calendar().iter_event_changes(sync_state=u'state1'))
+
+    assert [(page.created, page.deleted, page.sync_state) for page in changes] == [([u'one'], [], u'state2'), ([], [u'one'], u'state3')]
+
+  def test_pages_are_only_fetched_when_needed(self):
+    pages = self.responses(sync_folder_items_response([(u'Create', u'one')], u'state2', includes_last_item_in_range=False))
+
+    with patch.object(self.service, 'send', side_effect=pages) as send:
+      first = next(self.service.calendar().iter_event_changes())
+
+    assert send.call_count == 1
+    assert not first.includes_last_item
+
+  @httprettified
+  def test_invalid_sync_state(self):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=INVALID_SYNC_STATE_RESPONSE.encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+
+    with raises(ExchangeInvalidSyncStateException):
+      self.service.calendar().sync_events(sync_state=u'garbage')
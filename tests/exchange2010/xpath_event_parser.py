@@ -0,0 +1,159 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+
+The xpath event parser that Exchange2010CalendarItemParser replaced. It runs one search over the whole response for
+every property, and is kept here as the reference the single pass parser is checked (and benchmarked) against.
+"""
+from pyexchange.base.calendar import ExchangeEventOrganizer, ExchangeEventResponse
+from pyexchange.exchange2010 import soap_request
+
+EVENT_PROPERTY_MAP = {
+  u'subject': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Subject',
+  },
+  u'location': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Location',
+  },
+  u'availability': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:LegacyFreeBusyStatus',
+  },
+  u'start': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Start',
+    u'cast': u'datetime',
+  },
+  u'end': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:End',
+    u'cast': u'datetime',
+  },
+  u'html_body': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Body[@BodyType="HTML"]',
+  },
+  u'text_body': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Body[@BodyType="Text"]',
+  },
+  u'_type': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:CalendarItemType',
+  },
+  u'reminder_minutes_before_start': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:ReminderMinutesBeforeStart',
+    u'cast': u'int',
+  },
+  u'is_all_day': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:IsAllDayEvent',
+    u'cast': u'bool',
+  },
+  u'recurrence_end_date': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:EndDateRecurrence/t:EndDate',
+    u'cast': u'date_only_naive',
+  },
+  u'recurrence_interval': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/*/t:Interval',
+    u'cast': u'int',
+  },
+  u'recurrence_days': {
+    u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:WeeklyRecurrence/t:DaysOfWeek',
+  },
+}
+
+ORGANIZER_PROPERTY_MAP = {
+  u'name': {
+    u'xpath': u't:Name'
+  },
+  u'email': {
+    u'xpath': u't:EmailAddress'
+  },
+}
+
+ATTENDEE_PROPERTY_MAP = {
+  u'name': {
+    u'xpath': u't:Mailbox/t:Name'
+  },
+  u'email': {
+    u'xpath': u't:Mailbox/t:EmailAddress'
+  },
+  u'response': {
+    u'xpath': u't:ResponseType'
+  },
+  u'last_response': {
+    u'xpath': u't:LastResponseTime',
+    u'cast': u'datetime'
+  },
+}
+
+RECURRENCE_TYPES = (
+  (u't:DailyRecurrence', u'daily'),
+  (u't:WeeklyRecurrence', u'weekly'),
+  (u't:AbsoluteMonthlyRecurrence', u'monthly'),
+  (u't:AbsoluteYearlyRecurrence', u'yearly'),
+)
+
+
+def parse_response_for_get_event(event, response):
+  result = parse_event_properties(event, response)
+
+  organizer_properties = parse_event_organizer(event, response)
+  if organizer_properties is not None:
+    if 'email' not in organizer_properties:
+      organizer_properties['email'] = None
+    result[u'organizer'] = ExchangeEventOrganizer(**organizer_properties)
+
+  attendee_properties = parse_event_attendees(event, response)
+  result[u'_attendees'] = event._build_resource_dictionary([ExchangeEventResponse(**attendee) for attendee in attendee_properties])
+
+  resource_properties = parse_event_attendees(event, response, paths=[(u'Resources', True)])
+  result[u'_resources'] = event._build_resource_dictionary([ExchangeEventResponse(**resource) for resource in resource_properties])
+
+  result['_conflicting_event_ids'] = parse_event_conflicts(response)
+
+  return result
+
+
+def parse_event_properties(event, response):
+  result = event.service._xpath_to_dict(element=response, property_map=EVENT_PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
+
+  try:
+    recurrence_node = response.xpath(u'//m:Items/t:CalendarItem/t:Recurrence', namespaces=soap_request.NAMESPACES)[0]
+  except IndexError:
+    recurrence_node = None
+
+  if recurrence_node is not None:
+    for path, recurrence in RECURRENCE_TYPES:
+      if recurrence_node.find(path, namespaces=soap_request.NAMESPACES) is not None:
+        result['recurrence'] = recurrence
+        break
+
+  return result
+
+
+def parse_event_organizer(event, response):
+  organizer = response.xpath(u'//m:Items/t:CalendarItem/t:Organizer/t:Mailbox', namespaces=soap_request.NAMESPACES)
+
+  if organizer:
+    return event.service._xpath_to_dict(element=organizer[0], property_map=ORGANIZER_PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
+  else:
+    return None
+
+
+def parse_event_attendees(event, response, paths=((u'RequiredAttendees', True), (u'OptionalAttendees', False))):
+  result = []
+
+  for path, required in paths:
+    attendees = response.xpath(u'//m:Items/t:CalendarItem/t:%s/t:Attendee' % path, namespaces=soap_request.NAMESPACES)
+    for attendee in attendees:
+      attendee_properties = event.service._xpath_to_dict(element=attendee, property_map=ATTENDEE_PROPERTY_MAP, namespace_map=soap_request.NAMESPACES)
+      attendee_properties[u'required'] = required
+
+      if u'last_response' not in attendee_properties:
+        attendee_properties[u'last_response'] = None
+
+      result.append(attendee_properties)
+
+  return result
+
+
+def parse_event_conflicts(response):
+  conflicting_ids = response.xpath(u'//m:Items/t:CalendarItem/t:ConflictingMeetings/t:CalendarItem/t:ItemId', namespaces=soap_request.NAMESPACES)
+  return [id_element.get(u"Id") for id_element in conflicting_ids]
@@ -0,0 +1,54 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyexchange.cache import ExchangeEventCache
+
+
+class Test_ExchangeEventCache(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, u'events.db')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def test_entries_are_stored_and_replaced(self):
+    cache = ExchangeEventCache()
+    cache.put_many([(u'one', u'ck1', b'<item/>'), (u'two', u'ck2', b'<other/>')])
+    cache.put_many([(u'one', u'ck3', b'<newer/>')])
+
+    assert cache.get_many([u'one', u'two', u'three']) == {u'one': (u'ck3', b'<newer/>'), u'two': (u'ck2', b'<other/>')}
+    assert len(cache) == 2
+
+  def test_entries_can_be_discarded(self):
+    cache = ExchangeEventCache()
+    cache.put_many([(u'one', u'ck1', b'<item/>'), (u'two', u'ck2', b'<other/>')])
+
+    cache.discard_many([u'one'])
+    assert list(cache.get_many([u'one', u'two'])) == [u'two']
+
+    cache.clear()
+    assert len(cache) == 0
+
+  def test_lots_of_ids_can_be_looked_up(self):
+    cache = ExchangeEventCache()
+    ids = [u'id%d' % n for n in range(2000)]
+    cache.put_many([(id, u'ck', b'<item/>') for id in ids])
+
+    assert sorted(cache.get_many(ids)) == sorted(ids)
+
+  def test_entries_are_kept_on_disk(self):
+    cache = ExchangeEventCache(self.path)
+    cache.put_many([(u'one', u'ck1', b'<item/>')])
+    cache.close()
+
+    assert ExchangeEventCache(self.path).get_many([u'one']) == {u'one': (u'ck1', b'<item/>')}
@@ -5,10 +5,13 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
 import httpretty
+import requests
+import threading
+import time
 import unittest
 from mock import patch, MagicMock, call
 from pytest import raises
-from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeOauthConnection
+from pyexchange.connection import ExchangeNTLMAuthConnection, ExchangeOauthConnection, ExchangePooledNTLMAuthConnection, ExchangeResponseStream, ExchangeRetryPolicy
 from pyexchange.exceptions import *
 
 from .fixtures import *
@@ -124,3 +127,264 @@ def test_oauth_fail():
 
     with raises(FailedExchangeException):
         connection.send("hello")
+
+
+class Test_ConnectionRetries(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL,
+                                                 username=FAKE_EXCHANGE_USERNAME,
+                                                 password=FAKE_EXCHANGE_PASSWORD,
+                                                 retry_policy=ExchangeRetryPolicy(backoff_factor=0))
+
+  @httpretty.activate
+  def test_throttled_request_is_retried(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL,
+                           responses=[
+                             httpretty.Response(body="", status=503),
+                             httpretty.Response(body="ok", status=200),
+                           ])
+
+    assert self.connection.send(b'yo', retries=2) == b'ok'
+
+  @httpretty.activate
+  def test_server_error_is_retried_for_idempotent_requests(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL,
+                           responses=[
+                             httpretty.Response(body="", status=500),
+                             httpretty.Response(body="ok", status=200),
+                           ])
+
+    assert self.connection.send(b'yo', retries=2, idempotent=True) == b'ok'
+
+  @httpretty.activate
+  def test_server_error_is_not_retried_for_writes(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL,
+                           responses=[
+                             httpretty.Response(body="", status=500),
+                             httpretty.Response(body="ok", status=200),
+                           ])
+
+    with raises(FailedExchangeException):
+      self.connection.send(b'yo', retries=2)
+
+  @httpretty.activate
+  def test_gives_up_after_retries(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, body="", status=503)
+
+    with raises(FailedExchangeException):
+      self.connection.send(b'yo', retries=2)
+
+    assert len(httpretty.latest_requests()) == 3
+
+  def test_timeout_is_passed_to_the_session(self):
+    session = MagicMock()
+    self.connection.session = session
+
+    self.connection.send(b'yo', timeout=10)
+
+    assert 0 < session.post.call_args[1]['timeout'] <= 10
+
+
+def test_retry_classification():
+  policy = ExchangeRetryPolicy()
+
+  assert policy.is_retryable(requests.exceptions.ConnectTimeout(), idempotent=False)
+  assert policy.is_retryable(requests.exceptions.ConnectionError(), idempotent=True)
+  assert not policy.is_retryable(requests.exceptions.ConnectionError(), idempotent=False)
+  assert policy.is_retryable(ExchangeInternalServerTransientErrorException(), idempotent=True)
+  assert not policy.is_retryable(ExchangeItemNotFoundException(), idempotent=True)
+  assert ExchangeRetryPolicy(retry_writes=True).is_retryable(requests.exceptions.ReadTimeout(), idempotent=False)
+
+
+def test_backoff_is_capped_and_jittered():
+  policy = ExchangeRetryPolicy(backoff_factor=1, max_backoff=5)
+
+  for retry in range(10):
+    assert 0 <= policy.backoff(retry) <= 5
+
+
+class Test_ExchangePooledNTLMAuthConnection(unittest.TestCase):
+
+  def build_connection(self, **kwargs):
+    return ExchangePooledNTLMAuthConnection(url=FAKE_EXCHANGE_URL,
+                                            username=FAKE_EXCHANGE_USERNAME,
+                                            password=FAKE_EXCHANGE_PASSWORD,
+                                            **kwargs)
+
+  @httpretty.activate
+  def test_sessions_are_reused_between_requests(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, status=200, body="ok")
+
+    connection = self.build_connection(pool_size=2)
+
+    with patch('pyexchange.connection.HttpNtlmAuth') as MockHttpNtlmAuth:
+      connection.send(b'one')
+      connection.send(b'two')
+
+    MockHttpNtlmAuth.assert_called_once_with(FAKE_EXCHANGE_USERNAME, FAKE_EXCHANGE_PASSWORD)
+
+  def test_each_checked_out_session_is_separate(self):
+    connection = self.build_connection(pool_size=2)
+
+    first = connection.acquire_session()
+    second = connection.acquire_session()
+
+    assert first is not second
+    assert first.auth is not second.auth
+
+    connection.release_session(first)
+    assert connection.acquire_session() is first
+
+  def test_checkout_times_out_when_the_pool_is_exhausted(self):
+    connection = self.build_connection(pool_size=1, checkout_timeout=0.01)
+    connection.acquire_session()
+
+    with raises(FailedExchangeException):
+      connection.acquire_session()
+
+  def test_per_thread_sessions(self):
+    connection = self.build_connection(per_thread=True)
+    sessions = []
+    grabbed, finish = threading.Event(), threading.Event()
+
+    def grab_session():
+      sessions.append(connection.acquire_session())
+      sessions.append(connection.acquire_session())
+      grabbed.set()
+      finish.wait(5)
+
+    thread = threading.Thread(target=grab_session)
+    thread.start()
+    grabbed.wait(5)
+
+    assert sessions[0] is sessions[1]
+    assert connection.acquire_session() is not sessions[0]
+
+    finish.set()
+    thread.join()
+
+  def run_in_thread(self, fn):
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join()
+
+  def test_per_thread_sessions_are_handed_back_when_the_thread_finishes(self):
+    connection = self.build_connection(per_thread=True, pool_size=1, checkout_timeout=5)
+    sessions = []
+
+    for _ in range(3):
+      self.run_in_thread(lambda: sessions.append(connection.acquire_session()))
+
+    assert sessions[0] is sessions[1] is sessions[2]
+    assert connection.acquire_session() is sessions[0]
+    assert len(connection._all_sessions) == 1
+
+  def test_per_thread_sessions_are_bounded_by_the_pool_size(self):
+    connection = self.build_connection(per_thread=True, pool_size=1, checkout_timeout=0.01)
+    connection.acquire_session()
+    errors = []
+
+    def grab_session():
+      try:
+        connection.acquire_session()
+      except FailedExchangeException as err:
+        errors.append(err)
+
+    self.run_in_thread(grab_session)
+
+    assert len(errors) == 1
+    assert len(connection._all_sessions) == 1
+
+  def test_close_closes_per_thread_sessions(self):
+    connection = self.build_connection(per_thread=True)
+    sessions = []
+    self.run_in_thread(lambda: sessions.append(connection.acquire_session()))
+
+    with patch.object(sessions[0], 'close') as mock_close:
+      connection.close()
+
+    mock_close.assert_called_once_with()
+
+    with raises(FailedExchangeException):
+      connection.acquire_session()
+
+  def test_close_closes_every_session(self):
+    connection = self.build_connection(pool_size=2)
+    session = connection.acquire_session()
+    connection.release_session(session)
+
+    with patch.object(session, 'close') as mock_close:
+      connection.close()
+
+    mock_close.assert_called_once_with()
+
+  def wait_for_a_session(self, connection, count=1):
+    """ Starts ``count`` threads that each wait for a session, and returns them with the errors they raise. """
+    errors = []
+
+    def wait():
+      try:
+        connection.acquire_session()
+      except FailedExchangeException as err:
+        errors.append(err)
+
+    threads = [threading.Thread(target=wait) for _ in range(count)]
+    for thread in threads:
+      thread.daemon = True
+      thread.start()
+
+    return threads, errors
+
+  def test_close_wakes_up_threads_waiting_for_a_session(self):
+    connection = self.build_connection(pool_size=1)
+    connection.acquire_session()
+
+    threads, errors = self.wait_for_a_session(connection, count=3)
+    time.sleep(0.05)
+    connection.close()
+
+    for thread in threads:
+      thread.join(5)
+      assert not thread.is_alive()
+    assert len(errors) == 3
+
+  def test_close_wakes_up_threads_waiting_for_a_per_thread_session(self):
+    connection = self.build_connection(pool_size=1, per_thread=True)
+    connection.acquire_session()
+
+    threads, errors = self.wait_for_a_session(connection)
+    time.sleep(0.05)
+    connection.close()
+
+    threads[0].join(5)
+    assert not threads[0].is_alive()
+    assert len(errors) == 1
+
+  def test_sessions_cant_be_checked_out_after_close(self):
+    connection = self.build_connection(pool_size=2)
+    connection.release_session(connection.acquire_session())
+    connection.close()
+
+    with raises(FailedExchangeException):
+      connection.acquire_session()
+
+
+@httpretty.activate
+def test_send_returns_raw_bytes_by_default():
+  httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, status=200, body=u'h\xe9llo'.encode('utf-8'))
+
+  connection = ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL, username=FAKE_EXCHANGE_USERNAME, password=FAKE_EXCHANGE_PASSWORD)
+
+  assert connection.send(b'yo') == u'h\xe9llo'.encode('utf-8')
+
+  connection.decode_responses = True
+  assert connection.send(b'yo') == u'h\xe9llo'
+
+
+def test_a_dropped_stream_raises_an_exchange_error():
+  response = MagicMock()
+  response.raw.read.side_effect = requests.packages.urllib3.exceptions.ProtocolError(u'Connection broken')
+
+  with raises(ExchangeResponseInterruptedException):
+    ExchangeResponseStream(response).read(1024)
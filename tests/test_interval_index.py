@@ -0,0 +1,99 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import random
+import unittest
+from datetime import datetime, timedelta
+from pytest import raises
+from pytz import utc
+
+from pyexchange import Exchange2010Service
+from pyexchange.exchange2010 import Exchange2010CalendarEventList
+from pyexchange.interval_index import ExchangeIntervalIndex, merge_intervals
+
+from .exchange2010.fixtures import LIST_EVENTS_RESPONSE
+
+MIDNIGHT = utc.localize(datetime(2014, 5, 1))
+
+
+def at(hour, minute=0):
+  return MIDNIGHT + timedelta(hours=hour, minutes=minute)
+
+
+class Test_ExchangeIntervalIndex(unittest.TestCase):
+
+  def setUp(self):
+    self.intervals = [
+      (at(9), at(10), u'standup'),
+      (at(9, 30), at(11), u'planning'),
+      (at(10), at(10, 30), u'1:1'),
+      (at(13), at(14), u'lunch and learn'),
+      (at(15), at(15), u'reminder'),
+    ]
+    self.index = ExchangeIntervalIndex(self.intervals)
+
+  def test_overlapping(self):
+    assert sorted(self.index.overlapping(at(9, 45), at(10, 15))) == [u'1:1', u'planning', u'standup']
+    assert sorted(self.index.overlapping(at(10, 30), at(13))) == [u'planning']
+    assert self.index.overlapping(at(11), at(13)) == []
+
+  def test_back_to_back_intervals_do_not_overlap(self):
+    assert u'standup' not in self.index.overlapping(at(10), at(10, 30))
+
+  def test_conflicts_in_an_event_list(self):
+    service = Exchange2010Service(connection=None)
+    events = Exchange2010CalendarEventList(service=service, xml=service._parse(LIST_EVENTS_RESPONSE.encode('utf-8')))
+    index = events.interval_index()
+
+    assert len(index) == len(events.events)
+    for event in events.events:
+      expected = [other.id for other in events.events if other is not event and other.start < event.end and other.end > event.start]
+      assert sorted(other.id for other in index.conflicts(event)) == sorted(expected)
+
+  def test_free_slots(self):
+    assert self.index.free_slots(at(8), at(16)) == [(at(8), at(9)), (at(11), at(13)), (at(14), at(16))]
+    assert self.index.free_slots(at(9, 30), at(13, 30)) == [(at(11), at(13))]
+    assert self.index.free_slots(at(8), at(16), min_duration=timedelta(hours=2)) == [(at(11), at(13)), (at(14), at(16))]
+
+  def test_busy(self):
+    assert self.index.busy() == [(at(9), at(11)), (at(13), at(14))]
+    assert self.index.busy(at(10), at(13, 30)) == [(at(10), at(11)), (at(13), at(13, 30))]
+
+  def test_max_concurrency(self):
+    assert self.index.max_concurrency() == 2
+    assert self.index.max_concurrency(at(10, 30), at(14)) == 1
+    assert self.index.max_concurrency(at(11), at(13)) == 0
+    assert ExchangeIntervalIndex().max_concurrency() == 0
+
+  def test_naive_datetimes_are_treated_as_utc(self):
+    assert sorted(self.index.overlapping(datetime(2014, 5, 1, 13, 30), datetime(2014, 5, 1, 13, 45))) == [u'lunch and learn']
+
+  def test_intervals_must_not_end_before_they_start(self):
+    with raises(ValueError):
+      ExchangeIntervalIndex([(at(10), at(9), u'backwards')])
+
+  def test_matches_a_brute_force_search(self):
+    rng = random.Random(4)
+    intervals = []
+    for n in range(300):
+      start = at(0, rng.randint(0, 24 * 60))
+      intervals.append((start, start + timedelta(minutes=rng.choice([0, 15, 30, 60, 240])), n))
+    index = ExchangeIntervalIndex(intervals)
+
+    for _ in range(200):
+      start = at(0, rng.randint(0, 24 * 60))
+      end = start + timedelta(minutes=rng.randint(1, 180))
+
+      expected = [n for interval_start, interval_end, n in intervals if interval_start < end and interval_end > start]
+      assert sorted(index.overlapping(start, end)) == sorted(expected)
+
+      busy = merge_intervals((interval_start, interval_end) for interval_start, interval_end, _ in intervals if interval_start != interval_end)
+      for slot_start, slot_end in index.free_slots(start, end):
+        assert all(slot_end <= busy_start or slot_start >= busy_end for busy_start, busy_end in busy)
+
+      expected_concurrency = max(len([n for interval_start, interval_end, n in intervals if interval_start <= time < interval_end])
+                                 for time in [start] + [interval_start for interval_start, _, _ in intervals if start < interval_start < end])
+      assert index.max_concurrency(start, end) == expected_concurrency
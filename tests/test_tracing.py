@@ -0,0 +1,84 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import httpretty
+import logging
+import unittest
+from mock import patch
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.tracing import ExchangeWireTracer
+
+from .fixtures import *
+
+
+class RecordingHandler(logging.Handler):
+
+  def __init__(self):
+    logging.Handler.__init__(self)
+    self.messages = []
+
+  def emit(self, record):
+    self.messages.append(record.getMessage())
+
+
+class Test_ExchangeWireTracer(unittest.TestCase):
+
+  def setUp(self):
+    self.handler = RecordingHandler()
+    self.log = logging.getLogger(u'pyexchange.wire.test')
+    self.log.addHandler(self.handler)
+    self.log.setLevel(logging.DEBUG)
+
+  def tearDown(self):
+    self.log.removeHandler(self.handler)
+
+  def connection(self, **kwargs):
+    return ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL,
+                                      username=FAKE_EXCHANGE_USERNAME,
+                                      password=FAKE_EXCHANGE_PASSWORD,
+                                      wire_tracer=ExchangeWireTracer(logger=self.log, **kwargs))
+
+  @httpretty.activate
+  def test_request_and_response_are_traced(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, body=u'<ok/>')
+
+    self.connection().send(b'<hello/>', headers={u'Authorization': u'Bearer secret'})
+
+    assert len(self.handler.messages) == 2
+    assert u'<hello/>' in self.handler.messages[0]
+    assert u'secret' not in self.handler.messages[0]
+    assert u'<ok/>' in self.handler.messages[1]
+
+  @httpretty.activate
+  def test_nothing_is_serialized_when_the_logger_is_off(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, body=u'<ok/>')
+    self.log.setLevel(logging.INFO)
+
+    with patch.object(ExchangeWireTracer, 'format_body') as format_body:
+      self.connection().send(b'<hello/>')
+
+    assert not format_body.called
+    assert self.handler.messages == []
+
+  @httpretty.activate
+  def test_unsampled_requests_are_skipped(self):
+    httpretty.register_uri(httpretty.POST, FAKE_EXCHANGE_URL, body=u'<ok/>')
+
+    self.connection(sample_rate=0).send(b'<hello/>')
+
+    assert self.handler.messages == []
+
+  def test_bodies_are_capped(self):
+    tracer = ExchangeWireTracer(logger=self.log, max_body_size=4)
+    assert tracer.format_body(b'abcdefgh') == u'abcd... (4 more bytes)'
+
+  def test_bodies_can_be_redacted(self):
+    assert ExchangeWireTracer(logger=self.log, redact_bodies=True).format_body(b'secret') == u'<6 bytes, redacted>'
+    assert ExchangeWireTracer(logger=self.log, redactor=lambda body: body.replace(b'secret', b'***')).format_body(b'my secret') == u'my ***'
+
+  def test_pretty_printing(self):
+    tracer = ExchangeWireTracer(logger=self.log, pretty_print=True)
+    assert tracer.format_body(b'<a><b/></a>') == u'<a>\n  <b/>\n</a>\n'